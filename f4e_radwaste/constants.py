@@ -3,6 +3,7 @@ from enum import Enum
 FOLDER_NAME_DATA_TABLES = "data_tables"
 FOLDER_NAME_CSV = "csv_files"
 FOLDER_NAME_VTK = "vtk_files"
+FOLDER_NAME_INPUT_CACHE = "input_cache"
 
 FILENAME_MESHINFO = "meshinfo"
 FILENAME_DGS_DATA = "DGSdata.dat"
@@ -43,6 +44,25 @@ class CoordinateType(Enum):
     CYLINDRICAL = "cylindrical"
 
 
+class VtkFormat(Enum):
+    """The values are the extensions of the VTK files."""
+
+    STRUCTURED = "vts"
+    UNSTRUCTURED = "vtu"
+    # A file by material selection with all the decay times as steps
+    TIME_SERIES = "vtkhdf"
+
+
+class TableFormat(Enum):
+    """The values are the extensions of the table files."""
+
+    CSV = "csv"
+    PARQUET = "parquet"
+    FEATHER = "feather"
+    HDF5 = "hdf5"
+    NPZ = "npz"
+
+
 def get_radwaste_class_str_from_int(value: int) -> str:
     if value == TYPE_TFA_INT:
         return TYPE_TFA_STR
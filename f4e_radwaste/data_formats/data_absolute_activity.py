@@ -1,4 +1,7 @@
-from typing import Optional, List
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, List
 
 import numpy as np
 import pandas as pd
@@ -12,6 +15,15 @@ from f4e_radwaste.constants import (
 )
 from f4e_radwaste.data_formats.dataframe_validator import DataFrameValidator
 
+FILENAME_HDF5 = "DataAbsoluteActivity.hdf5"
+
+# Keys of the HDF5 file partitioned by decay time
+KEY_HDF5_DECAY_TIMES = "decay_times"
+KEY_HDF5_PARTITION = "by_time/time_{position}"
+
+# Decay times held in memory by LazyDataAbsoluteActivity
+MAX_LOADED_DECAY_TIMES = 2
+
 
 class DataAbsoluteActivity(DataFrameValidator):
     EXPECTED_INDEX_NAMES = [
@@ -51,3 +63,150 @@ class DataAbsoluteActivity(DataFrameValidator):
         self._dataframe.index = self._dataframe.index.set_levels(
             decay_time_names, level=KEY_TIME
         )
+
+    def save_partitioned_to_hdf5(self, folder_path: Path):
+        """
+        Saves the activity in table format with a node by decay time, so a single
+        decay time can be read.
+        """
+        _write_partitions(
+            folder_path / FILENAME_HDF5, self.decay_times, self._get_partition
+        )
+
+    def _get_partition(self, position: int) -> pd.DataFrame:
+        return self.get_filtered_dataframe(decay_times=[self.decay_times[position]])
+
+    @classmethod
+    def load(cls, folder_path: Path) -> "DataAbsoluteActivity":
+        """
+        Files saved by save_partitioned_to_hdf5 are opened lazily, the others are
+        read at once.
+        """
+        file_path = folder_path / FILENAME_HDF5
+        with pd.HDFStore(file_path, mode="r") as store:
+            is_partitioned = f"/{KEY_HDF5_DECAY_TIMES}" in store.keys()
+
+        if is_partitioned:
+            return LazyDataAbsoluteActivity(file_path)
+        return super().load(folder_path)
+
+
+class LazyDataAbsoluteActivity(DataAbsoluteActivity):
+    """
+    DataAbsoluteActivity that reads the decay times from a partitioned HDF5 file
+    when they are needed, keeping only the last max_loaded_times used in memory.
+    The dataframe of the class is an empty one with the columns of the file.
+    """
+
+    def __init__(self, file_path: Path, max_loaded_times: int = MAX_LOADED_DECAY_TIMES):
+        self.file_path = file_path
+        self.max_loaded_times = max_loaded_times
+        self._decay_times = pd.read_hdf(file_path, key=KEY_HDF5_DECAY_TIMES).values
+        self._loaded_times: OrderedDict[int, DataAbsoluteActivity] = OrderedDict()
+        super().__init__(self._read_empty_dataframe())
+
+    def _read_empty_dataframe(self) -> pd.DataFrame:
+        if len(self._decay_times) == 0:
+            index = pd.MultiIndex.from_arrays(
+                [[]] * len(self.EXPECTED_INDEX_NAMES), names=self.EXPECTED_INDEX_NAMES
+            )
+            return pd.DataFrame(columns=self.EXPECTED_COLUMNS, index=index, dtype=float)
+
+        dataframe = pd.read_hdf(
+            self.file_path, key=KEY_HDF5_PARTITION.format(position=0), stop=0
+        )
+        dataframe.index = dataframe.index.set_levels(
+            self._decay_times[:0], level=KEY_TIME, verify_integrity=False
+        )
+        return dataframe
+
+    @property
+    def decay_times(self) -> np.ndarray:
+        return self._decay_times
+
+    @decay_times.setter
+    def decay_times(self, decay_time_names):
+        self._decay_times = np.array(decay_time_names)
+        self._loaded_times.clear()
+        self._dataframe = self._read_empty_dataframe()
+
+    @property
+    def n_rows(self):
+        with pd.HDFStore(self.file_path, mode="r") as store:
+            return sum(
+                store.get_storer(KEY_HDF5_PARTITION.format(position=position)).nrows
+                for position in range(len(self._decay_times))
+            )
+
+    def get_filtered_dataframe(
+        self,
+        decay_times: Optional[List[float]] = None,
+        voxels: Optional[List[int]] = None,
+        cells: Optional[List[int]] = None,
+        isotopes: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        positions = range(len(self._decay_times))
+        if decay_times is not None:
+            positions = np.flatnonzero(pd.Index(self._decay_times).isin(decay_times))
+
+        if len(positions) == 0:
+            return self._dataframe.copy()
+
+        dataframes = [
+            self._get_decay_time(position).get_filtered_dataframe(
+                voxels=voxels, cells=cells, isotopes=isotopes
+            )
+            for position in positions
+        ]
+        if len(dataframes) == 1:
+            return dataframes[0]
+        return pd.concat(dataframes)
+
+    def save_dataframe_to_hdf5(self, folder_path: Path):
+        # The whole table is read before the file is opened, it may be the source
+        dataframe = self.get_filtered_dataframe()
+        dataframe.to_hdf(folder_path / FILENAME_HDF5, key="dataframe", mode="w")
+
+    def save_partitioned_to_hdf5(self, folder_path: Path):
+        # The source file is read while the new one is written
+        file_path = folder_path / FILENAME_HDF5
+        temporary_path = file_path.with_suffix(".hdf5.tmp")
+        _write_partitions(temporary_path, self.decay_times, self._get_partition)
+        os.replace(temporary_path, file_path)
+
+    def _get_partition(self, position: int) -> pd.DataFrame:
+        return self._get_decay_time(position).get_filtered_dataframe()
+
+    def _get_decay_time(self, position: int) -> DataAbsoluteActivity:
+        if position in self._loaded_times:
+            self._loaded_times.move_to_end(position)
+            return self._loaded_times[position]
+
+        dataframe = pd.read_hdf(
+            self.file_path, key=KEY_HDF5_PARTITION.format(position=position)
+        )
+        # The decay time may have been renamed
+        dataframe.index = dataframe.index.set_levels(
+            self._decay_times[[position]], level=KEY_TIME, verify_integrity=False
+        )
+
+        self._loaded_times[position] = DataAbsoluteActivity(dataframe)
+        while len(self._loaded_times) > self.max_loaded_times:
+            self._loaded_times.popitem(last=False)
+
+        return self._loaded_times[position]
+
+
+def _write_partitions(
+    file_path: Path,
+    decay_times: np.ndarray,
+    get_partition: Callable[[int], pd.DataFrame],
+):
+    with pd.HDFStore(file_path, mode="w") as store:
+        store.put(KEY_HDF5_DECAY_TIMES, pd.Series(decay_times))
+        for position in range(len(decay_times)):
+            store.put(
+                KEY_HDF5_PARTITION.format(position=position),
+                get_partition(position),
+                format="table",
+            )
@@ -4,7 +4,10 @@ import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import KEY_MASS_GRAMS, KEY_CELL, KEY_MATERIAL, KEY_VOXEL
-from f4e_radwaste.data_formats.dataframe_validator import DataFrameValidator
+from f4e_radwaste.data_formats.dataframe_validator import (
+    DataFrameValidator,
+    get_values_of_sorted_pairs,
+)
 
 
 class DataMass(DataFrameValidator):
@@ -18,6 +21,7 @@ class DataMass(DataFrameValidator):
     def __init__(self, dataframe: pd.DataFrame):
         super().__init__(dataframe)
         self._dataframe = self._dataframe.sort_index()
+        self._cell_material_pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None
 
     def get_filtered_dataframe(
         self,
@@ -61,6 +65,32 @@ class DataMass(DataFrameValidator):
 
         return mat_id_proportions
 
+    def get_materials_of_cells(
+        self, cells: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the positions of the cells, repeated once per material of the cell,
+        and the material of each of them. Cells that are not in DataMass are dropped.
+        """
+        pair_cells, pair_materials = self._get_cell_material_pairs()
+        return get_values_of_sorted_pairs(pair_cells, pair_materials, cells)
+
+    def _get_cell_material_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Unique pairs (cell, material) sorted by cell
+        if self._cell_material_pairs is None:
+            pairs = pd.DataFrame(
+                {
+                    KEY_CELL: self._dataframe.index.get_level_values(KEY_CELL),
+                    KEY_MATERIAL: self._dataframe.index.get_level_values(KEY_MATERIAL),
+                }
+            )
+            pairs = pairs.drop_duplicates().sort_values([KEY_CELL, KEY_MATERIAL])
+            self._cell_material_pairs = (
+                pairs[KEY_CELL].to_numpy(dtype=np.int64),
+                pairs[KEY_MATERIAL].to_numpy(dtype=np.int64),
+            )
+        return self._cell_material_pairs
+
     @property
     def materials(self) -> np.ndarray:
         return self._dataframe.index.unique(level=KEY_MATERIAL).values
@@ -1,37 +1,100 @@
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 import pandas as pd
 
-from f4e_radwaste.constants import KEY_VOXEL, KEY_MASS_GRAMS
+from f4e_radwaste.constants import KEY_VOXEL, KEY_MASS_GRAMS, TableFormat
 from f4e_radwaste.data_formats.dataframe_validator import DataFrameValidator
+from f4e_radwaste.data_formats.table_writers import write_table
 
 
 class DataMeshActivity(DataFrameValidator):
     EXPECTED_INDEX_NAMES = [KEY_VOXEL]
     EXPECTED_COLUMNS = [KEY_MASS_GRAMS]
 
+    def __init__(
+        self, dataframe: pd.DataFrame, result_columns: Optional[pd.DataFrame] = None
+    ):
+        super().__init__(dataframe)
+
+        # Columns calculated from the activity, like the radwaste class, are kept
+        # apart and placed before the others only when the table is read or written
+        if result_columns is None:
+            result_columns = pd.DataFrame(index=dataframe.index)
+        self._result_columns = result_columns
+
+    @property
+    def columns(self) -> pd.Index:
+        return self._result_columns.columns.append(self._dataframe.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self._dataframe.memory_usage(deep=True).sum()
+            + self._result_columns.memory_usage(index=False, deep=True).sum()
+        )
+
     def get_filtered_dataframe(
         self, voxels: Optional[List[int]] = None, columns: Optional[List[str]] = None
     ) -> pd.DataFrame:
-        filters = {KEY_VOXEL: voxels}
-        filtered_dataframe = super().get_filtered_dataframe(**filters)
+        rows = self._get_filtered_rows(**{KEY_VOXEL: voxels})
+
+        result_columns = self._result_columns
+        dataframe = self._dataframe
 
         # Return only the columns with names that match the names provided
         if columns is not None:
-            matching_columns = filtered_dataframe.columns.intersection(columns)
-            return filtered_dataframe[matching_columns]
+            result_columns = result_columns[
+                result_columns.columns.intersection(columns)
+            ]
+            dataframe = dataframe[dataframe.columns.intersection(columns)]
 
-        return filtered_dataframe
+        joined_dataframe = _join_result_columns(result_columns, dataframe)
+        if rows is None:
+            return joined_dataframe.copy()
 
-    def get_dataframe_with_added_columns(self, columns: Dict[str, pd.Series]):
-        for column_name, series in columns.items():
-            series.name = column_name
+        return joined_dataframe.iloc[rows]
 
-        dataframe = pd.concat([*columns.values(), self._dataframe], axis=1)
-        dataframe.index.name = KEY_VOXEL
+    def get_unjoined_dataframes(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns the result columns and the activity table without copying them, for
+        the callers that only read them. Joining them would copy the whole activity,
+        both share the same index. The returned dataframes must not be modified.
+        """
+        return self._result_columns, self._dataframe
 
-        return dataframe
+    def with_added_columns(self, columns: Dict[str, pd.Series]) -> "DataMeshActivity":
+        """
+        Returns a DataMeshActivity with the columns placed before the current ones.
+        The activity table is shared, not copied.
+        """
+        added_columns = pd.concat(
+            [series.rename(column_name) for column_name, series in columns.items()],
+            axis=1,
+        )
+        if not added_columns.index.equals(self._dataframe.index):
+            added_columns = added_columns.reindex(self._dataframe.index)
+        added_columns.index = self._dataframe.index
+
+        result_columns = pd.concat([added_columns, self._result_columns], axis=1)
+
+        return DataMeshActivity(self._dataframe, result_columns)
 
     def to_csv(self, folder_path: Path, file_name: str):
-        self._dataframe.to_csv(folder_path / f"{file_name}.csv")
+        self.save_table(folder_path, file_name, TableFormat.CSV)
+
+    def save_table(self, folder_path: Path, file_name: str, table_format: TableFormat):
+        write_table(
+            self.get_unjoined_dataframes(), folder_path, file_name, table_format
+        )
+
+
+def _join_result_columns(
+    result_columns: pd.DataFrame, dataframe: pd.DataFrame
+) -> pd.DataFrame:
+    if len(result_columns.columns) == 0:
+        return dataframe
+
+    joined_dataframe = pd.concat([result_columns, dataframe], axis=1)
+    joined_dataframe.index.name = KEY_VOXEL
+    return joined_dataframe
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 
@@ -12,6 +14,10 @@ class DataFrameValidator(ABC):
         self._dataframe = dataframe
         self._validate_dataframe_format()
 
+        # Built lazily by get_filtered_dataframe for the current index
+        self._level_positions: Dict[str, _LevelPositions] = {}
+        self._level_positions_index: Optional[pd.Index] = None
+
     def _validate_dataframe_format(self):
         indices_identical = self._dataframe.index.names == self.EXPECTED_INDEX_NAMES
         expected_columns_are_present = all(
@@ -28,14 +34,47 @@ class DataFrameValidator(ABC):
 
     @abstractmethod
     def get_filtered_dataframe(self, **kwargs) -> pd.DataFrame:
-        mask = pd.Series(True, index=self._dataframe.index)
+        rows = self._get_filtered_rows(**kwargs)
+        if rows is None:
+            return self._dataframe.copy()
+
+        return self._dataframe.iloc[rows]
+
+    def _get_filtered_rows(self, **kwargs) -> Optional[np.ndarray]:
+        """Returns the sorted positions of the selected rows, None if all are."""
+        filters = {
+            key: filter_values
+            for key, filter_values in kwargs.items()
+            if filter_values is not None
+        }
+        if len(filters) == 0:
+            return None
+
+        # Find the codes of the selected values of each level
+        level_selections = []
+        for key, filter_values in filters.items():
+            level_positions = self._get_level_positions(key)
+            codes = level_positions.get_codes(filter_values)
+            level_selections.append((level_positions, codes))
+
+        # Take the rows of the most selective level and check the others on them
+        level_selections.sort(key=lambda selection: selection[0].count(selection[1]))
+        level_positions, codes = level_selections[0]
+        rows = level_positions.get_rows(codes)
+        for level_positions, codes in level_selections[1:]:
+            rows = rows[level_positions.are_rows_selected(rows, codes)]
+
+        return rows
 
-        for key, filter_values in kwargs.items():
-            if filter_values is not None:
-                # filter_values = set(filter_values)  # TODO: possible perf improvement
-                mask &= self._dataframe.index.get_level_values(key).isin(filter_values)
+    def _get_level_positions(self, key: str) -> "_LevelPositions":
+        # The index may have been replaced since the positions were built
+        if self._level_positions_index is not self._dataframe.index:
+            self._level_positions = {}
+            self._level_positions_index = self._dataframe.index
 
-        return self._dataframe.loc[mask]
+        if key not in self._level_positions:
+            self._level_positions[key] = _LevelPositions(self._dataframe.index, key)
+        return self._level_positions[key]
 
     def save_dataframe_to_hdf5(self, folder_path: Path):
         self._dataframe.to_hdf(
@@ -51,3 +90,74 @@ class DataFrameValidator(ABC):
     @property
     def n_rows(self):
         return self._dataframe.shape[0]
+
+
+class _LevelPositions:
+    """
+    Positions of the rows of each value of an index level in CSR form: the rows with
+    the value of code c are sorted_rows[starts[c]:starts[c + 1]].
+    """
+
+    def __init__(self, index: pd.Index, key: str):
+        if key not in index.names:
+            raise KeyError(f"Level {key} not found")
+
+        if isinstance(index, pd.MultiIndex):
+            level_number = index.names.index(key)
+            self.values = index.levels[level_number]
+            self.row_codes = index.codes[level_number]
+        else:
+            self.row_codes, self.values = pd.factorize(index, sort=True)
+
+        # Missing values have the code -1 and are never selected
+        valid_rows = np.flatnonzero(self.row_codes >= 0)
+        valid_codes = self.row_codes[valid_rows]
+        self.sorted_rows = valid_rows[np.argsort(valid_codes, kind="stable")]
+        self.starts = np.zeros(len(self.values) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(valid_codes, minlength=len(self.values)), out=self.starts[1:]
+        )
+
+    def get_codes(self, filter_values: Iterable) -> np.ndarray:
+        codes = self.values.get_indexer(pd.Index(list(filter_values)))
+        return np.unique(codes[codes >= 0])
+
+    def count(self, codes: np.ndarray) -> int:
+        return int((self.starts[codes + 1] - self.starts[codes]).sum())
+
+    def get_rows(self, codes: np.ndarray) -> np.ndarray:
+        """Returns the sorted positions of the rows with any of the codes."""
+        lengths = self.starts[codes + 1] - self.starts[codes]
+        rows = self.sorted_rows[
+            np.repeat(self.starts[codes], lengths) + _get_offsets_in_ranges(lengths)
+        ]
+        return np.sort(rows)
+
+    def are_rows_selected(self, rows: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # The extra last element is the one of the missing values, code -1
+        is_code_selected = np.zeros(len(self.values) + 1, dtype=bool)
+        is_code_selected[codes] = True
+        return is_code_selected[self.row_codes[rows]]
+
+
+def get_values_of_sorted_pairs(
+    pair_keys: np.ndarray, pair_values: np.ndarray, keys: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the positions of the keys, repeated once per pair (key, value) of the
+    key, and the value of each of them. The pairs must be sorted by key. The
+    positions keep the order of the keys, so grouped sums add the rows in the same
+    order as grouping each value on its own. Keys without pairs are dropped.
+    """
+    first_pairs = np.searchsorted(pair_keys, keys, side="left")
+    pair_counts = np.searchsorted(pair_keys, keys, side="right") - first_pairs
+
+    positions = np.repeat(np.arange(len(keys)), pair_counts)
+    values = pair_values[first_pairs[positions] + _get_offsets_in_ranges(pair_counts)]
+
+    return positions, values
+
+
+def _get_offsets_in_ranges(lengths: np.ndarray) -> np.ndarray:
+    """Returns 0, 1, ..., length - 1 for each of the lengths, concatenated."""
+    return np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
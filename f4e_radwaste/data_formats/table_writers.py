@@ -0,0 +1,142 @@
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import TableFormat
+
+# Optional packages needed by some of the formats
+REQUIRED_PACKAGES = {
+    TableFormat.PARQUET: "pyarrow",
+    TableFormat.FEATHER: "pyarrow",
+}
+
+# Size of the chunks of rows joined at once when the formats are written by rows
+BYTES_PER_CHUNK = 64 * 1024**2
+
+
+def write_table(
+    dataframes: Union[pd.DataFrame, Sequence[pd.DataFrame]],
+    folder_path: Path,
+    file_name: str,
+    table_format: TableFormat,
+):
+    """
+    Writes the dataframe with its index as the first column in any format, the
+    column names are the same as in the CSV tables. Several dataframes that share
+    the same index are written side by side as one table without joining them, they
+    are written by columns or by chunks of rows.
+    """
+    if isinstance(dataframes, pd.DataFrame):
+        dataframes = [dataframes]
+    dataframes = [
+        dataframe for dataframe in dataframes if len(dataframe.columns)
+    ] or list(dataframes[:1])
+
+    file_path = folder_path / f"{file_name}.{table_format.value}"
+    TABLE_WRITERS[table_format](dataframes, file_path)
+
+
+def is_table_format_available(table_format: TableFormat) -> bool:
+    package = REQUIRED_PACKAGES.get(table_format)
+    return package is None or find_spec(package) is not None
+
+
+def _iterate_row_chunks(dataframes: List[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Yields the joined table by chunks of rows, at least one even if empty."""
+    number_of_rows = len(dataframes[0])
+    number_of_columns = sum(len(dataframe.columns) for dataframe in dataframes)
+    rows_per_chunk = max(1, BYTES_PER_CHUNK // (8 * max(number_of_columns, 1)))
+
+    for start in range(0, max(number_of_rows, 1), rows_per_chunk):
+        yield pd.concat(
+            [
+                dataframe.iloc[start : start + rows_per_chunk]
+                for dataframe in dataframes
+            ],
+            axis=1,
+        )
+
+
+def _write_csv(dataframes: List[pd.DataFrame], file_path: Path):
+    with open(file_path, "w", newline="") as outfile:
+        for position, chunk in enumerate(_iterate_row_chunks(dataframes)):
+            chunk.to_csv(outfile, header=position == 0)
+
+
+def _write_parquet(dataframes: List[pd.DataFrame], file_path: Path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for chunk in _iterate_row_chunks(dataframes):
+        table = pa.Table.from_pandas(chunk.reset_index(), preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(file_path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def _write_feather(dataframes: List[pd.DataFrame], file_path: Path):
+    # Feather V2 files are Arrow IPC files, they can be written by batches
+    import pyarrow as pa
+
+    writer = None
+    for chunk in _iterate_row_chunks(dataframes):
+        table = pa.Table.from_pandas(chunk.reset_index(), preserve_index=False)
+        if writer is None:
+            writer = pa.ipc.new_file(str(file_path), table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def _write_hdf5(dataframes: List[pd.DataFrame], file_path: Path):
+    # Table format to append the chunks, pandas.read_hdf reads it as the fixed one.
+    # The text columns are given the width of their longest value in any chunk
+    text_widths = {}
+    text_columns = [
+        column
+        for dataframe in dataframes
+        for _column_name, column in dataframe.items()
+        if column.dtype == object
+    ]
+    if text_columns:
+        text_widths["values"] = max(
+            int(column.astype(str).str.len().max()) for column in text_columns
+        )
+    if dataframes[0].index.dtype == object:
+        text_widths["index"] = int(dataframes[0].index.astype(str).str.len().max())
+
+    with pd.HDFStore(file_path, mode="w") as store:
+        for chunk in _iterate_row_chunks(dataframes):
+            store.append(
+                "dataframe", chunk, format="table", min_itemsize=text_widths or None
+            )
+
+
+def _write_npz(dataframes: List[pd.DataFrame], file_path: Path):
+    # One array by column, text columns are stored as fixed-width strings so they
+    # can be loaded without pickle. The arrays are not compressed, each one is a
+    # contiguous .npy file inside the archive that can be memory-mapped
+    index_columns = dataframes[0].iloc[:, :0].reset_index()
+    columns = {}
+    for dataframe in [index_columns, *dataframes]:
+        for column_name, column in dataframe.items():
+            columns[str(column_name)] = column.to_numpy()
+
+    for column_name, values in columns.items():
+        if values.dtype == object:
+            columns[column_name] = values.astype(str)
+
+    np.savez(file_path, **columns)
+
+
+TABLE_WRITERS: Dict[TableFormat, Callable[[List[pd.DataFrame], Path], None]] = {
+    TableFormat.CSV: _write_csv,
+    TableFormat.PARQUET: _write_parquet,
+    TableFormat.FEATHER: _write_feather,
+    TableFormat.HDF5: _write_hdf5,
+    TableFormat.NPZ: _write_npz,
+}
@@ -0,0 +1,55 @@
+"""
+Evaluates the packages of a JSON or CSV file with the data tables of a processed
+folder, without the GUI. Example:
+
+python -m f4e_radwaste.evaluate_packages path/to/data_tables packages.json
+    --decay-times 3.15e7 3.15e8 --materials 10 20 --workers 4 --output results.csv
+"""
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from f4e_radwaste.post_processing.package_evaluation import evaluate_packages
+from f4e_radwaste.readers import packages_file
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Evaluates many waste packages (boxes or STL files) at once."
+    )
+    parser.add_argument("data_tables_folder", type=Path)
+    parser.add_argument("packages_file", type=Path, help="JSON or CSV file")
+    parser.add_argument(
+        "--decay-times",
+        type=float,
+        nargs="+",
+        help="Decay times in seconds, all of them by default",
+    )
+    parser.add_argument(
+        "--materials", type=int, nargs="+", help="All the materials by default"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="CSV file for the results, they are printed by default",
+    )
+    parsed_args = parser.parse_args(args)
+
+    results = evaluate_packages(
+        data_tables_folder=parsed_args.data_tables_folder,
+        packages=packages_file.read_file(parsed_args.packages_file),
+        decay_times=parsed_args.decay_times,
+        materials=parsed_args.materials,
+        workers=parsed_args.workers,
+    )
+
+    if parsed_args.output is None:
+        print(results.to_string(index=False))
+    else:
+        results.to_csv(parsed_args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# Memory that the cached grid arrays may use
+DEFAULT_MAX_BYTES = 1024 * 2**20
+
+# Key of a grid: (decay time, sorted materials or None for all the materials)
+GridKey = Tuple[Hashable, Optional[Tuple[int, ...]]]
+CellArrays = Dict[str, np.ndarray]
+
+
+class GridCache:
+    """
+    Least recently used cache of the cell arrays of the grids shown in the GUI, by
+    decay time and material selection. The geometry is not stored, it is shared by
+    all the grids of a mesh.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[GridKey, CellArrays] = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @staticmethod
+    def make_key(decay_time: Hashable, materials: Optional[List[int]]) -> GridKey:
+        if materials is None:
+            return decay_time, None
+        return decay_time, tuple(sorted(materials))
+
+    def get(
+        self, decay_time: Hashable, materials: Optional[List[int]]
+    ) -> Optional[CellArrays]:
+        key = self.make_key(decay_time, materials)
+        cell_arrays = self._entries.get(key)
+        if cell_arrays is not None:
+            self._entries.move_to_end(key)
+        return cell_arrays
+
+    def put(
+        self,
+        decay_time: Hashable,
+        materials: Optional[List[int]],
+        cell_arrays: CellArrays,
+    ):
+        """Arrays larger than the whole budget are not stored."""
+        key = self.make_key(decay_time, materials)
+        self._remove(key)
+
+        n_bytes = sum(values.nbytes for values in cell_arrays.values())
+        if n_bytes > self.max_bytes:
+            return
+
+        # Evict the least recently used grids until the new one fits
+        while self._entries and self._nbytes + n_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+        self._entries[key] = cell_arrays
+        self._nbytes += n_bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes = 0
+
+    def _remove(self, key: GridKey):
+        cell_arrays = self._entries.pop(key, None)
+        if cell_arrays is not None:
+            self._nbytes -= sum(values.nbytes for values in cell_arrays.values())
@@ -6,7 +6,17 @@ from typing import TYPE_CHECKING
 import numpy as np
 
 from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
+from f4e_radwaste.gui.gui_jobs import (
+    JOB_LOAD_DATA_TABLES,
+    JOB_UPDATE_GRID,
+    JobContext,
+)
+from f4e_radwaste.gui.gui_processor import GUIProcessor
 from f4e_radwaste.post_processing.classify_waste import classify_waste
+from f4e_radwaste.post_processing.input_data import InputData
+from f4e_radwaste.post_processing.package_evaluation import (
+    get_mask_points_inside_surface,
+)
 
 
 if TYPE_CHECKING:
@@ -27,7 +37,7 @@ from f4e_radwaste.gui.gui_helpers import (
     select_folder_through_dialog,
 )
 
-from f4e_radwaste.meshgrids import create_grid
+from f4e_radwaste.meshgrids import create_grid, get_cell_centers
 
 
 class GUIFunctions:
@@ -40,23 +50,18 @@ class GUIFunctions:
     def menu_action_load_data_tables_folder(self):
         folder_path = select_folder_through_dialog()
 
-        self.manager.load_new_data_processor(folder_path)
+        # The files are read in the background, the window keeps responding
+        self.manager.jobs.start(
+            JOB_LOAD_DATA_TABLES,
+            lambda job: load_data_tables_folder(folder_path, job),
+            on_finished=self.data_tables_folder_loaded,
+        )
 
-        self.load_geometry_meshes(folder_path)
+    def data_tables_folder_loaded(self, loaded_data):
+        processor, geo_meshes = loaded_data
+        self.manager.set_loaded_data(processor, geo_meshes)
 
         self.update_results_widget_with_new_dataset()
-        self.start_plot()
-
-    def load_geometry_meshes(self, folder_path):
-        geo_path = folder_path / "geometry"
-        if not geo_path.is_dir():
-            return
-        for file in geo_path.iterdir():
-            if not file.is_file():
-                continue
-            if file.suffix not in [".stl", ".ply"]:
-                continue
-            self.manager.geo_meshes[file.stem] = pv.read(file)
 
     def update_results_widget_with_new_dataset(self):
         # Stop the automatic execution of functions until the end of this function
@@ -83,40 +88,53 @@ class GUIFunctions:
         self.active = True
 
     def update_grid_with_time_material_combination(self):
-        self.active = False
-
+        """
+        The grid is calculated in the background and replaces the current one when
+        ready, then the plot is updated. A newer selection cancels the calculation.
+        """
         # Get the time and material from the combo boxes
         results_widget = self.manager.main_window.results_widget
         decay_time = results_widget.get_decay_time()
         materials = results_widget.get_materials()
 
-        # Calculate the DataMeshActivity for the time and material
         input_data = self.manager.processor.input_data
-        try:
-            mesh_activity = input_data.get_mesh_activity_by_time_and_materials(
-                decay_time=decay_time,
-                materials=materials,
-            )
-        except ValueError:
-            # Create a dummy empty grid if no data for the mesh
-            self.manager.grid = pv.StructuredGrid()
-            self.active = True
+
+        # Selections already visited only need their arrays added to the geometry
+        cell_arrays = self.manager.grid_cache.get(decay_time, materials)
+        if cell_arrays is not None:
+            self.manager.jobs.cancel(JOB_UPDATE_GRID)
+            grid = create_grid(data_mesh_info=input_data.data_mesh_info)
+            for array_name, values in cell_arrays.items():
+                grid.cell_data[array_name] = values
+            self.grid_calculated(grid)
             return
 
-        mesh_activity = classify_waste(mesh_activity, input_data.isotope_criteria)
+        def grid_calculated_and_cached(grid: pv.StructuredGrid):
+            if grid.n_cells > 0:
+                self.manager.grid_cache.put(
+                    decay_time,
+                    materials,
+                    {name: grid.cell_data[name] for name in grid.cell_data.keys()},
+                )
+            self.grid_calculated(grid)
+
+        self.manager.jobs.start(
+            JOB_UPDATE_GRID,
+            lambda job: calculate_grid(input_data, decay_time, materials, job),
+            on_finished=grid_calculated_and_cached,
+        )
 
-        dataframe = mesh_activity.get_filtered_dataframe()
-        dataframe[KEY_R2S_INDICES] = dataframe.index.values
-        mesh_activity = DataMeshActivity(dataframe)
+    def grid_calculated(self, grid: pv.StructuredGrid):
+        self.active = False
 
-        self.manager.grid = create_grid(
-            data_mesh_info=input_data.data_mesh_info, data_mesh_activity=mesh_activity
-        )
+        self.manager.grid = grid
 
         # Update the array name ComboBox
-        results_widget.update_array_name_combo_box(self.manager.grid.array_names)
+        if grid.n_cells > 0:
+            results_widget = self.manager.main_window.results_widget
+            results_widget.update_array_name_combo_box(grid.array_names)
 
-        self.active = True
+        self.start_plot()
 
     def start_plot(self):
         self.active = False
@@ -217,6 +235,9 @@ class GUIFunctions:
         self.active = True
 
     def button_pressed_calculate_radwaste(self) -> DataMeshActivity | None:
+        # The grid and the input data must not be in use by a background job
+        self.manager.jobs.wait_for_done()
+
         grid = self.manager.grid
 
         if grid.n_cells == 0:
@@ -232,7 +253,7 @@ class GUIFunctions:
         decay_time = results_widget.get_decay_time()
         materials = results_widget.get_materials()
 
-        mask_cells_inside = self.get_mask_vtk_cells_inside_box(box, grid)
+        mask_cells_inside = self.get_mask_cells_inside_box()
 
         voxels_inside = grid[KEY_R2S_INDICES][mask_cells_inside]
 
@@ -252,11 +273,17 @@ class GUIFunctions:
 
         return package_activity
 
-    @staticmethod
-    def get_mask_vtk_cells_inside_box(box, value_grid):
-        centers = value_grid.cell_centers()
-        mask_points_inside = centers.select_enclosed_points(box)["SelectedPoints"]
-        return mask_points_inside.astype(bool)
+    def get_mask_cells_inside_box(self) -> np.ndarray:
+        # The grids of a mesh share the geometry and so the cell centers
+        data_mesh_info = self.manager.processor.input_data.data_mesh_info
+        centers = get_cell_centers(data_mesh_info)
+
+        overlaid_box_widget = self.manager.main_window.overlaid_box_widget
+        if overlaid_box_widget.package_box is not None:
+            return overlaid_box_widget.package_box.get_mask_points_inside(centers)
+
+        # Only the arbitrary volumes of the STL files need VTK
+        return get_mask_points_inside_surface(centers, overlaid_box_widget.box_grid)
 
     def button_pressed_print_radwaste_info(self):
         """
@@ -274,6 +301,7 @@ class GUIFunctions:
         overlaid_box_widget = self.manager.main_window.overlaid_box_widget
         overlaid_box_widget.show_no_box_loaded_widget()
         overlaid_box_widget.box_grid = pv.StructuredGrid()
+        overlaid_box_widget.package_box = None
         self.manager.main_window.plotter.remove_actor(OVERLAID_BOX_MESH_PLOTTER_NAME)
         self.active = True
 
@@ -310,14 +338,12 @@ class GUIFunctions:
         if not self.active:
             return
         self.update_grid_with_time_material_combination()
-        self.start_plot()
         print("decay time changed")
 
     def material_changed(self):
         if not self.active:
             return
         self.update_grid_with_time_material_combination()
-        self.start_plot()
         print("material changed")
 
     def array_name_changed(self):
@@ -337,3 +363,48 @@ class GUIFunctions:
         if DATA_MESH_PLOTTER_NAME in plotter.actors:
             clim = [plotting_options.min_scalar_val, plotting_options.max_scalar_val]
             plotter.actors[DATA_MESH_PLOTTER_NAME].mapper.scalar_range = clim
+
+
+def load_data_tables_folder(folder_path, job: JobContext):
+    job.report_progress("Loading the data tables...")
+    processor = GUIProcessor(folder_path)
+
+    job.report_progress("Loading the geometry meshes...")
+    geo_meshes = {}
+    geo_path = folder_path / "geometry"
+    if geo_path.is_dir():
+        for file in geo_path.iterdir():
+            if not file.is_file():
+                continue
+            if file.suffix not in [".stl", ".ply"]:
+                continue
+            geo_meshes[file.stem] = pv.read(file)
+
+    return processor, geo_meshes
+
+
+def calculate_grid(
+    input_data: InputData, decay_time, materials, job: JobContext
+) -> pv.StructuredGrid:
+    # Calculate the DataMeshActivity for the time and material
+    job.report_progress("Calculating the activity...")
+    try:
+        mesh_activity = input_data.get_mesh_activity_by_time_and_materials(
+            decay_time=decay_time,
+            materials=materials,
+        )
+    except ValueError:
+        # Create a dummy empty grid if no data for the mesh
+        return pv.StructuredGrid()
+
+    job.report_progress("Classifying the waste...")
+    mesh_activity = classify_waste(mesh_activity, input_data.isotope_criteria)
+
+    dataframe = mesh_activity.get_filtered_dataframe()
+    dataframe[KEY_R2S_INDICES] = dataframe.index.values
+    mesh_activity = DataMeshActivity(dataframe)
+
+    job.report_progress("Creating the grid...")
+    return create_grid(
+        data_mesh_info=input_data.data_mesh_info, data_mesh_activity=mesh_activity
+    )
@@ -0,0 +1,137 @@
+# pylint: disable=E1101
+import logging
+import traceback
+from typing import Any, Callable, Optional
+
+from qtpy import QtCore
+
+from f4e_radwaste.gui.job_generations import JobGenerations
+
+logger = logging.getLogger(__name__)
+
+# Kinds of job, a new job cancels the previous ones of the same kind
+JOB_LOAD_DATA_TABLES = "load data tables"
+JOB_UPDATE_GRID = "update grid"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when a newer job of the same kind has been started."""
+
+
+class JobContext:
+    """Given to the function of a job to report its progress and stop if cancelled."""
+
+    def __init__(self, runner: "JobRunner", kind: str, generation: int):
+        self._runner = runner
+        self.kind = kind
+        self.generation = generation
+
+    @property
+    def is_cancelled(self) -> bool:
+        return not self._runner.generations.is_last(self.kind, self.generation)
+
+    def report_progress(self, message: str):
+        """Raises JobCancelled if the job was superseded."""
+        if self.is_cancelled:
+            raise JobCancelled
+        self._runner.signals.progress.emit(self.kind, self.generation, message)
+
+
+class _JobSignals(QtCore.QObject):
+    # Kind and generation of the job, and the message or result
+    progress = QtCore.Signal(str, int, str)
+    finished = QtCore.Signal(str, int, object)
+    failed = QtCore.Signal(str, int, str)
+
+
+class _Job(QtCore.QRunnable):
+    def __init__(self, function: Callable[[JobContext], Any], context: JobContext):
+        super().__init__()
+        self.function = function
+        self.context = context
+
+    def run(self):
+        signals = self.context._runner.signals
+        kind, generation = self.context.kind, self.context.generation
+        try:
+            # Jobs superseded while waiting in the queue are not started
+            if self.context.is_cancelled:
+                return
+            result = self.function(self.context)
+        except JobCancelled:
+            return
+        except Exception:  # noqa: the error is shown in the GUI
+            signals.failed.emit(kind, generation, traceback.format_exc())
+            return
+
+        signals.finished.emit(kind, generation, result)
+
+
+class JobRunner(QtCore.QObject):
+    """
+    Runs the slow calculations of the GUI in a background thread, one at a time.
+    The callbacks are called in the main thread, only for the last job of each kind.
+    """
+
+    def __init__(self, show_message: Callable[[str], None]):
+        super().__init__()
+        self.show_message = show_message
+        self._thread_pool = QtCore.QThreadPool()
+        # A single thread, the jobs share the input data and the HDF5 files
+        self._thread_pool.setMaxThreadCount(1)
+        self.generations = JobGenerations()
+
+        # The signals are emitted in the background thread, the slots of this object
+        # are called in the main thread as it lives there
+        self.signals = _JobSignals()
+        self.signals.progress.connect(self._job_progressed)
+        self.signals.finished.connect(self._job_finished)
+        self.signals.failed.connect(self._job_failed)
+
+    def start(
+        self,
+        kind: str,
+        function: Callable[[JobContext], Any],
+        on_finished: Callable[[Any], None],
+    ):
+        """
+        Runs function(context) in the background and on_finished(result) in the main
+        thread. The jobs of the same kind started before are cancelled.
+        """
+        generation = self.generations.start(kind, on_finished)
+        self._thread_pool.start(_Job(function, JobContext(self, kind, generation)))
+
+    def cancel(self, kind: str):
+        """The running and queued jobs of the kind finish without calling back."""
+        self.generations.cancel(kind)
+
+    def wait_for_done(self, timeout_ms: Optional[int] = None):
+        """
+        Blocks until the jobs finish and calls their callbacks, for the actions that
+        need the last results.
+        """
+        if timeout_ms is None:
+            self._thread_pool.waitForDone()
+        else:
+            self._thread_pool.waitForDone(timeout_ms)
+        QtCore.QCoreApplication.processEvents()
+
+    @QtCore.Slot(str, int, str)
+    def _job_progressed(self, kind: str, generation: int, message: str):
+        if self.generations.is_last(kind, generation):
+            self.show_message(message)
+
+    @QtCore.Slot(str, int, object)
+    def _job_finished(self, kind: str, generation: int, result: Any):
+        on_finished = self.generations.pop_callback(kind, generation)
+        if on_finished is None:
+            return
+        self.show_message("Ready")
+        on_finished(result)
+
+    @QtCore.Slot(str, int, str)
+    def _job_failed(self, kind: str, generation: int, error_traceback: str):
+        # Also logged when cancelled, the error would be hidden otherwise
+        logger.error("The %s job failed:\n%s", kind, error_traceback)
+        if self.generations.pop_callback(kind, generation) is not None:
+            self.show_message(f"Error: {error_traceback.strip().splitlines()[-1]}")
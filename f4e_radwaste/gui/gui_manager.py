@@ -1,28 +1,38 @@
-from pathlib import Path
 from typing import Optional
 import pyvista as pv
 
+from f4e_radwaste.gui.grid_cache import DEFAULT_MAX_BYTES, GridCache
 from f4e_radwaste.gui.gui_functions import GUIFunctions
+from f4e_radwaste.gui.gui_jobs import JobRunner
 from f4e_radwaste.gui.gui_processor import GUIProcessor
 from f4e_radwaste.gui.main_window import MainWindowGUI
 
 
 class GUIManager:
-    def __init__(self):
+    def __init__(self, grid_cache_max_bytes: int = DEFAULT_MAX_BYTES):
         self.processor: Optional[GUIProcessor] = None
 
         self.grid: pv.StructuredGrid = pv.StructuredGrid()
         self.geo_meshes: dict[str, pv.DataSet] = {}
+        # Arrays of the grids already calculated, by decay time and materials
+        self.grid_cache: GridCache = GridCache(max_bytes=grid_cache_max_bytes)
 
         self.functions: GUIFunctions = GUIFunctions(manager=self)
         self.main_window: MainWindowGUI = MainWindowGUI(manager=self)
+        self.jobs: JobRunner = JobRunner(
+            show_message=self.main_window.statusBar().showMessage
+        )
 
     def start(self):
         self.functions.active = True
         self.main_window.start()
 
-    def load_new_data_processor(self, data_tables_folder_path: Path):
-        self.processor = GUIProcessor(data_tables_folder_path)
+    def set_loaded_data(
+        self, processor: GUIProcessor, geo_meshes: dict[str, pv.DataSet]
+    ):
+        self.processor = processor
+        self.geo_meshes = geo_meshes
+        self.grid_cache.clear()
 
 
 if __name__ == "__main__":
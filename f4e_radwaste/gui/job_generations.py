@@ -0,0 +1,38 @@
+from typing import Any, Callable, Dict, Optional
+
+JobCallback = Callable[[Any], None]
+
+
+class JobGenerations:
+    """
+    Generation of the last job started of each kind and its callback. A job whose
+    generation is not the last one of its kind has been cancelled, its result is
+    discarded.
+    """
+
+    def __init__(self):
+        self._generations: Dict[str, int] = {}
+        self._callbacks: Dict[str, JobCallback] = {}
+
+    def get(self, kind: str) -> int:
+        return self._generations.get(kind, 0)
+
+    def start(self, kind: str, on_finished: JobCallback) -> int:
+        """Returns the generation of the new job, the previous ones are cancelled."""
+        generation = self.get(kind) + 1
+        self._generations[kind] = generation
+        self._callbacks[kind] = on_finished
+        return generation
+
+    def cancel(self, kind: str):
+        self._generations[kind] = self.get(kind) + 1
+        self._callbacks.pop(kind, None)
+
+    def is_last(self, kind: str, generation: int) -> bool:
+        return self.get(kind) == generation
+
+    def pop_callback(self, kind: str, generation: int) -> Optional[JobCallback]:
+        """Returns the callback of the job once, None if it was cancelled."""
+        if not self.is_last(kind, generation):
+            return None
+        return self._callbacks.pop(kind, None)
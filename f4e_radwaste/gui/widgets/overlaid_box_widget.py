@@ -1,5 +1,6 @@
 # pylint: disable=E1101
 from enum import Enum, auto
+from typing import Optional
 
 import pyvista as pv
 from qtpy import QtWidgets
@@ -9,6 +10,7 @@ from f4e_radwaste.gui.widgets.custom_box_loaded_widget import (
     CustomBoxLoadedWidget,
 )
 from f4e_radwaste.gui.widgets.no_box_loaded_widget import no_box_loaded_widget
+from f4e_radwaste.post_processing.package_evaluation import PackageBox
 
 
 class WindowKeys(Enum):
@@ -27,6 +29,8 @@ class OverlaidBoxWidget(QtWidgets.QWidget):
     def __init__(self, parent, manager):
         super().__init__(parent=parent)
         self.box_grid = pv.StructuredGrid()
+        # Parameters of the generated box, None for the boxes loaded from STL files
+        self.package_box: Optional[PackageBox] = None
         self.setLayout(QtWidgets.QHBoxLayout())
         self._sub_windows = {
             WindowKeys.NO_BOX_LOADED: no_box_loaded_widget(manager=manager),
@@ -82,19 +86,11 @@ class OverlaidBoxWidget(QtWidgets.QWidget):
             box_generated_widget.rot_y.value(),
             box_generated_widget.rot_z.value(),
         )
-        self.box_grid = pv.Box(
-            (
-                origin[0],
-                origin[0] + size[0],
-                origin[1],
-                origin[1] + size[1],
-                origin[2],
-                origin[2] + size[2],
-            )
+        self.package_box = PackageBox(
+            name="Box", origin=origin, size=size, rotation=rotation
         )
-        self.box_grid.rotate_x(rotation[0], inplace=True)
-        self.box_grid.rotate_y(rotation[1], inplace=True)
-        self.box_grid.rotate_z(rotation[2], inplace=True)
+        self.box_grid = self.package_box.create_mesh()
 
     def load_stl_as_box(self, stl_file_path):
+        self.package_box = None
         self.box_grid = pv.read(stl_file_path)
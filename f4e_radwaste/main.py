@@ -1,10 +1,11 @@
 from pathlib import Path
-from typing import Type
+from typing import Type, Union
 
 from f4e_radwaste.post_processing.post_processing import (
     StandardProcessor,
     ByComponentProcessor,
     FilteredProcessor,
+    StreamingProcessor,
 )
 
 
@@ -20,8 +21,12 @@ def by_component_process(input_path: Path) -> None:
     load_and_process_folder(input_path, ByComponentProcessor)
 
 
+def streaming_process(input_path: Path) -> None:
+    load_and_process_folder(input_path, StreamingProcessor)
+
+
 def load_and_process_folder(
-    input_path: Path, processor_type: Type[StandardProcessor]
+    input_path: Path, processor_type: Type[Union[StandardProcessor, StreamingProcessor]]
 ) -> None:
     processor = processor_type(input_path)
     processor.process()
@@ -1,6 +1,8 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 import numpy as np
+import pandas as pd
 import pyvista as pv
 
 from f4e_radwaste.constants import CoordinateType
@@ -11,20 +13,12 @@ from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
 def create_grid(
     data_mesh_info: DataMeshInfo, data_mesh_activity: Optional[DataMeshActivity] = None
 ) -> pv.StructuredGrid:
-    if data_mesh_info.coordinates is CoordinateType.CARTESIAN:
-        grid = create_cartesian_grid(
-            vector_i=data_mesh_info.vector_i,
-            vector_j=data_mesh_info.vector_j,
-            vector_k=data_mesh_info.vector_k,
-        )
-    else:
-        grid = create_cylindrical_grid(
-            vector_i=data_mesh_info.vector_i,
-            vector_j=data_mesh_info.vector_j,
-            vector_k_revolutions=data_mesh_info.vector_k,
-            origin=data_mesh_info.origin,
-            axis=data_mesh_info.axis,
-        )
+    """
+    The geometry of each mesh is built once and shared by all the grids created from
+    it, the points of the returned grid should not be modified in place.
+    """
+    grid_geometry, _voxel_indices = _get_grid_geometry(_get_mesh_key(data_mesh_info))
+    grid = grid_geometry.copy(deep=False)
 
     if data_mesh_activity is not None:
         insert_data_to_grid(data_mesh_activity, data_mesh_info, grid)
@@ -37,12 +31,119 @@ def insert_data_to_grid(
     data_mesh_info: DataMeshInfo,
     grid: pv.StructuredGrid,
 ):
-    dataframe = data_mesh_activity.get_filtered_dataframe()
+    dataframes = data_mesh_activity.get_unjoined_dataframes()
+
+    # Rows of the tables in the order of the grid cells, -1 for the empty voxels
+    _grid_geometry, voxel_indices = _get_grid_geometry(_get_mesh_key(data_mesh_info))
+    rows = dataframes[1].index.get_indexer(voxel_indices)
+    _insert_columns_to_grid(dataframes, rows, grid)
+
+
+def create_sparse_grid(
+    data_mesh_info: DataMeshInfo, data_mesh_activity: DataMeshActivity
+) -> pv.UnstructuredGrid:
+    """
+    Creates a grid with only the cells of the voxels in data_mesh_activity, much
+    smaller than the one of create_grid when most of the voxels are empty.
+    """
+    grid_geometry, voxel_indices = _get_grid_geometry(_get_mesh_key(data_mesh_info))
+    dataframes = data_mesh_activity.get_unjoined_dataframes()
+
+    # The extracted cells keep the order of the grid
+    rows = dataframes[1].index.get_indexer(voxel_indices)
+    cell_ids = np.flatnonzero(rows >= 0)
+    grid = grid_geometry.extract_cells(cell_ids)
+    grid.clear_data()
+
+    _insert_columns_to_grid(dataframes, rows[cell_ids], grid)
+
+    return grid
+
+
+def _insert_columns_to_grid(
+    dataframes: Tuple[pd.DataFrame, ...], rows: np.ndarray, grid: pv.DataSet
+):
+    """
+    Sets the columns of each dataframe, taken at the given rows, as cell data of the
+    grid. The negative rows are voxels without data and are set to 0. The columns
+    are taken one at a time, the tables are never joined nor reindexed as a whole.
+    """
+    is_empty = rows < 0
+    for dataframe in dataframes:
+        for column_name, column in dataframe.items():
+            values = column.to_numpy()
+            if is_empty.any():
+                cell_values = np.zeros(len(rows), dtype=values.dtype)
+                cell_values[~is_empty] = values[rows[~is_empty]]
+            else:
+                cell_values = values[rows]
+            grid[str(column_name)] = cell_values
+
+
+def get_voxel_ids_of_grid_cells(data_mesh_info: DataMeshInfo) -> np.ndarray:
+    """Returns the voxel id of each cell of the grids of create_grid."""
+    _grid_geometry, voxel_indices = _get_grid_geometry(_get_mesh_key(data_mesh_info))
+    return voxel_indices.copy()
+
+
+def get_cell_centers(data_mesh_info: DataMeshInfo) -> np.ndarray:
+    """
+    Returns the center of each cell of the grids of create_grid, calculated once for
+    each mesh. The array is shared and should not be modified.
+    """
+    return _get_cell_centers(_get_mesh_key(data_mesh_info))
+
+
+# Key of a mesh: (coordinates, vector_i, vector_j, vector_k, origin, axis)
+MeshKey = Tuple[CoordinateType, Tuple, Tuple, Tuple, Optional[Tuple], Optional[Tuple]]
+
+
+def _get_mesh_key(data_mesh_info: DataMeshInfo) -> MeshKey:
+    def to_tuple(vector: Optional[np.ndarray]) -> Optional[Tuple]:
+        return None if vector is None else tuple(np.asarray(vector).tolist())
+
+    return (
+        data_mesh_info.coordinates,
+        to_tuple(data_mesh_info.vector_i),
+        to_tuple(data_mesh_info.vector_j),
+        to_tuple(data_mesh_info.vector_k),
+        to_tuple(data_mesh_info.origin),
+        to_tuple(data_mesh_info.axis),
+    )
+
 
-    # Order the dataframe so the indices of it match the grid cell indices
-    ints_vector_i = len(data_mesh_info.vector_i) - 1
-    ints_vector_j = len(data_mesh_info.vector_j) - 1
-    ints_vector_k = len(data_mesh_info.vector_k) - 1
+@lru_cache(maxsize=4)
+def _get_grid_geometry(mesh_key: MeshKey) -> Tuple[pv.StructuredGrid, np.ndarray]:
+    """
+    Returns the grid of the mesh without data and the voxel index of each grid cell.
+    """
+    coordinates, vector_i, vector_j, vector_k, origin, axis = mesh_key
+    vector_i, vector_j, vector_k = (
+        np.array(vector_i),
+        np.array(vector_j),
+        np.array(vector_k),
+    )
+    origin = None if origin is None else np.array(origin)
+    axis = None if axis is None else np.array(axis)
+
+    if coordinates is CoordinateType.CARTESIAN:
+        grid = create_cartesian_grid(
+            vector_i=vector_i,
+            vector_j=vector_j,
+            vector_k=vector_k,
+        )
+    else:
+        grid = create_cylindrical_grid(
+            vector_i=vector_i,
+            vector_j=vector_j,
+            vector_k_revolutions=vector_k,
+            origin=origin,
+            axis=axis,
+        )
+
+    ints_vector_i = len(vector_i) - 1
+    ints_vector_j = len(vector_j) - 1
+    ints_vector_k = len(vector_k) - 1
     len_index = ints_vector_i * ints_vector_j * ints_vector_k
 
     indices = np.arange(len_index).reshape(
@@ -50,7 +151,7 @@ def insert_data_to_grid(
     )
     indices += 1
     indices = indices.swapaxes(0, 2)
-    if data_mesh_info.coordinates == CoordinateType.CYLINDRICAL:
+    if coordinates == CoordinateType.CYLINDRICAL:
         # If the grid was extended in the thetas the values should be repeated
         extended = grid.n_cells // len_index
         if extended > 1:
@@ -59,11 +160,13 @@ def insert_data_to_grid(
         # For cylindrical the order is Z-THETA-R
         indices = indices.swapaxes(0, 1)
 
-    indices = indices.ravel()
-    dataframe = dataframe.reindex(indices, fill_value=0)
+    return grid, indices.ravel()
+
 
-    for column_name, column in dataframe.items():
-        grid[str(column_name)] = column
+@lru_cache(maxsize=4)
+def _get_cell_centers(mesh_key: MeshKey) -> np.ndarray:
+    grid_geometry, _voxel_indices = _get_grid_geometry(mesh_key)
+    return np.asarray(grid_geometry.cell_centers().points)
 
 
 def create_cartesian_grid(vector_i, vector_j, vector_k) -> pv.StructuredGrid:
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Union
 
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import (
@@ -24,70 +25,119 @@ class DoseCalculator:
         )
         self.concrete_cdr_factors: pd.Series = df["0"]
 
+        # Proportion of each element (columns) in each material id (rows)
+        self.element_mix_matrix = pd.DataFrame(
+            self.element_mix_by_material_id or {}, dtype=float
+        ).T.fillna(0.0)
+
     def calculate_doses(
-        self, comp_activity: DataMeshActivity, cdr_factor_columns: List[pd.Series]
+        self,
+        comp_activity: DataMeshActivity,
+        cdr_factor_columns: Union[List[pd.Series], pd.Series],
     ) -> DataMeshActivity:
-        activity_df = comp_activity.get_filtered_dataframe()
+        """
+        The CDR factors are given for each row of comp_activity, or as a single Series
+        when all the rows share them.
+        """
+        # The result columns have no dose factors, only the activity is needed
+        _result_columns, activity_df = comp_activity.get_unjoined_dataframes()
 
         dose_1m_column = (activity_df * self.dose_1_m_factors).sum(axis=1)
 
         cdr_column = self._calculate_cdr_values(activity_df, cdr_factor_columns)
 
-        updated_df = comp_activity.get_dataframe_with_added_columns(
+        return comp_activity.with_added_columns(
             {KEY_DOSE_1_METER: dose_1m_column, KEY_CDR: cdr_column}
         )
-        return DataMeshActivity(updated_df)
 
     @staticmethod
     def _calculate_cdr_values(
-        activity_df: pd.DataFrame, cdr_factor_columns: List[pd.Series]
+        activity_df: pd.DataFrame,
+        cdr_factor_columns: Union[List[pd.Series], pd.Series],
     ) -> pd.Series:
-        cdr_values = []
+        if isinstance(cdr_factor_columns, pd.Series):
+            isotopes = activity_df.columns.intersection(
+                cdr_factor_columns.index, sort=False
+            )
+            factors = cdr_factor_columns.reindex(isotopes).to_numpy(dtype=float)
+        elif len(cdr_factor_columns) == 0:
+            return pd.Series(index=activity_df.index, dtype=float)
+        else:
+            # Align the factors of every row at once in a (rows x isotopes) matrix
+            first_index = cdr_factor_columns[0].index
+            if all(factors.index.equals(first_index) for factors in cdr_factor_columns):
+                stacked_factors = pd.DataFrame(
+                    np.column_stack(
+                        [
+                            factors.to_numpy(dtype=float)
+                            for factors in cdr_factor_columns
+                        ]
+                    ),
+                    index=first_index,
+                )
+            else:
+                stacked_factors = pd.concat(
+                    cdr_factor_columns, axis=1, ignore_index=True
+                )
+            isotopes = activity_df.columns.intersection(
+                stacked_factors.index, sort=False
+            )
+            factors = stacked_factors.reindex(isotopes).to_numpy(dtype=float).T
 
-        for (_, row), cdr_factors in zip(activity_df.iterrows(), cdr_factor_columns):
-            cdr_values.append((row * cdr_factors).sum())
+        # Row-wise dot product, missing activities or factors are skipped like in
+        # the sum of a Series
+        activities = activity_df[isotopes].to_numpy(dtype=float)
+        cdr_values = np.nansum(activities * factors, axis=1)
 
         return pd.Series(index=activity_df.index, data=cdr_values)
 
     def calculate_doses_in_concrete(
         self, comp_activity: DataMeshActivity
     ) -> DataMeshActivity:
-        cdr_factor_columns = [self.concrete_cdr_factors] * comp_activity.n_rows
-
-        return self.calculate_doses(comp_activity, cdr_factor_columns)
+        return self.calculate_doses(comp_activity, self.concrete_cdr_factors)
 
     def calculate_cdr_factors_list(
-        self, material_id_proportions: List[pd.Series]
+        self, material_id_proportions: Union[List[pd.Series], pd.DataFrame]
     ) -> List[pd.Series]:
-        element_mixes = self._calculate_element_mixes(material_id_proportions)
-
-        cdr_factors = []
-        for element_mix in element_mixes:
-            cdr_factors.append((self.cdr_factors * element_mix).sum(axis=1))
-
-        return cdr_factors
-
-    def _calculate_element_mixes(self, material_id_proportions: List[pd.Series]):
-        element_mixes = []
-
-        for mat_id_proportion in material_id_proportions:
-            proportioned_mixes = []
-
-            for mat_id, proportion in mat_id_proportion.items():
-                if mat_id not in self.element_mix_by_material_id:
-                    continue
-
-                # noinspection PyTypeChecker
-                proportioned_mixes.append(
-                    self.element_mix_by_material_id[mat_id] * proportion
-                )
-
-            if len(proportioned_mixes) == 0:
-                element_mixes.append(pd.Series())
-                continue
-
-            element_mix = pd.concat(proportioned_mixes, axis=1)
-            element_mix = element_mix.sum(axis=1)
-            element_mixes.append(element_mix)
+        """
+        The proportions of each material id are given as a list of Series or as a
+        (rows x material ids) table.
+        """
+        if not isinstance(material_id_proportions, pd.DataFrame):
+            material_id_proportions = pd.DataFrame(list(material_id_proportions))
+
+        cdr_factors = self.calculate_cdr_factors_matrix(material_id_proportions)
+
+        # All the Series share the index so calculate_doses does not align them
+        return [
+            pd.Series(row_factors, index=cdr_factors.columns)
+            for row_factors in cdr_factors.to_numpy()
+        ]
+
+    def calculate_cdr_factors_matrix(
+        self, material_id_proportions: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Calculates the CDR factors (rows x isotopes) of the (rows x material ids)
+        proportions.
+        """
+        element_mixes = self.calculate_element_mix_matrix(material_id_proportions)
+        element_mixes = element_mixes.reindex(
+            columns=self.cdr_factors.columns, fill_value=0.0
+        )
 
-        return element_mixes
+        # Missing factors do not contribute, like in the sum of a Series
+        return element_mixes @ self.cdr_factors.fillna(0.0).T
+
+    def calculate_element_mix_matrix(
+        self, material_id_proportions: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Calculates the element mixes (rows x elements) of the (rows x material ids)
+        proportions. Material ids without element mix are ignored.
+        """
+        proportions = material_id_proportions.reindex(
+            columns=self.element_mix_matrix.index, fill_value=0.0
+        ).fillna(0.0)
+
+        return proportions @ self.element_mix_matrix
@@ -1,3 +1,9 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import (
@@ -13,42 +19,126 @@ from f4e_radwaste.constants import (
 from f4e_radwaste.data_formats.data_isotope_criteria import DataIsotopeCriteria
 from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
 
+# Rows of the tables classified at once to calculate the IRAS, bounds the memory used
+ROWS_PER_IRAS_CHUNK = 4096
+
+# Layouts of columns kept by each classifier, the least recently used is dropped
+MAX_CACHED_LAYOUTS = 32
+
+# Classifier of each DataIsotopeCriteria, dropped together with the criteria
+_classifiers: "WeakKeyDictionary[DataIsotopeCriteria, WasteClassifier]" = (
+    WeakKeyDictionary()
+)
+
 
 def classify_waste(
     data_mesh_activity: DataMeshActivity, isotope_criteria: DataIsotopeCriteria
 ) -> DataMeshActivity:
-    # Get the activity of all isotopes
-    all_isotopes_activity = data_mesh_activity.get_filtered_dataframe(
-        columns=isotope_criteria.all_isotopes_names
-    )
-
-    # Calculate radwaste relevant parameters
-    iras = (all_isotopes_activity / (10**isotope_criteria.tfa_class)).sum(axis=1)
-    lma_exceeded = all_isotopes_activity.ge(isotope_criteria.lma).sum(axis=1)
-    total_specific_activity = all_isotopes_activity.sum(axis=1)
-
-    # Calculate radwaste class
-    mask_iras_exceeded = iras >= 1
-    mask_lma_exceeded = lma_exceeded >= 1
-    radwaste_class = pd.Series(data=TYPE_TFA_INT, index=iras.index)
-    radwaste_class[mask_iras_exceeded] = TYPE_A_INT
-    radwaste_class[mask_iras_exceeded * mask_lma_exceeded] = TYPE_B_INT
-
-    # Get the activity of relevant isotopes (have a TFA class)
-    relevant_isotopes_activity = data_mesh_activity.get_filtered_dataframe(
-        columns=isotope_criteria.relevant_isotopes_names
-    )
-    total_relevant_activity = relevant_isotopes_activity.sum(axis=1)
-
-    # Assign names to the new series and merge them into a new dataframe
-    classified_dataframe = data_mesh_activity.get_dataframe_with_added_columns(
-        {
-            KEY_RADWASTE_CLASS: radwaste_class,
-            KEY_IRAS: iras,
-            KEY_LMA: lma_exceeded,
-            KEY_TOTAL_SPECIFIC_ACTIVITY: total_specific_activity,
-            KEY_RELEVANT_SPECIFIC_ACTIVITY: total_relevant_activity,
-        }
-    )
-
-    return DataMeshActivity(classified_dataframe)
+    classifier = _classifiers.get(isotope_criteria)
+    if classifier is None:
+        classifier = WasteClassifier(isotope_criteria)
+        _classifiers[isotope_criteria] = classifier
+
+    return classifier.classify(data_mesh_activity)
+
+
+class WasteClassifier:
+    """
+    Classifies DataMeshActivity tables with the criteria of the isotopes. The criteria
+    are aligned once for each layout of columns and reused by the following tables.
+    """
+
+    def __init__(self, isotope_criteria: DataIsotopeCriteria):
+        self._isotopes = pd.Index(isotope_criteria.all_isotopes_names)
+        self._tfa_limits = (10**isotope_criteria.tfa_class).to_numpy(dtype=float)
+        self._lma = isotope_criteria.lma.to_numpy(dtype=float)
+        self._relevant_isotopes = pd.Index(isotope_criteria.relevant_isotopes_names)
+        self._layouts: OrderedDict[Tuple, _ColumnLayout] = OrderedDict()
+
+    def classify(self, data_mesh_activity: DataMeshActivity) -> DataMeshActivity:
+        layout = self._get_layout(data_mesh_activity.columns)
+        dataframe = data_mesh_activity.get_filtered_dataframe(columns=layout.isotopes)
+
+        # Activity of all the isotopes with criteria by rows, in the order of the
+        # columns. It is the layout of the pandas blocks, so the sums are the same as
+        # the ones of DataFrame.sum(axis=1)
+        activities = np.ascontiguousarray(dataframe.to_numpy(dtype=float).T)
+        criteria_activities = activities[layout.criteria_order]
+
+        # Calculate radwaste relevant parameters
+        iras = self._calculate_iras(criteria_activities, layout)
+        lma_exceeded = np.count_nonzero(
+            criteria_activities >= layout.lma[:, None], axis=0
+        )
+        total_specific_activity = np.nansum(activities, axis=0)
+        total_relevant_activity = np.nansum(activities[layout.is_relevant], axis=0)
+
+        # Calculate radwaste class
+        mask_iras_exceeded = iras >= 1
+        mask_lma_exceeded = lma_exceeded >= 1
+        radwaste_class = np.full(len(iras), TYPE_TFA_INT, dtype=np.int64)
+        radwaste_class[mask_iras_exceeded] = TYPE_A_INT
+        radwaste_class[mask_iras_exceeded & mask_lma_exceeded] = TYPE_B_INT
+
+        # Add the results without copying the activity
+        index = dataframe.index
+        return data_mesh_activity.with_added_columns(
+            {
+                KEY_RADWASTE_CLASS: pd.Series(radwaste_class, index=index),
+                KEY_IRAS: pd.Series(iras, index=index),
+                KEY_LMA: pd.Series(lma_exceeded.astype(np.int64), index=index),
+                KEY_TOTAL_SPECIFIC_ACTIVITY: pd.Series(
+                    total_specific_activity, index=index
+                ),
+                KEY_RELEVANT_SPECIFIC_ACTIVITY: pd.Series(
+                    total_relevant_activity, index=index
+                ),
+            }
+        )
+
+    def _calculate_iras(
+        self, criteria_activities: np.ndarray, layout: "_ColumnLayout"
+    ) -> np.ndarray:
+        # Only the isotopes of the table are summed, in the order of the criteria
+        n_rows = criteria_activities.shape[1]
+        iras = np.empty(n_rows)
+        for start in range(0, n_rows, ROWS_PER_IRAS_CHUNK):
+            end = min(start + ROWS_PER_IRAS_CHUNK, n_rows)
+            terms = criteria_activities[:, start:end] / layout.tfa_limits[:, None]
+            # Missing terms do not count
+            np.nansum(terms, axis=0, out=iras[start:end])
+        return iras
+
+    def _get_layout(self, columns: pd.Index) -> "_ColumnLayout":
+        key = tuple(columns)
+        if key in self._layouts:
+            self._layouts.move_to_end(key)
+        else:
+            isotopes = columns[columns.isin(self._isotopes)]
+
+            # The criteria are applied in the order of the criteria isotopes
+            criteria_positions = self._isotopes.get_indexer(isotopes)
+            criteria_order = np.argsort(criteria_positions, kind="stable")
+            criteria_positions = criteria_positions[criteria_order]
+
+            self._layouts[key] = _ColumnLayout(
+                isotopes=list(isotopes),
+                criteria_order=criteria_order,
+                tfa_limits=self._tfa_limits[criteria_positions],
+                lma=self._lma[criteria_positions],
+                is_relevant=isotopes.isin(self._relevant_isotopes),
+            )
+            while len(self._layouts) > MAX_CACHED_LAYOUTS:
+                self._layouts.popitem(last=False)
+        return self._layouts[key]
+
+
+@dataclass
+class _ColumnLayout:
+    """Criteria of a WasteClassifier aligned to the columns of a table."""
+
+    isotopes: List[str]
+    criteria_order: np.ndarray
+    tfa_limits: np.ndarray
+    lma: np.ndarray
+    is_relevant: np.ndarray
@@ -1,5 +1,7 @@
 from typing import List
 
+import pandas as pd
+
 from f4e_radwaste.constants import (
     KEY_RADWASTE_CLASS,
     get_radwaste_class_str_from_int,
@@ -9,6 +11,7 @@ from f4e_radwaste.constants import (
     KEY_TOTAL_SPECIFIC_ACTIVITY,
     KEY_DOSE_1_METER,
     KEY_CDR,
+    KEY_VOXEL,
 )
 from f4e_radwaste.data_formats.data_isotope_criteria import DataIsotopeCriteria
 from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
@@ -47,3 +50,25 @@ class CollapsedData:
 
     def get_contact_dose_rate(self) -> float:
         return self.dataframe[KEY_CDR].values[0]
+
+
+def create_collapsed_activity(mass_and_activities: pd.DataFrame) -> DataMeshActivity:
+    """
+    Creates the DataMeshActivity of packages (rows) from their mass and the absolute
+    activity of each isotope. The isotopes without activity in any package are left
+    out, like in InputData.get_collapsed_activity.
+    """
+    package_masses = mass_and_activities[KEY_MASS_GRAMS]
+    activities = mass_and_activities.drop(columns=KEY_MASS_GRAMS)
+    activities = activities.loc[:, (activities > 0).any()]
+
+    # Calculate the specific activity in Bq/g, empty packages have no activity
+    specific_activities = activities.div(
+        package_masses.where(package_masses > 0), axis=0
+    ).fillna(0.0)
+
+    specific_activities.columns.name = None
+    specific_activities.index = pd.RangeIndex(len(specific_activities), name=KEY_VOXEL)
+    specific_activities.insert(0, KEY_MASS_GRAMS, package_masses.to_numpy())
+
+    return DataMeshActivity(specific_activities)
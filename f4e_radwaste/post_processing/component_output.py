@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
 from f4e_radwaste.post_processing.folder_paths import FolderPaths
+from f4e_radwaste.post_processing.output_options import OutputOptions
 
 
 @dataclass
@@ -9,6 +11,14 @@ class ComponentOutput:
     name: str
     data_mesh_activity: DataMeshActivity
 
-    def save(self, folder_paths: FolderPaths):
-        self.data_mesh_activity.to_csv(folder_paths.csv_results, self.name)
+    def save(
+        self, folder_paths: FolderPaths, output_options: Optional[OutputOptions] = None
+    ):
+        if output_options is None:
+            output_options = OutputOptions()
+
+        for table_format in output_options.table_formats:
+            self.data_mesh_activity.save_table(
+                folder_paths.csv_results, self.name, table_format
+            )
         print(f"{self.name} processed!")
@@ -1,6 +1,11 @@
-from typing import List
+from typing import List, Tuple
 
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import KEY_CELL, KEY_MATERIAL, KEY_MASS_GRAMS
 from f4e_radwaste.data_formats.data_mass import DataMass
+from f4e_radwaste.data_formats.dataframe_validator import get_values_of_sorted_pairs
 from f4e_radwaste.post_processing.calculate_dose_rates import DoseCalculator
 
 
@@ -13,7 +18,20 @@ class ComponentsInfo:
     ):
         self.names, self.cell_ids = zip(*component_ids)
 
-        mat_id_proportions = data_mass.calculate_material_id_proportions(self.cell_ids)
+        # Unique pairs (cell, component position) sorted by cell, a cell may belong
+        # to several components
+        pairs = np.unique(
+            [
+                (cell, component)
+                for component, cells in enumerate(self.cell_ids)
+                for cell in cells
+            ],
+            axis=0,
+        ).reshape(-1, 2)
+        self._pair_cells = pairs[:, 0].astype(np.int64)
+        self._pair_components = pairs[:, 1].astype(np.int64)
+
+        mat_id_proportions = self._calculate_material_id_proportions(data_mass)
 
         self.cdr_factors = dose_calculator.calculate_cdr_factors_list(
             material_id_proportions=mat_id_proportions
@@ -24,3 +42,33 @@ class ComponentsInfo:
 
     def get_all_cell_ids(self) -> List[int]:
         return list(set(sum(self.cell_ids, [])))
+
+    def get_components_of_cells(
+        self, cells: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the positions of the cells, repeated once per component of the cell,
+        and the component position of each of them. Cells out of every component are
+        dropped.
+        """
+        return get_values_of_sorted_pairs(
+            self._pair_cells, self._pair_components, cells
+        )
+
+    def _calculate_material_id_proportions(self, data_mass: DataMass) -> pd.DataFrame:
+        """Returns the mass proportion of each material id (columns) by component."""
+        dataframe = data_mass.get_filtered_dataframe()
+        rows, components = self.get_components_of_cells(
+            dataframe.index.get_level_values(KEY_CELL)
+        )
+        materials = dataframe.index.get_level_values(KEY_MATERIAL).to_numpy()[rows]
+
+        masses_by_material = (
+            pd.Series(dataframe[KEY_MASS_GRAMS].to_numpy()[rows])
+            .groupby([components, materials])
+            .sum()
+        )
+        component_masses = masses_by_material.groupby(level=0).transform("sum")
+        proportions = (masses_by_material / component_masses).unstack(fill_value=0.0)
+
+        return proportions.reindex(range(len(self.names)), fill_value=0.0)
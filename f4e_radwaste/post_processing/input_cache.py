@@ -0,0 +1,110 @@
+"""
+Cache of the parsed input files. The parsed data is stored in a binary format inside a
+cache folder and it is reused in later runs while the source file does not change.
+
+A source file is considered unchanged if its size and modification time are the ones
+stored in the cache. If only the modification time differs (e.g. the file was copied)
+the content hash of the file is compared before discarding the cached data.
+
+The entries of a previous version of the parsers or of the cached format are not
+used, CACHE_FORMAT_VERSION must be increased whenever any of them changes.
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Callable, TypeVar
+
+# Version of the parsers and of the format of the cached data
+CACHE_FORMAT_VERSION = 1
+
+FILENAME_FINGERPRINT = "fingerprint.json"
+HASH_ALGORITHM = "sha256"
+
+KEY_SIZE = "size"
+KEY_MTIME = "mtime_ns"
+KEY_CONTENT_HASH = "content_hash"
+
+T = TypeVar("T")
+
+
+def read_with_cache(
+    source_path: Path,
+    cache_folder_path: Path,
+    read_source: Callable[[], T],
+    save: Callable[[T, Path], None],
+    load: Callable[[Path], T],
+    options_key: str = "",
+) -> T:
+    """
+    Returns the data loaded from the cache if it is valid for the source file,
+    otherwise the source is read and the result stored in the cache. The
+    options_key identifies reading options that change the parsed data.
+    """
+    entry_path = cache_folder_path / get_cache_entry_name(source_path, options_key)
+
+    if is_cache_entry_valid(source_path, entry_path):
+        return load(entry_path)
+
+    data = read_source()
+    store_cache_entry(source_path, entry_path, data, save)
+    return data
+
+
+def get_cache_entry_name(source_path: Path, options_key: str = "") -> str:
+    # The cache folder may be shared by several input folders
+    entry_key = f"{source_path.resolve()}|{options_key}|v{CACHE_FORMAT_VERSION}"
+    path_hash = hashlib.sha1(entry_key.encode("utf-8")).hexdigest()
+    return f"{source_path.name}_{path_hash[:16]}"
+
+
+def is_cache_entry_valid(source_path: Path, entry_path: Path) -> bool:
+    fingerprint_path = entry_path / FILENAME_FINGERPRINT
+    if not fingerprint_path.is_file():
+        return False
+
+    with open(fingerprint_path, "r") as infile:
+        fingerprint = json.load(infile)
+
+    stat = source_path.stat()
+    if stat.st_size != fingerprint[KEY_SIZE]:
+        return False
+    if stat.st_mtime_ns == fingerprint[KEY_MTIME]:
+        return True
+    if calculate_content_hash(source_path) != fingerprint[KEY_CONTENT_HASH]:
+        return False
+
+    # Same content, store the new modification time to skip the hash next time
+    fingerprint[KEY_MTIME] = stat.st_mtime_ns
+    _write_fingerprint(fingerprint_path, fingerprint)
+    return True
+
+
+def store_cache_entry(
+    source_path: Path, entry_path: Path, data: T, save: Callable[[T, Path], None]
+):
+    if entry_path.is_dir():
+        shutil.rmtree(entry_path)
+    entry_path.mkdir(parents=True)
+
+    save(data, entry_path)
+
+    # The fingerprint is written last so an interrupted run leaves an invalid entry
+    stat = source_path.stat()
+    fingerprint = {
+        KEY_SIZE: stat.st_size,
+        KEY_MTIME: stat.st_mtime_ns,
+        KEY_CONTENT_HASH: calculate_content_hash(source_path),
+    }
+    _write_fingerprint(entry_path / FILENAME_FINGERPRINT, fingerprint)
+
+
+def calculate_content_hash(file_path: Path) -> str:
+    with open(file_path, "rb") as infile:
+        return hashlib.file_digest(infile, HASH_ALGORITHM).hexdigest()
+
+
+def _write_fingerprint(fingerprint_path: Path, fingerprint: dict):
+    with open(fingerprint_path, "w") as infile:
+        json.dump(fingerprint, infile)
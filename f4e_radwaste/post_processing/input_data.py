@@ -1,13 +1,16 @@
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Iterator, Optional, List, Tuple
 
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import (
     KEY_ABSOLUTE_ACTIVITY,
     KEY_VOXEL,
+    KEY_CELL,
     KEY_ISOTOPE,
     KEY_MASS_GRAMS,
+    KEY_MATERIAL,
 )
 from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
 from f4e_radwaste.data_formats.data_isotope_criteria import DataIsotopeCriteria
@@ -21,6 +24,7 @@ from f4e_radwaste.post_processing.component_output import ComponentOutput
 from f4e_radwaste.post_processing.components_info import ComponentsInfo
 from f4e_radwaste.post_processing.folder_paths import FolderPaths
 from f4e_radwaste.post_processing.mesh_ouput import MeshOutput
+from f4e_radwaste.post_processing.summed_area_table import SummedAreaTable
 
 
 @dataclass
@@ -30,7 +34,7 @@ class InputData:
     isotope_criteria: DataIsotopeCriteria
 
     def save_data_tables(self, folder_paths: FolderPaths):
-        self.data_absolute_activity.save_dataframe_to_hdf5(folder_paths.data_tables)
+        self.data_absolute_activity.save_partitioned_to_hdf5(folder_paths.data_tables)
         self.data_mesh_info.save(folder_paths.data_tables)
 
     def try_get_mesh_output_by_time_and_materials(
@@ -55,8 +59,18 @@ class InputData:
             name=create_name_by_time_and_materials(decay_time, materials),
             data_mesh_info=self.data_mesh_info,
             data_mesh_activity=data_mesh_activity,
+            decay_time=decay_time,
+            materials=materials,
         )
 
+    def try_get_mesh_activity_by_time_and_materials(
+        self, decay_time: float, materials: Optional[List[int]] = None
+    ) -> Optional[DataMeshActivity]:
+        try:
+            return self.get_mesh_activity_by_time_and_materials(decay_time, materials)
+        except ValueError:
+            return None
+
     def get_mesh_activity_by_time_and_materials(
         self, decay_time: float, materials: Optional[List[int]] = None
     ) -> DataMeshActivity:
@@ -78,17 +92,93 @@ class InputData:
         #  sum the absolute activity of those
         combined_activity = filtered_activity.groupby([KEY_VOXEL, KEY_ISOTOPE]).sum()
 
-        # Calculate the specific activity in Bq/g
-        voxel_specific_activity = combined_activity.div(voxel_masses, fill_value=0.0)
+        return create_data_mesh_activity(combined_activity, voxel_masses)
+
+    def iterate_mesh_outputs_by_material(
+        self, decay_time: float
+    ) -> Iterator[MeshOutput]:
+        """
+        Yields the same outputs as get_mesh_output_by_time_and_materials for each
+        material with activity, grouping the activity of the decay time only once.
+        """
+        for material, data_mesh_activity in self.iterate_mesh_activities_by_material(
+            decay_time
+        ):
+            data_mesh_activity = classify_waste(
+                data_mesh_activity, self.isotope_criteria
+            )
 
-        # Format the dataframe as DataMeshActivity
-        voxel_activity_dataframe = voxel_specific_activity.unstack(fill_value=0.0)
-        voxel_activity_dataframe.columns.name = None
+            yield MeshOutput(
+                name=create_name_by_time_and_materials(decay_time, [material]),
+                data_mesh_info=self.data_mesh_info,
+                data_mesh_activity=data_mesh_activity,
+                decay_time=decay_time,
+                materials=[material],
+            )
 
-        # Add the mass information to the dataframe
-        voxel_activity_dataframe.insert(0, KEY_MASS_GRAMS, voxel_masses)
+    def iterate_mesh_activities_by_material(
+        self, decay_time: float
+    ) -> Iterator[Tuple[int, DataMeshActivity]]:
+        data_mass = self.data_mesh_info.data_mass
+        activity = self.data_absolute_activity.get_filtered_dataframe(
+            decay_times=[decay_time]
+        )[KEY_ABSOLUTE_ACTIVITY]
 
-        return DataMeshActivity(voxel_activity_dataframe)
+        rows, materials = data_mass.get_materials_of_cells(
+            activity.index.get_level_values(KEY_CELL)
+        )
+        voxel_codes = activity.index.codes[activity.index.names.index(KEY_VOXEL)]
+        isotope_codes = activity.index.codes[activity.index.names.index(KEY_ISOTOPE)]
+        activity_by_material = (
+            pd.Series(activity.to_numpy()[rows])
+            .groupby([materials, voxel_codes[rows], isotope_codes[rows]])
+            .sum()
+        )
+
+        group_materials, group_voxels, group_isotopes = (
+            activity_by_material.index.get_level_values(level).to_numpy()
+            for level in range(3)
+        )
+        voxel_level = activity.index.levels[activity.index.names.index(KEY_VOXEL)]
+        isotope_level = activity.index.levels[activity.index.names.index(KEY_ISOTOPE)]
+
+        # Rows of the same material and voxel are summed in the same order as
+        # get_cells_and_masses_from_selection does for one material
+        mass_by_material = (
+            data_mass.get_filtered_dataframe()[KEY_MASS_GRAMS]
+            .groupby([KEY_MATERIAL, KEY_VOXEL])
+            .sum()
+        )
+        mass_materials = mass_by_material.index.get_level_values(KEY_MATERIAL)
+
+        for material in data_mass.materials:
+            start, end = np.searchsorted(group_materials, [material, material + 1])
+            if start == end:
+                continue
+
+            voxel_codes, voxels = _get_observed_level(
+                voxel_level, group_voxels[start:end]
+            )
+            isotope_codes, isotopes = _get_observed_level(
+                isotope_level, group_isotopes[start:end]
+            )
+            combined_activity = pd.Series(
+                activity_by_material.to_numpy()[start:end],
+                index=pd.MultiIndex(
+                    levels=[voxels, isotopes],
+                    codes=[voxel_codes, isotope_codes],
+                    names=[KEY_VOXEL, KEY_ISOTOPE],
+                    verify_integrity=False,
+                ),
+                name=KEY_ABSOLUTE_ACTIVITY,
+            )
+
+            mass_start, mass_end = mass_materials.searchsorted([material, material + 1])
+            voxel_masses = mass_by_material.iloc[mass_start:mass_end].droplevel(
+                KEY_MATERIAL
+            )
+
+            yield material, create_data_mesh_activity(combined_activity, voxel_masses)
 
     def get_collapsed_activity(
         self, decay_time: float, materials: List[int], voxels: List[int]
@@ -122,6 +212,41 @@ class InputData:
 
         return DataMeshActivity(voxel_activity_dataframe)
 
+    def get_summed_area_table(
+        self, decay_time: float, materials: Optional[List[int]] = None
+    ) -> SummedAreaTable:
+        """
+        Precomputes the sums of get_collapsed_activity for the boxes of voxels of a
+        Cartesian mesh.
+        """
+        voxel_values = self.get_voxel_mass_and_activities(decay_time, materials)
+        return SummedAreaTable(self.data_mesh_info, voxel_values)
+
+    def get_voxel_mass_and_activities(
+        self, decay_time: float, materials: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Returns the mass and the absolute activity of each isotope (columns) of the
+        voxels of the selection (rows).
+        """
+        data_mass = self.data_mesh_info.data_mass
+        selected_cells, voxel_masses = data_mass.get_cells_and_masses_from_selection(
+            materials
+        )
+
+        filtered_activity = self.data_absolute_activity.get_filtered_dataframe(
+            decay_times=[decay_time],
+            cells=selected_cells,
+        )[KEY_ABSOLUTE_ACTIVITY]
+
+        if filtered_activity.empty:
+            raise ValueError
+
+        voxel_activity = filtered_activity.groupby([KEY_VOXEL, KEY_ISOTOPE]).sum()
+        return pd.concat(
+            [voxel_masses.rename(KEY_MASS_GRAMS), voxel_activity.unstack()], axis=1
+        ).fillna(0.0)
+
     def get_component_output_by_time_and_ids(
         self,
         decay_time: float,
@@ -147,35 +272,64 @@ class InputData:
     def get_component_mesh_activity_by_time_and_ids(
         self, decay_time: float, components_info: ComponentsInfo
     ) -> DataMeshActivity:
-        component_series: List[pd.Series] = []
-        for component_name, cell_ids in components_info.get_components():
-            filtered_activity = self.data_absolute_activity.get_filtered_dataframe(
-                decay_times=[decay_time],
-                cells=cell_ids,
-            )[KEY_ABSOLUTE_ACTIVITY]
-
-            # A component may contain several voxels and cells, sum the absolute
-            # activity of those
-            combined_activity = filtered_activity.groupby([KEY_ISOTOPE]).sum()
-
-            # Calculate the specific activity in Bq/g
-            mass_of_component = self.data_mesh_info.data_mass.get_mass_from_cells(
-                cell_ids
-            )
-            voxel_specific_activity = combined_activity.div(
-                mass_of_component, fill_value=0.0
-            )
+        activity = self.data_absolute_activity.get_filtered_dataframe(
+            decay_times=[decay_time]
+        )[KEY_ABSOLUTE_ACTIVITY]
 
-            voxel_specific_activity.name = component_name
-            voxel_specific_activity[KEY_MASS_GRAMS] = mass_of_component
-            component_series.append(voxel_specific_activity)
+        rows, components = components_info.get_components_of_cells(
+            activity.index.get_level_values(KEY_CELL)
+        )
+        isotope_codes = activity.index.codes[activity.index.names.index(KEY_ISOTOPE)]
+        activity_by_component = (
+            pd.Series(activity.to_numpy()[rows])
+            .groupby([components, isotope_codes[rows]])
+            .sum()
+        )
 
-        # Prepare the dataframe for DataMeshActivity
-        activities = pd.concat(component_series, axis=1)
-        activities = activities.transpose()
+        group_components, group_isotopes = (
+            activity_by_component.index.get_level_values(level).to_numpy()
+            for level in range(2)
+        )
+        isotope_level = activity.index.levels[activity.index.names.index(KEY_ISOTOPE)]
+        isotope_codes, isotopes = _get_observed_level(isotope_level, group_isotopes)
+
+        # A component may contain several voxels and cells, sum their masses
+        data_mass = self.data_mesh_info.data_mass.get_filtered_dataframe()
+        mass_rows, mass_components = components_info.get_components_of_cells(
+            data_mass.index.get_level_values(KEY_CELL)
+        )
+        order = np.argsort(mass_components, kind="stable")
+        masses = data_mass[KEY_MASS_GRAMS].to_numpy()[mass_rows[order]]
+        n_components = len(components_info.names)
+        bounds = np.searchsorted(mass_components[order], np.arange(n_components + 1))
+        # Each slice is summed like Series.sum so the masses are identical to the ones
+        # of get_mass_from_cells
+        component_masses = np.array(
+            [masses[start:end].sum() for start, end in zip(bounds[:-1], bounds[1:])],
+            dtype=float,
+        )
+
+        # Calculate the specific activity in Bq/g, missing isotopes are NaN for now
+        specific_activities = np.full((n_components, len(isotopes)), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            specific_activities[group_components, isotope_codes] = (
+                activity_by_component.to_numpy() / component_masses[group_components]
+            )
+
+        # Sort the columns as if the table was built component by component: the
+        # isotopes of the first one, its mass and then the new isotopes of the others
+        is_first_appearance = np.unique(isotope_codes, return_index=True)[1]
+        first_components = group_components[is_first_appearance]
+        column_order = np.lexsort((np.arange(len(isotopes)), first_components))
+        mass_position = np.count_nonzero(first_components == 0)
+
+        activities = pd.DataFrame(
+            specific_activities[:, column_order],
+            index=pd.Index(list(components_info.names), name=KEY_VOXEL),
+            columns=list(isotopes[column_order]),
+        )
+        activities.insert(mass_position, KEY_MASS_GRAMS, component_masses)
         activities.fillna(0.0, inplace=True)
-        activities.index.name = KEY_VOXEL
-        activities.columns.name = None
 
         return DataMeshActivity(activities)
 
@@ -197,6 +351,44 @@ class InputData:
         self.data_mesh_info.data_mass = DataMass(filtered_data_mass_df)
 
 
+def _get_observed_level(
+    level: pd.Index, codes: np.ndarray
+) -> Tuple[np.ndarray, pd.Index]:
+    """Returns the codes and values of a level keeping only the observed values."""
+    observed_codes, new_codes = np.unique(codes, return_inverse=True)
+    observed_values = level[observed_codes]
+
+    # The level of a MultiIndex is usually sorted already
+    if not observed_values.is_monotonic_increasing:
+        order = observed_values.argsort()
+        new_code_of_old_code = np.empty(len(order), dtype=np.intp)
+        new_code_of_old_code[order] = np.arange(len(order))
+        observed_values = observed_values[order]
+        new_codes = new_code_of_old_code[new_codes]
+
+    return new_codes, observed_values
+
+
+def create_data_mesh_activity(
+    combined_activity: pd.Series, voxel_masses: pd.Series
+) -> DataMeshActivity:
+    """
+    Creates the DataMeshActivity from the absolute activity by voxel and isotope and
+    the mass of each voxel.
+    """
+    # Calculate the specific activity in Bq/g
+    voxel_specific_activity = combined_activity.div(voxel_masses, fill_value=0.0)
+
+    # Format the dataframe as DataMeshActivity
+    voxel_activity_dataframe = voxel_specific_activity.unstack(fill_value=0.0)
+    voxel_activity_dataframe.columns.name = None
+
+    # Add the mass information to the dataframe
+    voxel_activity_dataframe.insert(0, KEY_MASS_GRAMS, voxel_masses)
+
+    return DataMeshActivity(voxel_activity_dataframe)
+
+
 def create_name_by_time_and_materials(
     decay_time: float, materials: Optional[List[int]] = None
 ) -> str:
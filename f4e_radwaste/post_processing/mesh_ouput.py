@@ -1,9 +1,13 @@
 from dataclasses import dataclass
+from typing import List, Optional, Tuple
 
+from f4e_radwaste.constants import TableFormat, VtkFormat
 from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
 from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
-from f4e_radwaste.meshgrids import create_grid
+from f4e_radwaste.meshgrids import create_grid, create_sparse_grid
 from f4e_radwaste.post_processing.folder_paths import FolderPaths
+from f4e_radwaste.post_processing.output_options import OutputOptions
+from f4e_radwaste.vtkhdf_file import append_step_to_vtkhdf_file
 
 
 @dataclass
@@ -11,15 +15,60 @@ class MeshOutput:
     name: str
     data_mesh_info: DataMeshInfo
     data_mesh_activity: DataMeshActivity
+    # Needed only to save the output as a step of a time series
+    decay_time: Optional[float] = None
+    materials: Optional[List[int]] = None
 
-    def save(self, folder_paths: FolderPaths):
-        self.save_csv_tables(folder_paths)
-        self.save_as_vtk_file(folder_paths)
+    def save(
+        self, folder_paths: FolderPaths, output_options: Optional[OutputOptions] = None
+    ):
+        if output_options is None:
+            output_options = OutputOptions()
+
+        self.save_tables(folder_paths, output_options.table_formats)
+        self.save_as_vtk_file(folder_paths, output_options.vtk_format)
         print(f"{self.name} processed!")
 
-    def save_csv_tables(self, folder_paths: FolderPaths):
-        self.data_mesh_activity.to_csv(folder_paths.csv_results, self.name)
+    def save_tables(
+        self,
+        folder_paths: FolderPaths,
+        table_formats: Tuple[TableFormat, ...] = (TableFormat.CSV,),
+    ):
+        for table_format in table_formats:
+            self.data_mesh_activity.save_table(
+                folder_paths.csv_results, self.name, table_format
+            )
+
+    def save_as_vtk_file(
+        self, folder_paths: FolderPaths, vtk_format: VtkFormat = VtkFormat.STRUCTURED
+    ):
+        if vtk_format is VtkFormat.TIME_SERIES:
+            self.append_to_time_series_file(folder_paths)
+            return
+
+        if vtk_format is VtkFormat.UNSTRUCTURED:
+            grid = create_sparse_grid(self.data_mesh_info, self.data_mesh_activity)
+        else:
+            grid = create_grid(self.data_mesh_info, self.data_mesh_activity)
+        grid.save(f"{folder_paths.vtk_results}/{self.name}.{vtk_format.value}")
+
+    def append_to_time_series_file(self, folder_paths: FolderPaths):
+        """
+        The outputs of the same materials must be appended by increasing decay time.
+        """
+        if self.decay_time is None:
+            raise ValueError("The decay time is needed to save a time series")
 
-    def save_as_vtk_file(self, folder_paths: FolderPaths):
         grid = create_grid(self.data_mesh_info, self.data_mesh_activity)
-        grid.save(f"{folder_paths.vtk_results}/{self.name}.vts")
+        file_name = create_time_series_name(self.materials)
+        append_step_to_vtkhdf_file(
+            folder_paths.vtk_results / f"{file_name}.{VtkFormat.TIME_SERIES.value}",
+            grid,
+            self.decay_time,
+        )
+
+
+def create_time_series_name(materials: Optional[List[int]] = None) -> str:
+    if materials is None:
+        materials = "all_materials"
+    return f"Time series with materials {materials}"
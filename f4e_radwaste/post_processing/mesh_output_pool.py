@@ -0,0 +1,140 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, List, Optional, Tuple
+
+from f4e_radwaste.constants import VtkFormat
+from f4e_radwaste.data_formats.data_isotope_criteria import DataIsotopeCriteria
+from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
+from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
+from f4e_radwaste.post_processing.classify_waste import classify_waste
+from f4e_radwaste.post_processing.folder_paths import FolderPaths
+from f4e_radwaste.post_processing.input_data import create_name_by_time_and_materials
+from f4e_radwaste.post_processing.mesh_ouput import MeshOutput
+from f4e_radwaste.post_processing.output_options import OutputOptions
+
+# Tasks waiting per worker, limits the mesh activities held in memory
+PENDING_TASKS_PER_WORKER = 2
+
+# Inputs shared by all the tasks of a worker process
+_worker_data_mesh_info: Optional[DataMeshInfo] = None
+_worker_isotope_criteria: Optional[DataIsotopeCriteria] = None
+_worker_folder_paths: Optional[FolderPaths] = None
+_worker_output_options: Optional[OutputOptions] = None
+
+
+class MeshOutputPool:
+    """
+    Classifies and saves MeshOutputs in worker processes. The inputs common to all
+    the outputs are sent once to each worker, a task only carries its mesh activity.
+    The steps of the time series files are appended in this process, in the order
+    the outputs were submitted, and their workers only send back the classified
+    mesh activity.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        data_mesh_info: DataMeshInfo,
+        isotope_criteria: DataIsotopeCriteria,
+        folder_paths: FolderPaths,
+        output_options: Optional[OutputOptions] = None,
+    ):
+        if output_options is None:
+            output_options = OutputOptions()
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(data_mesh_info, isotope_criteria, folder_paths, output_options),
+        )
+        self._data_mesh_info = data_mesh_info
+        self._folder_paths = folder_paths
+        self._max_pending_tasks = PENDING_TASKS_PER_WORKER * workers
+        self._pending_tasks: Deque[Tuple[Future, float, Optional[List[int]]]] = deque()
+
+    def __enter__(self) -> "MeshOutputPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+    def submit(
+        self,
+        decay_time: float,
+        materials: Optional[List[int]],
+        data_mesh_activity: DataMeshActivity,
+    ):
+        while len(self._pending_tasks) >= self._max_pending_tasks:
+            self._finish_oldest_task()
+
+        future = self._executor.submit(
+            _classify_and_save, decay_time, materials, data_mesh_activity
+        )
+        self._pending_tasks.append((future, decay_time, materials))
+
+    def wait(self):
+        while self._pending_tasks:
+            self._finish_oldest_task()
+
+    def _finish_oldest_task(self):
+        future, decay_time, materials = self._pending_tasks.popleft()
+        # Raises the exception of the task if it failed
+        data_mesh_activity = future.result()
+        if data_mesh_activity is None:
+            return
+
+        output = MeshOutput(
+            name=create_name_by_time_and_materials(decay_time, materials),
+            data_mesh_info=self._data_mesh_info,
+            data_mesh_activity=data_mesh_activity,
+            decay_time=decay_time,
+            materials=materials,
+        )
+        output.append_to_time_series_file(self._folder_paths)
+        print(f"{output.name} processed!")
+
+
+def _initialize_worker(
+    data_mesh_info: DataMeshInfo,
+    isotope_criteria: DataIsotopeCriteria,
+    folder_paths: FolderPaths,
+    output_options: OutputOptions,
+):
+    global _worker_data_mesh_info, _worker_isotope_criteria, _worker_folder_paths
+    global _worker_output_options
+    _worker_data_mesh_info = data_mesh_info
+    _worker_isotope_criteria = isotope_criteria
+    _worker_folder_paths = folder_paths
+    _worker_output_options = output_options
+
+
+def _classify_and_save(
+    decay_time: float,
+    materials: Optional[List[int]],
+    data_mesh_activity: DataMeshActivity,
+) -> Optional[DataMeshActivity]:
+    """
+    Returns the classified mesh activity if the output still has to be appended to
+    its time series file.
+    """
+    data_mesh_activity = classify_waste(data_mesh_activity, _worker_isotope_criteria)
+
+    output = MeshOutput(
+        name=create_name_by_time_and_materials(decay_time, materials),
+        data_mesh_info=_worker_data_mesh_info,
+        data_mesh_activity=data_mesh_activity,
+        decay_time=decay_time,
+        materials=materials,
+    )
+
+    # Several workers cannot append to the same file
+    if _worker_output_options.vtk_format is VtkFormat.TIME_SERIES:
+        output.save_tables(_worker_folder_paths, _worker_output_options.table_formats)
+        return data_mesh_activity
+
+    output.save(_worker_folder_paths, _worker_output_options)
+    return None
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+from f4e_radwaste.constants import TableFormat, VtkFormat
+from f4e_radwaste.data_formats.table_writers import (
+    REQUIRED_PACKAGES,
+    is_table_format_available,
+)
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    # UNSTRUCTURED writes only the voxels with data of each output, TIME_SERIES
+    # appends each output to the file of its materials
+    vtk_format: VtkFormat = VtkFormat.STRUCTURED
+    # Every table is saved in each of the formats
+    table_formats: Tuple[TableFormat, ...] = (TableFormat.CSV,)
+
+    def __post_init__(self):
+        # Fail before processing instead of when the first table is saved
+        for table_format in self.table_formats:
+            if not is_table_format_available(table_format):
+                raise ImportError(
+                    f"The {table_format.name} tables need the package "
+                    f"{REQUIRED_PACKAGES[table_format]} installed"
+                )
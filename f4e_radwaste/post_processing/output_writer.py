@@ -0,0 +1,74 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Optional, Tuple, Union
+
+from f4e_radwaste.post_processing.component_output import ComponentOutput
+from f4e_radwaste.post_processing.folder_paths import FolderPaths
+from f4e_radwaste.post_processing.mesh_ouput import MeshOutput
+from f4e_radwaste.post_processing.output_options import OutputOptions
+
+# Size of the outputs waiting to be saved, limits the memory held by the writer
+MAX_BYTES_IN_FLIGHT = 512 * 2**20
+
+
+class OutputWriter:
+    """
+    Saves the outputs in a background thread while the next ones are calculated.
+    A single thread saves them in the order they were submitted, as the steps of the
+    time series files must be appended in order and HDF5 is not thread safe.
+    """
+
+    def __init__(
+        self,
+        folder_paths: FolderPaths,
+        output_options: Optional[OutputOptions] = None,
+        max_bytes_in_flight: int = MAX_BYTES_IN_FLIGHT,
+    ):
+        if output_options is None:
+            output_options = OutputOptions()
+
+        self.folder_paths = folder_paths
+        self.output_options = output_options
+        self.max_bytes_in_flight = max_bytes_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Outputs not saved yet, with their size in bytes
+        self._pending_saves: Deque[Tuple[Future, int]] = deque()
+        self._bytes_in_flight = 0
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+    def submit(self, output: Union[MeshOutput, ComponentOutput]):
+        n_bytes = output.data_mesh_activity.nbytes
+
+        # Wait until the output fits, an output larger than the limit is still saved
+        # when nothing else is pending
+        while (
+            self._pending_saves
+            and self._bytes_in_flight + n_bytes > self.max_bytes_in_flight
+        ):
+            self._finish_oldest_save()
+
+        future = self._executor.submit(
+            output.save, self.folder_paths, self.output_options
+        )
+        self._pending_saves.append((future, n_bytes))
+        self._bytes_in_flight += n_bytes
+
+    def flush(self):
+        """Waits until all the outputs are saved."""
+        while self._pending_saves:
+            self._finish_oldest_save()
+
+    def _finish_oldest_save(self):
+        future, n_bytes = self._pending_saves.popleft()
+        self._bytes_in_flight -= n_bytes
+        # Raises the exception of the save if it failed
+        future.result()
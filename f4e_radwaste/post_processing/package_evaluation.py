@@ -0,0 +1,329 @@
+"""
+Evaluation of many waste packages at once without the GUI. A package is a box like
+the ones of the GUI or a closed surface read from an STL file. The result of each
+package and decay time is the one shown by the GUI for it.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyvista as pv
+
+from f4e_radwaste.constants import (
+    KEY_TIME,
+    KEY_RADWASTE_CLASS,
+    KEY_MASS_GRAMS,
+    KEY_IRAS,
+    KEY_RELEVANT_SPECIFIC_ACTIVITY,
+    KEY_TOTAL_SPECIFIC_ACTIVITY,
+    KEY_DOSE_1_METER,
+    KEY_CDR,
+)
+from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
+from f4e_radwaste.data_formats.data_isotope_criteria import DataIsotopeCriteria
+from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
+from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
+from f4e_radwaste.meshgrids import get_cell_centers, get_voxel_ids_of_grid_cells
+from f4e_radwaste.post_processing.calculate_dose_rates import DoseCalculator
+from f4e_radwaste.post_processing.classify_waste import classify_waste
+from f4e_radwaste.post_processing.collapsed_data import (
+    CollapsedData,
+    create_collapsed_activity,
+)
+from f4e_radwaste.post_processing.input_data import InputData
+from f4e_radwaste.readers import isotope_criteria_file
+from f4e_radwaste.readers.dgs_file import DECAY_TIME_RELATIVE_TOLERANCE
+from f4e_radwaste.readers.dose_matrix_file import (
+    read_dose_1_m_factors,
+    read_contact_dose_rate_factors,
+)
+
+KEY_PACKAGE = "Package"
+KEY_ISOTOPES_EXCEEDING_LMA = "Isotopes exceeding LMA"
+
+# Results of a package without mass or activity of the selected materials
+EMPTY_PACKAGE_RESULTS = {
+    KEY_RADWASTE_CLASS: "",
+    KEY_MASS_GRAMS: np.nan,
+    KEY_IRAS: np.nan,
+    KEY_RELEVANT_SPECIFIC_ACTIVITY: np.nan,
+    KEY_TOTAL_SPECIFIC_ACTIVITY: np.nan,
+    KEY_DOSE_1_METER: np.nan,
+    KEY_CDR: np.nan,
+    KEY_ISOTOPES_EXCEEDING_LMA: "",
+}
+
+
+@dataclass(frozen=True)
+class PackageBox:
+    """
+    Box defined like in the GUI: the corner of the lowest coordinates, the size along
+    each axis and the rotation in degrees around the X, Y and Z axes through the
+    point (0, 0, 0), applied in that order.
+    """
+
+    name: str
+    origin: Tuple[float, float, float]
+    size: Tuple[float, float, float]
+    rotation: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+    def create_mesh(self) -> pv.PolyData:
+        origin, size = self.origin, self.size
+        box = pv.Box(
+            (
+                origin[0],
+                origin[0] + size[0],
+                origin[1],
+                origin[1] + size[1],
+                origin[2],
+                origin[2] + size[2],
+            )
+        )
+        box.rotate_x(self.rotation[0], inplace=True)
+        box.rotate_y(self.rotation[1], inplace=True)
+        box.rotate_z(self.rotation[2], inplace=True)
+        return box
+
+    def get_rotation_matrix(self) -> np.ndarray:
+        cos_x, cos_y, cos_z = np.cos(np.radians(self.rotation))
+        sin_x, sin_y, sin_z = np.sin(np.radians(self.rotation))
+        rotation_x = np.array([[1, 0, 0], [0, cos_x, -sin_x], [0, sin_x, cos_x]])
+        rotation_y = np.array([[cos_y, 0, sin_y], [0, 1, 0], [-sin_y, 0, cos_y]])
+        rotation_z = np.array([[cos_z, -sin_z, 0], [sin_z, cos_z, 0], [0, 0, 1]])
+        return rotation_z @ rotation_y @ rotation_x
+
+    def get_mask_points_inside(self, points: np.ndarray) -> np.ndarray:
+        # Coordinates of the points before the rotation of the box, the inverse of a
+        #  rotation matrix is its transpose
+        unrotated_points = np.asarray(points, dtype=float) @ self.get_rotation_matrix()
+
+        lower_corner = np.asarray(self.origin, dtype=float)
+        upper_corner = lower_corner + np.asarray(self.size, dtype=float)
+        inside = (unrotated_points >= lower_corner) & (unrotated_points <= upper_corner)
+        return inside.all(axis=1)
+
+
+def get_mask_points_inside_surface(
+    points: np.ndarray, surface: pv.PolyData
+) -> np.ndarray:
+    """The surface should be closed, like the ones of the STL files."""
+    selection = pv.PolyData(points).select_enclosed_points(surface)
+    return selection["SelectedPoints"].astype(bool)
+
+
+# A package is a box or the path to an STL file with a closed surface
+Package = Union[PackageBox, Path]
+
+
+def get_package_name(package: Package) -> str:
+    if isinstance(package, PackageBox):
+        return package.name
+    return Path(package).stem
+
+
+def evaluate_packages(
+    data_tables_folder: Path,
+    packages: Sequence[Package],
+    decay_times: Optional[Sequence[float]] = None,
+    materials: Optional[List[int]] = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Evaluates every package at every decay time (all of them by default) with the
+    selected materials (all of them by default). Returns a row for each package and
+    decay time with the same quantities as CollapsedData, empty if the package has
+    no mass or activity of the materials.
+    """
+    input_data = InputData(
+        DataAbsoluteActivity.load(data_tables_folder),
+        DataMeshInfo.load(data_tables_folder),
+        isotope_criteria_file.read_file(),
+    )
+    dose_calculator = DoseCalculator(
+        dose_1_m_factors=read_dose_1_m_factors(),
+        cdr_factors=read_contact_dose_rate_factors(),
+        element_mix_by_material_id={},
+    )
+
+    return evaluate_packages_of_input_data(
+        input_data, dose_calculator, packages, decay_times, materials, workers
+    )
+
+
+def evaluate_packages_of_input_data(
+    input_data: InputData,
+    dose_calculator: DoseCalculator,
+    packages: Sequence[Package],
+    decay_times: Optional[Sequence[float]] = None,
+    materials: Optional[List[int]] = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    if len(packages) == 0:
+        raise ValueError("No packages to evaluate")
+    package_names = [get_package_name(package) for package in packages]
+
+    available_decay_times = input_data.data_absolute_activity.decay_times
+    if decay_times is None:
+        decay_times = available_decay_times
+    decay_times = match_decay_times(decay_times, available_decay_times)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        voxels_by_package = get_voxels_inside_packages(
+            input_data.data_mesh_info, packages, executor
+        )
+
+        tables = []
+        for decay_time in decay_times:
+            try:
+                voxel_values = input_data.get_voxel_mass_and_activities(
+                    decay_time, materials
+                )
+            except ValueError:
+                # No activity of the materials at the decay time
+                table = pd.DataFrame([EMPTY_PACKAGE_RESULTS] * len(packages))
+            else:
+                package_sums = sum_voxel_values_by_package(
+                    voxel_values, voxels_by_package, executor
+                )
+                package_activity = create_collapsed_activity(package_sums)
+                package_activity = classify_waste(
+                    package_activity, input_data.isotope_criteria
+                )
+                package_activity = dose_calculator.calculate_doses_in_concrete(
+                    package_activity
+                )
+                table = create_package_results_table(
+                    package_activity, input_data.isotope_criteria
+                )
+
+            table.insert(0, KEY_TIME, decay_time)
+            table.insert(0, KEY_PACKAGE, package_names)
+            tables.append(table)
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def match_decay_times(
+    decay_times: Sequence[float], available_decay_times: Sequence[float]
+) -> List[float]:
+    """
+    Returns the closest available decay time to each one, they are the same if they
+    are equal within the tolerance used when the DGS files are read.
+    """
+    available_decay_times = np.asarray(available_decay_times, dtype=float)
+
+    matched_decay_times, missing_decay_times = [], []
+    for decay_time in decay_times:
+        is_close = np.isclose(
+            available_decay_times,
+            decay_time,
+            rtol=DECAY_TIME_RELATIVE_TOLERANCE,
+            atol=0.0,
+        )
+        if not is_close.any():
+            missing_decay_times.append(decay_time)
+            continue
+        differences = np.where(
+            is_close, np.abs(available_decay_times - decay_time), np.inf
+        )
+        matched_decay_times.append(float(available_decay_times[differences.argmin()]))
+
+    if missing_decay_times:
+        raise ValueError(
+            f"Decay times not found in the data tables: {missing_decay_times}"
+            f", the available ones are {available_decay_times.tolist()}"
+        )
+    return matched_decay_times
+
+
+def get_voxels_inside_packages(
+    data_mesh_info: DataMeshInfo,
+    packages: Sequence[Package],
+    executor: ThreadPoolExecutor,
+) -> List[np.ndarray]:
+    """
+    Returns the voxels of each package, a voxel is inside when the center of any of
+    its grid cells is inside.
+    """
+    # All the packages share the cell centers
+    center_points = get_cell_centers(data_mesh_info)
+    voxel_ids = get_voxel_ids_of_grid_cells(data_mesh_info)
+
+    # The VTK selection of the STL surfaces runs in this thread
+    stl_masks = {
+        position: get_mask_points_inside_surface(center_points, pv.read(package))
+        for position, package in enumerate(packages)
+        if not isinstance(package, PackageBox)
+    }
+
+    def get_voxels_inside(position: int) -> np.ndarray:
+        package = packages[position]
+        if isinstance(package, PackageBox):
+            mask = package.get_mask_points_inside(center_points)
+        else:
+            mask = stl_masks[position]
+        return np.unique(voxel_ids[mask])
+
+    return list(executor.map(get_voxels_inside, range(len(packages))))
+
+
+def sum_voxel_values_by_package(
+    voxel_values: pd.DataFrame,
+    voxels_by_package: List[np.ndarray],
+    executor: ThreadPoolExecutor,
+) -> pd.DataFrame:
+    """Sums the mass and activities (columns) of the voxels of each package (rows)."""
+    values = voxel_values.to_numpy(dtype=float)
+
+    # Row of each voxel id, -1 for the voxels without mass of the selected materials.
+    #  The threads only use numpy, the pandas indexes are not thread safe
+    voxel_ids = voxel_values.index.to_numpy(dtype=int)
+    max_voxel_id = max(
+        [voxel_ids.max(initial=0)]
+        + [voxels.max(initial=0) for voxels in voxels_by_package]
+    )
+    row_by_voxel_id = np.full(max_voxel_id + 1, -1)
+    row_by_voxel_id[voxel_ids] = np.arange(len(voxel_ids))
+
+    def sum_package(voxels: np.ndarray) -> np.ndarray:
+        rows = row_by_voxel_id[voxels]
+        return values[rows[rows >= 0]].sum(axis=0)
+
+    package_sums = list(executor.map(sum_package, voxels_by_package))
+    return pd.DataFrame(
+        np.reshape(package_sums, (len(voxels_by_package), len(voxel_values.columns))),
+        columns=voxel_values.columns,
+    )
+
+
+def create_package_results_table(
+    package_activity: DataMeshActivity, isotope_criteria: DataIsotopeCriteria
+) -> pd.DataFrame:
+    dataframe = package_activity.get_filtered_dataframe()
+
+    rows = []
+    for position in range(len(dataframe)):
+        if not dataframe[KEY_MASS_GRAMS].iat[position] > 0:
+            rows.append(EMPTY_PACKAGE_RESULTS)
+            continue
+        collapsed_data = CollapsedData(DataMeshActivity(dataframe.iloc[[position]]))
+        rows.append(
+            {
+                KEY_RADWASTE_CLASS: collapsed_data.get_radwaste_class_str(),
+                KEY_MASS_GRAMS: collapsed_data.get_mass(),
+                KEY_IRAS: collapsed_data.get_iras(),
+                KEY_RELEVANT_SPECIFIC_ACTIVITY: collapsed_data.get_relevant_activity(),
+                KEY_TOTAL_SPECIFIC_ACTIVITY: collapsed_data.get_total_activity(),
+                KEY_DOSE_1_METER: collapsed_data.get_dose_1_m(),
+                KEY_CDR: collapsed_data.get_contact_dose_rate(),
+                KEY_ISOTOPES_EXCEEDING_LMA: ", ".join(
+                    collapsed_data.get_isotopes_exceeding_lma(isotope_criteria)
+                ),
+            }
+        )
+
+    return pd.DataFrame(rows)
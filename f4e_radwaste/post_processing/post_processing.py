@@ -1,18 +1,32 @@
 import os
 import shutil
 from pathlib import Path
+from typing import List, Optional
 
 from f4e_radwaste.constants import (
     FOLDER_NAME_DATA_TABLES,
     FOLDER_NAME_CSV,
     FOLDER_NAME_VTK,
+    FOLDER_NAME_INPUT_CACHE,
     FILENAME_DGS_DATA,
     FILENAME_MESHINFO,
 )
+from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
+from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
 from f4e_radwaste.post_processing.calculate_dose_rates import DoseCalculator
 from f4e_radwaste.post_processing.components_info import ComponentsInfo
 from f4e_radwaste.post_processing.folder_paths import FolderPaths
-from f4e_radwaste.post_processing.input_data import InputData
+from f4e_radwaste.post_processing.input_cache import read_with_cache
+from f4e_radwaste.post_processing.classify_waste import classify_waste
+from f4e_radwaste.post_processing.input_data import (
+    InputData,
+    create_name_by_time_and_materials,
+)
+from f4e_radwaste.post_processing.mesh_ouput import MeshOutput
+from f4e_radwaste.post_processing.mesh_output_pool import MeshOutputPool
+from f4e_radwaste.post_processing.output_options import OutputOptions
+from f4e_radwaste.post_processing.output_writer import OutputWriter
+from f4e_radwaste.post_processing.streaming_activity import StreamingMeshActivity
 from f4e_radwaste.readers import (
     filter_cells_file,
     dgs_file,
@@ -28,9 +42,25 @@ from f4e_radwaste.readers.dose_matrix_file import (
 
 
 class StandardProcessor:
-    def __init__(self, input_folder_path: Path):
+    def __init__(
+        self,
+        input_folder_path: Path,
+        workers: int = 1,
+        use_cache: bool = True,
+        cache_folder_path: Optional[Path] = None,
+        decay_times: Optional[List[float]] = None,
+        output_options: Optional[OutputOptions] = None,
+    ):
+        self.workers = workers
+        self.output_options = output_options or OutputOptions()
         self.folder_paths = create_folder_paths(input_folder_path)
-        self.input_data = load_input_data_from_folder(input_folder_path)
+        self.input_data = load_input_data_from_folder(
+            input_folder_path,
+            workers=workers,
+            use_cache=use_cache,
+            cache_folder_path=cache_folder_path,
+            decay_times=decay_times,
+        )
 
     def process(self):
         """Process and save the data grouped by material in VTK and CSV"""
@@ -38,29 +68,75 @@ class StandardProcessor:
         self.process_input_data_by_material()
 
     def process_input_data_by_material(self):
+        if self.workers > 1:
+            self.process_input_data_by_material_in_parallel()
+            return
+
         decay_times = self.input_data.data_absolute_activity.decay_times
-        materials = self.input_data.data_mesh_info.data_mass.materials
 
-        for decay_time in decay_times:
-            for material in materials:
+        # The outputs are saved while the next ones are calculated
+        with OutputWriter(self.folder_paths, self.output_options) as writer:
+            for decay_time in decay_times:
+                # The activity of the decay time is grouped once for all the materials
+                for output in self.input_data.iterate_mesh_outputs_by_material(
+                    decay_time
+                ):
+                    writer.submit(output)
+
                 output = self.input_data.try_get_mesh_output_by_time_and_materials(
-                    decay_time=decay_time, materials=[material]
+                    decay_time
                 )
+                if output is not None:
+                    writer.submit(output)
 
-                if output is None:
-                    continue
+    def process_input_data_by_material_in_parallel(self):
+        """
+        The activity is grouped in this process, the classification and the saving of
+        each output are done in a pool of worker processes.
+        """
+        decay_times = self.input_data.data_absolute_activity.decay_times
 
-                output.save(self.folder_paths)
+        with MeshOutputPool(
+            workers=self.workers,
+            data_mesh_info=self.input_data.data_mesh_info,
+            isotope_criteria=self.input_data.isotope_criteria,
+            folder_paths=self.folder_paths,
+            output_options=self.output_options,
+        ) as pool:
+            for decay_time in decay_times:
+                for (
+                    material,
+                    data_mesh_activity,
+                ) in self.input_data.iterate_mesh_activities_by_material(decay_time):
+                    pool.submit(decay_time, [material], data_mesh_activity)
 
-            output = self.input_data.try_get_mesh_output_by_time_and_materials(
-                decay_time
-            )
-            output.save(self.folder_paths)
+                data_mesh_activity = (
+                    self.input_data.try_get_mesh_activity_by_time_and_materials(
+                        decay_time
+                    )
+                )
+                if data_mesh_activity is not None:
+                    pool.submit(decay_time, None, data_mesh_activity)
 
 
 class FilteredProcessor(StandardProcessor):
-    def __init__(self, input_folder_path: Path):
-        super().__init__(input_folder_path)
+    def __init__(
+        self,
+        input_folder_path: Path,
+        workers: int = 1,
+        use_cache: bool = True,
+        cache_folder_path: Optional[Path] = None,
+        decay_times: Optional[List[float]] = None,
+        output_options: Optional[OutputOptions] = None,
+    ):
+        super().__init__(
+            input_folder_path,
+            workers=workers,
+            use_cache=use_cache,
+            cache_folder_path=cache_folder_path,
+            decay_times=decay_times,
+            output_options=output_options,
+        )
 
         # Apply the cell filtering
         cells_to_include = filter_cells_file.read_file(self.folder_paths.input_files)
@@ -68,8 +144,23 @@ class FilteredProcessor(StandardProcessor):
 
 
 class ByComponentProcessor(StandardProcessor):
-    def __init__(self, input_folder_path: Path):
-        super().__init__(input_folder_path)
+    def __init__(
+        self,
+        input_folder_path: Path,
+        workers: int = 1,
+        use_cache: bool = True,
+        cache_folder_path: Optional[Path] = None,
+        decay_times: Optional[List[float]] = None,
+        output_options: Optional[OutputOptions] = None,
+    ):
+        super().__init__(
+            input_folder_path,
+            workers=workers,
+            use_cache=use_cache,
+            cache_folder_path=cache_folder_path,
+            decay_times=decay_times,
+            output_options=output_options,
+        )
 
         self.dose_calculator = DoseCalculator(
             dose_1_m_factors=read_dose_1_m_factors(),
@@ -95,14 +186,87 @@ class ByComponentProcessor(StandardProcessor):
     def process_input_data_by_components(self):
         decay_times = self.input_data.data_absolute_activity.decay_times
 
-        for decay_time in decay_times:
-            component_output = self.input_data.get_component_output_by_time_and_ids(
-                decay_time=decay_time,
-                components_info=self.components_info,
-                dose_calculator=self.dose_calculator,
+        with OutputWriter(self.folder_paths, self.output_options) as writer:
+            for decay_time in decay_times:
+                component_output = self.input_data.get_component_output_by_time_and_ids(
+                    decay_time=decay_time,
+                    components_info=self.components_info,
+                    dose_calculator=self.dose_calculator,
+                )
+
+                writer.submit(component_output)
+
+
+class StreamingProcessor:
+    """
+    Produces the same outputs as StandardProcessor reading DGSdata.dat in a single
+    pass, the full DataAbsoluteActivity is never held in memory. For this reason only
+    the DataMeshInfo data table is saved.
+    """
+
+    def __init__(
+        self,
+        input_folder_path: Path,
+        use_cache: bool = True,
+        cache_folder_path: Optional[Path] = None,
+        decay_times: Optional[List[float]] = None,
+        output_options: Optional[OutputOptions] = None,
+    ):
+        self.output_options = output_options or OutputOptions()
+        self.folder_paths = create_folder_paths(input_folder_path)
+        self.data_mesh_info = load_mesh_info_from_folder(
+            input_folder_path, use_cache=use_cache, cache_folder_path=cache_folder_path
+        )
+        self.isotope_criteria = isotope_criteria_file.read_file()
+
+        self.mesh_activity = StreamingMeshActivity(self.data_mesh_info.data_mass)
+        for chunk in dgs_file.read_file_in_chunks(
+            input_folder_path / FILENAME_DGS_DATA, decay_times=decay_times
+        ):
+            self.mesh_activity.add_chunk(chunk)
+
+    def process(self):
+        """Process and save the data grouped by material in VTK and CSV"""
+        self.data_mesh_info.save(self.folder_paths.data_tables)
+
+        with OutputWriter(self.folder_paths, self.output_options) as writer:
+            for decay_time in self.mesh_activity.decay_times:
+                for material in self.data_mesh_info.data_mass.materials:
+                    output = self.try_get_mesh_output_by_time_and_material(
+                        decay_time, material
+                    )
+
+                    if output is None:
+                        continue
+
+                    writer.submit(output)
+
+                output = self.try_get_mesh_output_by_time_and_material(decay_time)
+                if output is not None:
+                    writer.submit(output)
+
+    def try_get_mesh_output_by_time_and_material(
+        self, decay_time: float, material: Optional[int] = None
+    ) -> Optional[MeshOutput]:
+        try:
+            data_mesh_activity = (
+                self.mesh_activity.get_mesh_activity_by_time_and_material(
+                    decay_time, material
+                )
             )
+        except ValueError:
+            return None
+
+        data_mesh_activity = classify_waste(data_mesh_activity, self.isotope_criteria)
+        materials = None if material is None else [material]
 
-            component_output.save(self.folder_paths)
+        return MeshOutput(
+            name=create_name_by_time_and_materials(decay_time, materials),
+            data_mesh_info=self.data_mesh_info,
+            data_mesh_activity=data_mesh_activity,
+            decay_time=decay_time,
+            materials=materials,
+        )
 
 
 def create_folder_paths(input_folder_path: Path) -> FolderPaths:
@@ -125,9 +289,43 @@ def create_folder_paths(input_folder_path: Path) -> FolderPaths:
     )
 
 
-def load_input_data_from_folder(folder_path: Path) -> InputData:
-    data_absolute_activity = dgs_file.read_file(folder_path / FILENAME_DGS_DATA)
-    data_mesh_info = mesh_info_file.read_file(folder_path / FILENAME_MESHINFO)
+def load_input_data_from_folder(
+    folder_path: Path,
+    workers: int = 1,
+    use_cache: bool = True,
+    cache_folder_path: Optional[Path] = None,
+    decay_times: Optional[List[float]] = None,
+) -> InputData:
+    """
+    Reads the input files of the folder. The parsed DGS and meshinfo data is cached
+    in binary form, by default in the input_cache folder next to the inputs.
+    If decay_times is given, only the results of those decay times are read.
+    """
+    dgs_file_path = folder_path / FILENAME_DGS_DATA
+
+    def read_dgs_file():
+        return dgs_file.read_file(
+            dgs_file_path, workers=workers, decay_times=decay_times
+        )
+
+    if not use_cache:
+        data_absolute_activity = read_dgs_file()
+    else:
+        if cache_folder_path is None:
+            cache_folder_path = folder_path / FOLDER_NAME_INPUT_CACHE
+
+        data_absolute_activity = read_with_cache(
+            source_path=dgs_file_path,
+            cache_folder_path=cache_folder_path,
+            read_source=read_dgs_file,
+            save=DataAbsoluteActivity.save_dataframe_to_hdf5,
+            load=DataAbsoluteActivity.load,
+            options_key=get_decay_times_key(decay_times),
+        )
+
+    data_mesh_info = load_mesh_info_from_folder(
+        folder_path, use_cache, cache_folder_path
+    )
     isotope_criteria = isotope_criteria_file.read_file()
 
     return InputData(
@@ -135,3 +333,31 @@ def load_input_data_from_folder(folder_path: Path) -> InputData:
         data_mesh_info,
         isotope_criteria,
     )
+
+
+def load_mesh_info_from_folder(
+    folder_path: Path,
+    use_cache: bool = True,
+    cache_folder_path: Optional[Path] = None,
+) -> DataMeshInfo:
+    mesh_info_file_path = folder_path / FILENAME_MESHINFO
+
+    if not use_cache:
+        return mesh_info_file.read_file(mesh_info_file_path)
+
+    if cache_folder_path is None:
+        cache_folder_path = folder_path / FOLDER_NAME_INPUT_CACHE
+
+    return read_with_cache(
+        source_path=mesh_info_file_path,
+        cache_folder_path=cache_folder_path,
+        read_source=lambda: mesh_info_file.read_file(mesh_info_file_path),
+        save=DataMeshInfo.save,
+        load=DataMeshInfo.load,
+    )
+
+
+def get_decay_times_key(decay_times: Optional[List[float]]) -> str:
+    if decay_times is None:
+        return ""
+    return "decay_times=" + ",".join(f"{t:.3e}" for t in sorted(decay_times))
@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import (
+    KEY_VOXEL,
+    KEY_ISOTOPE,
+    KEY_ABSOLUTE_ACTIVITY,
+)
+from f4e_radwaste.data_formats.data_mass import DataMass
+from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
+from f4e_radwaste.post_processing.input_data import create_data_mesh_activity
+from f4e_radwaste.readers.dgs_file import DgsChunk, fix_isotope_name
+
+# Key of the accumulators: (decay time code, material or None for all materials)
+AccumulatorKey = Tuple[int, Optional[int]]
+
+
+class StreamingMeshActivity:
+    """
+    Absolute activity by voxel and isotope of every decay time and material, summed
+    while the DGS file is read. The memory needed is bounded by the size of the outputs
+    instead of the size of DataAbsoluteActivity.
+    """
+
+    def __init__(self, data_mass: DataMass):
+        self.data_mass = data_mass
+        self._decay_times: List[float] = []
+        self._isotope_names: List[str] = []
+        # Parts of the sums of each key: (voxels, isotope codes, absolute activities)
+        self._accumulators: Dict[
+            AccumulatorKey, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+        ] = {}
+
+    @property
+    def decay_times(self) -> np.ndarray:
+        return np.array(sorted(self._decay_times))
+
+    def add_chunk(self, chunk: DgsChunk):
+        self._decay_times = chunk.decay_times
+        self._isotope_names = chunk.isotope_names
+
+        rows, materials = self.data_mass.get_materials_of_cells(chunk.cells)
+
+        self._accumulate(chunk, np.unique(rows), materials=None)
+        self._accumulate(chunk, rows, materials)
+
+    def get_mesh_activity_by_time_and_material(
+        self, decay_time: float, material: Optional[int] = None
+    ) -> DataMeshActivity:
+        """
+        Works like InputData.get_mesh_activity_by_time_and_materials for one material
+        or all of them. Raises ValueError if there is no activity.
+        """
+        parts = self._accumulators.get(
+            (self._decay_times.index(decay_time), material), []
+        )
+        if len(parts) == 0:
+            raise ValueError
+
+        voxels, isotope_codes, activities = (
+            np.concatenate(part) for part in zip(*parts)
+        )
+        isotope_names = [fix_isotope_name(name) for name in self._isotope_names]
+
+        # A voxel could appear in several chunks, join its partial sums
+        combined_activity = (
+            pd.Series(
+                activities,
+                index=pd.MultiIndex.from_arrays(
+                    [
+                        voxels.astype(np.int64),
+                        np.array(isotope_names, dtype=object)[isotope_codes],
+                    ],
+                    names=[KEY_VOXEL, KEY_ISOTOPE],
+                ),
+                name=KEY_ABSOLUTE_ACTIVITY,
+            )
+            .groupby([KEY_VOXEL, KEY_ISOTOPE])
+            .sum()
+        )
+
+        materials = None if material is None else [material]
+        _cells, voxel_masses = self.data_mass.get_cells_and_masses_from_selection(
+            materials
+        )
+
+        return create_data_mesh_activity(combined_activity, voxel_masses)
+
+    def _accumulate(
+        self, chunk: DgsChunk, rows: np.ndarray, materials: Optional[np.ndarray]
+    ):
+        if len(rows) == 0:
+            return
+
+        if materials is None:
+            materials = np.full(len(rows), -1)
+        time_codes = chunk.time_codes[rows]
+        voxels = chunk.voxels[rows]
+        isotope_codes = chunk.isotope_codes[rows]
+
+        # Inside each group the rows are added by increasing cell, like the groupby of
+        # the sorted DataAbsoluteActivity, so the sums are identical
+        order = np.lexsort(
+            (chunk.cells[rows], isotope_codes, voxels, materials, time_codes)
+        )
+        group_keys = [
+            time_codes[order],
+            materials[order],
+            voxels[order],
+            isotope_codes[order],
+        ]
+        group_starts = _find_group_starts(group_keys)
+        sums = _sum_by_group(group_starts, chunk.activities[rows][order])
+
+        time_codes, materials, voxels, isotope_codes = (
+            keys[group_starts] for keys in group_keys
+        )
+
+        # Store the sums of each combination of decay time and material
+        key_starts = _find_group_starts([time_codes, materials])
+        key_ends = np.append(key_starts[1:], len(group_starts))
+        for start, end in zip(key_starts, key_ends):
+            material = None if materials[start] == -1 else int(materials[start])
+            key = (int(time_codes[start]), material)
+            part = (voxels[start:end], isotope_codes[start:end], sums[start:end])
+            self._accumulators.setdefault(key, []).append(part)
+
+
+def _find_group_starts(sorted_keys: List[np.ndarray]) -> np.ndarray:
+    is_start = np.zeros(len(sorted_keys[0]), dtype=bool)
+    is_start[0] = True
+    for keys in sorted_keys:
+        is_start[1:] |= keys[1:] != keys[:-1]
+    return np.flatnonzero(is_start)
+
+
+def _sum_by_group(group_starts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Sums the values of consecutive groups with the compensated (Kahan) summation that
+    pandas uses in groupby().sum().
+    """
+    group_sizes = np.diff(np.append(group_starts, len(values)))
+    sums = np.zeros(len(group_starts))
+    compensations = np.zeros(len(group_starts))
+
+    for position in range(group_sizes.max()):
+        groups = np.flatnonzero(group_sizes > position)
+        y = values[group_starts[groups] + position] - compensations[groups]
+        t = sums[groups] + y
+        compensation = (t - sums[groups]) - y
+        # Infinite values make the compensation NaN
+        compensation[np.isnan(compensation)] = 0.0
+        compensations[groups] = compensation
+        sums[groups] = t
+
+    return sums
@@ -0,0 +1,197 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import CoordinateType
+from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
+from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
+from f4e_radwaste.post_processing.collapsed_data import create_collapsed_activity
+
+# Relative error allowed in the box sums of the prefix sums
+RELATIVE_TOLERANCE = 1e-12
+
+
+class SummedAreaTable:
+    """
+    3D prefix sums of the mass and the absolute activity of each isotope of the
+    voxels of a Cartesian mesh. The sums inside any box of whole voxels are found
+    with eight lookups, whatever the size of the box.
+
+    The boxes are given as half-open ranges of voxel indices, lower included and
+    upper excluded, as arrays of shape (n_boxes, 3) in the order i, j, k.
+
+    The activities of the voxels span many orders of magnitude, the difference of
+    plain float prefix sums would lose the small boxes next to hot ones. The sums
+    are stored as double-double numbers (a high and a low float each), so the
+    cancellation error is around 1e-32 of the prefix sums instead of 1e-16. The
+    few box sums that could still be affected by it are summed voxel by voxel.
+    The table holds 3 * (ni + 1) * (nj + 1) * (nk + 1) * (n_isotopes + 1) floats.
+    """
+
+    def __init__(self, data_mesh_info: DataMeshInfo, voxel_values: pd.DataFrame):
+        """
+        voxel_values holds the mass and the absolute activity of each isotope
+        (columns) of each voxel id (index), missing voxels are empty.
+        """
+        if data_mesh_info.coordinates is not CoordinateType.CARTESIAN:
+            raise ValueError(
+                "Summed area tables are only available for Cartesian meshes"
+            )
+
+        self.vectors = [
+            np.asarray(vector, dtype=float)
+            for vector in (
+                data_mesh_info.vector_i,
+                data_mesh_info.vector_j,
+                data_mesh_info.vector_k,
+            )
+        ]
+        self.shape = tuple(len(vector) - 1 for vector in self.vectors)
+        self.columns = voxel_values.columns
+
+        # The voxel ids follow the order of the R2S meshes:
+        #  id = i * nj * nk + j * nk + k + 1
+        dense_values = np.zeros((np.prod(self.shape), len(self.columns)))
+        dense_values[voxel_values.index.to_numpy(dtype=int) - 1] = voxel_values
+        self._voxel_values = dense_values.reshape(self.shape + (len(self.columns),))
+
+        # The first plane of each axis is zero so a range starting at 0 needs no
+        #  special case
+        padded_shape = tuple(n + 1 for n in self.shape) + (len(self.columns),)
+        self._sums_high = np.zeros(padded_shape)
+        self._sums_low = np.zeros(padded_shape)
+        self._sums_high[1:, 1:, 1:] = self._voxel_values
+        for axis in range(3):
+            _cumulative_sum_double_double(self._sums_high, self._sums_low, axis)
+
+        # Bound of the rounding error of a box sum relative to its largest corner
+        self._relative_error_bound = (sum(self.shape) + 8) * np.finfo(float).eps ** 2
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._voxel_values.nbytes + self._sums_high.nbytes + self._sums_low.nbytes
+        )
+
+    def calculate_box_sums(
+        self, lower_indices: np.ndarray, upper_indices: np.ndarray
+    ) -> pd.DataFrame:
+        """Returns the mass and activities (columns) inside each box (rows)."""
+        lower_indices = np.atleast_2d(lower_indices)
+        upper_indices = np.atleast_2d(upper_indices)
+        self._check_ranges(lower_indices, upper_indices)
+
+        i_0, j_0, k_0 = lower_indices.T
+        i_1, j_1, k_1 = upper_indices.T
+        corners = [
+            (1, (i_1, j_1, k_1)),
+            (-1, (i_0, j_1, k_1)),
+            (-1, (i_1, j_0, k_1)),
+            (-1, (i_1, j_1, k_0)),
+            (1, (i_0, j_0, k_1)),
+            (1, (i_0, j_1, k_0)),
+            (1, (i_1, j_0, k_0)),
+            (-1, (i_0, j_0, k_0)),
+        ]
+
+        box_high = np.zeros((len(lower_indices), len(self.columns)))
+        box_low = np.zeros_like(box_high)
+        largest_corner = np.zeros_like(box_high)
+        for sign, corner in corners:
+            box_high, box_low = _add_double_double(
+                box_high,
+                box_low,
+                sign * self._sums_high[corner],
+                sign * self._sums_low[corner],
+            )
+            largest_corner = np.maximum(largest_corner, self._sums_high[corner])
+        box_sums = box_high + box_low
+
+        # The sums within the rounding error are empty boxes, like those of an
+        #  isotope that is only found elsewhere
+        error_bound = self._relative_error_bound * largest_corner
+        is_zero = np.abs(box_sums) <= error_bound
+        box_sums[is_zero] = 0.0
+
+        # Sum directly the boxes whose rounding error may exceed the tolerance
+        is_imprecise = ~is_zero & (error_bound > RELATIVE_TOLERANCE * box_sums)
+        for row in np.flatnonzero(np.any(is_imprecise, axis=1)):
+            box_sums[row] = self._sum_voxels(lower_indices[row], upper_indices[row])
+
+        return pd.DataFrame(box_sums, columns=self.columns)
+
+    def get_voxel_ranges_in_box(
+        self, min_points: np.ndarray, max_points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the voxel ranges of the axis-aligned boxes given by their corners,
+        a voxel is inside when its center is inside the box.
+        """
+        min_points = np.atleast_2d(min_points)
+        max_points = np.atleast_2d(max_points)
+        lower_indices = np.empty(min_points.shape, dtype=int)
+        upper_indices = np.empty(max_points.shape, dtype=int)
+
+        for axis, vector in enumerate(self.vectors):
+            centers = (vector[:-1] + vector[1:]) / 2
+            lower_indices[:, axis] = np.searchsorted(
+                centers, min_points[:, axis], "left"
+            )
+            upper_indices[:, axis] = np.searchsorted(
+                centers, max_points[:, axis], "right"
+            )
+
+        # Boxes without voxels inside are empty ranges
+        upper_indices = np.maximum(lower_indices, upper_indices)
+        return lower_indices, upper_indices
+
+    def get_collapsed_activity(
+        self, lower_indices: np.ndarray, upper_indices: np.ndarray
+    ) -> DataMeshActivity:
+        """
+        Same result as InputData.get_collapsed_activity for the voxels of a single
+        box, the specific activity of the box and its mass.
+        """
+        box_sums = self.calculate_box_sums(lower_indices, upper_indices)
+        return create_collapsed_activity(box_sums.iloc[[0]])
+
+    def _sum_voxels(self, lower_index: np.ndarray, upper_index: np.ndarray):
+        box = tuple(slice(start, stop) for start, stop in zip(lower_index, upper_index))
+        return self._voxel_values[box].sum(axis=(0, 1, 2))
+
+    def _check_ranges(self, lower_indices: np.ndarray, upper_indices: np.ndarray):
+        if (
+            np.any(lower_indices < 0)
+            or np.any(upper_indices > self.shape)
+            or np.any(lower_indices > upper_indices)
+        ):
+            raise ValueError(f"The voxel ranges must be inside the mesh {self.shape}")
+
+
+def _two_sum(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the float sum of a and b and its exact rounding error."""
+    total = a + b
+    b_virtual = total - a
+    error = (a - (total - b_virtual)) + (b - b_virtual)
+    return total, error
+
+
+def _add_double_double(
+    a_high: np.ndarray, a_low: np.ndarray, b_high: np.ndarray, b_low: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    total, error = _two_sum(a_high, b_high)
+    error += a_low + b_low
+    high = total + error
+    low = error - (high - total)
+    return high, low
+
+
+def _cumulative_sum_double_double(high: np.ndarray, low: np.ndarray, axis: int):
+    """Cumulative sum in place along the axis, a plane at a time."""
+    high = np.moveaxis(high, axis, 0)
+    low = np.moveaxis(low, axis, 0)
+    for position in range(1, len(high)):
+        high[position], low[position] = _add_double_double(
+            high[position - 1], low[position - 1], high[position], low[position]
+        )
@@ -1,5 +1,13 @@
-import pandas as pd
 import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, islice, repeat
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
 
 from f4e_radwaste.constants import (
     KEY_TIME,
@@ -10,68 +18,529 @@ from f4e_radwaste.constants import (
 )
 from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
 
+CASE_NUMBER = re.compile(r"\d+")
+CASE_HEADER = b"\n Case:"
+INITIAL_BUFFER_CAPACITY = 1024
+SCAN_CHUNK_SIZE = 64 * 1024 * 1024
+BYTE_RANGES_PER_WORKER = 4
+CASES_PER_CHUNK = 4096
+# Lines of isotopes read before their values are converted, all at once
+PENDING_LINES_TO_PARSE = 16384
+# Distinct lines of isotopes whose codes are kept to parse the next ones
+ISOTOPE_LINES_TO_KEEP = 65536
+# The decay times are written with 4 significant digits e.g. 'Time  1.000E+05 S'
+DECAY_TIME_RELATIVE_TOLERANCE = 1e-3
 
-def read_file(file_path) -> DataAbsoluteActivity:
+
+def read_file(
+    file_path, workers: int = 1, decay_times: Optional[List[float]] = None
+) -> DataAbsoluteActivity:
     """
     Parses the DGS.dat file and returns an instance of AbsoluteActivity. The activity
     is given as Bq (it was calculated as Bq/cm3 * partial cell volume in the voxel).
+    With more than one worker the " Case:" blocks are parsed in parallel processes.
+    If decay_times is given, the results of the other decay times are skipped.
     """
-    with open(file_path, "r", encoding="utf-8") as infile:
-        # Skip the first line: " Photon Isotope"
-        next(infile)
-        # Read the number of decay times: "Number of decay times:         2"
-        number_decay_times = int(next(infile).split()[-1])
-        # Read all the indexes that have non-zero results
-        data = _read_results(infile, number_decay_times)
-
-    dgs_dataframe = pd.DataFrame(data)
-    del data  # memory performance reasons
-
-    # Set the format to that of DataAbsoluteActivity
-    index_columns = [KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE]
-    dgs_dataframe.set_index(index_columns, inplace=True)
+    if workers > 1:
+        columns = _read_results_in_parallel(file_path, workers, decay_times)
+    else:
+        with open(file_path, "r", encoding="utf-8") as infile:
+            number_decay_times = _read_header(infile)
+            # Read all the indexes that have non-zero results
+            columns = _read_results(infile, number_decay_times, decay_times)
+
+    dgs_dataframe = columns.to_dataframe()
+    del columns  # memory performance reasons
+
     fix_isotope_names(dgs_dataframe)
 
     return DataAbsoluteActivity(dgs_dataframe)
 
 
-def _read_results(infile, number_decay_times):
-    data = {
-        KEY_TIME: [],
-        KEY_VOXEL: [],
-        KEY_CELL: [],
-        KEY_ISOTOPE: [],
-        KEY_ABSOLUTE_ACTIVITY: [],
-    }
+@dataclass
+class DgsChunk:
+    """
+    Results of consecutive " Case:" blocks. The codes are positions in decay_times and
+    isotope_names, which keep the same codes for the whole file.
+    """
+
+    decay_times: List[float]
+    isotope_names: List[str]
+    time_codes: np.ndarray
+    voxels: np.ndarray
+    cells: np.ndarray
+    isotope_codes: np.ndarray
+    activities: np.ndarray
+
+
+def read_file_in_chunks(
+    file_path,
+    decay_times: Optional[List[float]] = None,
+    cases_per_chunk: int = CASES_PER_CHUNK,
+) -> Iterator[DgsChunk]:
+    """
+    Parses the DGS.dat file lazily, yielding the results in chunks of complete cases
+    so the whole file is never held in memory. The isotope names are not fixed.
+    """
+    with open(file_path, "r", encoding="utf-8") as infile:
+        number_decay_times = _read_header(infile)
+        columns = _DgsColumns(selected_decay_times=decay_times)
+        cases_in_chunk = 0
+
+        for line in infile:
+            if line.startswith(" Case:"):
+                _read_case(line, infile, number_decay_times, columns)
+
+                cases_in_chunk += 1
+                if cases_in_chunk == cases_per_chunk:
+                    yield columns.pop_chunk()
+                    cases_in_chunk = 0
+
+        if cases_in_chunk > 0:
+            yield columns.pop_chunk()
+
+
+class _GrowableArray:
+    """
+    NumPy buffer that grows geometrically, used to store the parsed values without
+    creating a Python object per row.
+    """
+
+    def __init__(self, dtype, capacity: int = INITIAL_BUFFER_CAPACITY):
+        self._buffer = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __reduce__(self):
+        # Only the filled part of the buffer is sent between processes
+        return _GrowableArray.from_array, (self.to_array(),)
+
+    @classmethod
+    def from_array(cls, values: np.ndarray) -> "_GrowableArray":
+        growable_array = cls(values.dtype, capacity=len(values))
+        growable_array.extend(values)
+        return growable_array
+
+    def extend(self, values: np.ndarray):
+        end = self._reserve(len(values))
+        self._buffer[self._size : end] = values
+        self._size = end
+
+    def extend_repeated(self, value, count: int):
+        end = self._reserve(count)
+        self._buffer[self._size : end] = value
+        self._size = end
+
+    def to_array(self) -> np.ndarray:
+        return self._buffer[: self._size]
+
+    def clear(self):
+        self._size = 0
+
+    def _reserve(self, count: int) -> int:
+        end = self._size + count
+        if end > len(self._buffer):
+            new_buffer = np.empty(max(end, 2 * len(self._buffer)), self._buffer.dtype)
+            new_buffer[: self._size] = self._buffer[: self._size]
+            self._buffer = new_buffer
+        return end
+
+
+class _DgsColumns:
+    """
+    Columnar storage of the DGS results. Decay times and isotopes are dictionary
+    encoded, every row only stores the integer code of its value.
+    """
+
+    def __init__(
+        self,
+        capacity: int = INITIAL_BUFFER_CAPACITY,
+        selected_decay_times: Optional[List[float]] = None,
+    ):
+        self.time_codes = _GrowableArray(np.int32, capacity)
+        self.voxels = _GrowableArray(np.int32, capacity)
+        self.cells = _GrowableArray(np.int32, capacity)
+        self.isotope_codes = _GrowableArray(np.int32, capacity)
+        self.activities = _GrowableArray(np.float64, capacity)
+
+        self.decay_times: List[float] = []
+        self.isotope_names: List[str] = []
+        self._time_codes_by_value: Dict[float, int] = {}
+        self._isotope_codes_by_name: Dict[str, int] = {}
+
+        self._selected_decay_times = selected_decay_times
+        # The same time lines are repeated in every case, None if not selected
+        self._time_codes_by_line: Dict[str, Optional[int]] = {}
+        # The isotope lines are also repeated in many cells and cases
+        self._isotope_codes_by_line: Dict[str, np.ndarray] = {}
+
+        # Lines of the cases read but not parsed yet, and the values of each line
+        self._pending_isotope_lines: List[str] = []
+        self._pending_activity_lines: List[str] = []
+        self._pending_time_codes: List[int] = []
+        self._pending_voxels: List[int] = []
+        self._pending_cells: List[int] = []
+        self._pending_volumes: List[float] = []
+
+    def get_time_code(self, decay_time: float) -> int:
+        if decay_time not in self._time_codes_by_value:
+            self._time_codes_by_value[decay_time] = len(self.decay_times)
+            self.decay_times.append(decay_time)
+        return self._time_codes_by_value[decay_time]
+
+    def get_time_code_from_line(self, time_line: str) -> Optional[int]:
+        if time_line not in self._time_codes_by_line:
+            # 'Time  1.000E+05 S'
+            decay_time = float(time_line.split()[1])
+            if self._is_decay_time_selected(decay_time):
+                self._time_codes_by_line[time_line] = self.get_time_code(decay_time)
+            else:
+                self._time_codes_by_line[time_line] = None
+        return self._time_codes_by_line[time_line]
+
+    def _is_decay_time_selected(self, decay_time: float) -> bool:
+        if self._selected_decay_times is None:
+            return True
+        return bool(
+            np.isclose(
+                decay_time,
+                self._selected_decay_times,
+                rtol=DECAY_TIME_RELATIVE_TOLERANCE,
+                atol=0.0,
+            ).any()
+        )
+
+    def __len__(self):
+        return len(self.activities)
+
+    def get_isotope_codes(self, isotope_names: List[str]) -> np.ndarray:
+        # Only the distinct names are looked up in the dictionary
+        name_positions, distinct_names = pd.factorize(
+            np.array(isotope_names, dtype=object)
+        )
+        codes_by_name = self._isotope_codes_by_name
+        for isotope_name in distinct_names:
+            if isotope_name not in codes_by_name:
+                codes_by_name[isotope_name] = len(self.isotope_names)
+                self.isotope_names.append(isotope_name)
+
+        distinct_codes = np.fromiter(
+            map(codes_by_name.__getitem__, distinct_names),
+            dtype=np.int32,
+            count=len(distinct_names),
+        )
+        return distinct_codes[name_positions]
+
+    def append_lines(
+        self,
+        voxel: int,
+        time_codes: List[int],
+        cells: List[int],
+        volumes: List[float],
+        cell_lines: List[str],
+    ):
+        """
+        Keeps the 3 lines of each cell (number of isotopes, isotope names and their
+        activities) of a voxel at each decay time, they are parsed together with the
+        lines of the next cases.
+        """
+        self._pending_isotope_lines.extend(cell_lines[1::3])
+        self._pending_activity_lines.extend(cell_lines[2::3])
+        for time_code in time_codes:
+            self._pending_time_codes.extend(repeat(time_code, len(cells)))
+        self._pending_voxels.extend(repeat(voxel, len(cells) * len(time_codes)))
+        self._pending_cells.extend(cells * len(time_codes))
+        self._pending_volumes.extend(volumes * len(time_codes))
+
+        if len(self._pending_isotope_lines) >= PENDING_LINES_TO_PARSE:
+            self.parse_pending_lines()
+
+    def parse_pending_lines(self):
+        """Converts all the pending lines at once, one value per row."""
+        if len(self._pending_isotope_lines) == 0:
+            return
+
+        isotope_codes_by_line = self._get_isotope_codes_by_line()
+        isotope_codes = np.concatenate(isotope_codes_by_line)
+        isotopes_by_line = np.fromiter(map(len, isotope_codes_by_line), dtype=np.int64)
+        activities = np.array(
+            " ".join(self._pending_activity_lines).split(), dtype=np.float64
+        )
+        volumes = np.array(self._pending_volumes, dtype=np.float64)
+
+        self.time_codes.extend(np.repeat(self._pending_time_codes, isotopes_by_line))
+        self.voxels.extend(np.repeat(self._pending_voxels, isotopes_by_line))
+        self.cells.extend(np.repeat(self._pending_cells, isotopes_by_line))
+        self.isotope_codes.extend(isotope_codes)
+        self.activities.extend(activities * np.repeat(volumes, isotopes_by_line))
+
+        for pending_values in (
+            self._pending_isotope_lines,
+            self._pending_activity_lines,
+            self._pending_time_codes,
+            self._pending_voxels,
+            self._pending_cells,
+            self._pending_volumes,
+        ):
+            pending_values.clear()
+
+    def _get_isotope_codes_by_line(self) -> List[np.ndarray]:
+        # Only the lines not seen before are split
+        if len(self._isotope_codes_by_line) > ISOTOPE_LINES_TO_KEEP:
+            self._isotope_codes_by_line.clear()
+
+        new_lines = [
+            line
+            for line in dict.fromkeys(self._pending_isotope_lines)
+            if line not in self._isotope_codes_by_line
+        ]
+        if new_lines:
+            isotope_names = [line.split() for line in new_lines]
+            isotope_codes = self.get_isotope_codes(
+                list(chain.from_iterable(isotope_names))
+            )
+            ends = np.cumsum([len(names) for names in isotope_names])
+            self._isotope_codes_by_line.update(
+                zip(new_lines, np.split(isotope_codes, ends[:-1]))
+            )
+
+        return list(
+            map(self._isotope_codes_by_line.__getitem__, self._pending_isotope_lines)
+        )
+
+    def __getstate__(self):
+        # The cache of isotope lines is not sent between processes
+        state = self.__dict__.copy()
+        state["_isotope_codes_by_line"] = {}
+        return state
+
+    def pop_chunk(self) -> DgsChunk:
+        """Returns the rows stored so far and empties the buffers, keeping the codes."""
+        self.parse_pending_lines()
+        buffers = [
+            self.time_codes,
+            self.voxels,
+            self.cells,
+            self.isotope_codes,
+            self.activities,
+        ]
+        chunk = DgsChunk(
+            list(self.decay_times),
+            list(self.isotope_names),
+            *(buffer.to_array().copy() for buffer in buffers),
+        )
+        for buffer in buffers:
+            buffer.clear()
+        return chunk
+
+    @classmethod
+    def concatenate(cls, parts: List["_DgsColumns"]) -> "_DgsColumns":
+        """Joins the columns of several parts translating their codes."""
+        columns = cls(capacity=sum(len(part) for part in parts))
+
+        for part in parts:
+            time_codes = np.array(
+                [columns.get_time_code(value) for value in part.decay_times],
+                dtype=np.int32,
+            )
+            isotope_codes = columns.get_isotope_codes(part.isotope_names)
+
+            columns.time_codes.extend(time_codes[part.time_codes.to_array()])
+            columns.voxels.extend(part.voxels.to_array())
+            columns.cells.extend(part.cells.to_array())
+            columns.isotope_codes.extend(isotope_codes[part.isotope_codes.to_array()])
+            columns.activities.extend(part.activities.to_array())
+
+        return columns
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Builds the DataFrame with the index of DataAbsoluteActivity directly from the
+        codes, the levels are sorted the same way pandas.set_index would do.
+        """
+        self.parse_pending_lines()
+        time_level, time_codes = _sort_encoded_level(
+            self.decay_times, self.time_codes.to_array()
+        )
+        isotope_level, isotope_codes = _sort_encoded_level(
+            self.isotope_names, self.isotope_codes.to_array()
+        )
+        voxel_codes, voxel_level = pd.factorize(self.voxels.to_array(), sort=True)
+        cell_codes, cell_level = pd.factorize(self.cells.to_array(), sort=True)
+
+        index = pd.MultiIndex(
+            levels=[
+                pd.Index(time_level, dtype=np.float64),
+                pd.Index(voxel_level, dtype=np.int64),
+                pd.Index(cell_level, dtype=np.int64),
+                pd.Index(isotope_level),
+            ],
+            codes=[time_codes, voxel_codes, cell_codes, isotope_codes],
+            names=[KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE],
+            verify_integrity=False,
+        )
+        return pd.DataFrame({KEY_ABSOLUTE_ACTIVITY: self.activities.to_array()}, index)
+
+
+def _sort_encoded_level(values: List, codes: np.ndarray):
+    """Sorts the values of a dictionary and translates the codes accordingly."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    new_code_of_old_code = np.empty(len(values), dtype=np.int32)
+    new_code_of_old_code[order] = np.arange(len(values), dtype=np.int32)
+    return [values[i] for i in order], new_code_of_old_code[codes]
+
+
+def _read_header(infile) -> int:
+    # Skip the first line: " Photon Isotope"
+    next(infile)
+    # Read the number of decay times: "Number of decay times:         2"
+    return int(next(infile).split()[-1])
+
+
+def _read_results(
+    infile: TextIO,
+    number_decay_times: int,
+    decay_times: Optional[List[float]] = None,
+    number_of_cases: Optional[int] = None,
+) -> _DgsColumns:
+    columns = _DgsColumns(selected_decay_times=decay_times)
+    cases_read = 0
 
     # Read each line in a loop
     for line in infile:
         if line.startswith(" Case:"):
-            # e.g. ' Case:         5808  Nmat:            2'
-            voxel_index = int(re.findall(r"\d+", line)[0])
-            next(infile)  # Skip the line: ' Cells: \n'
-            cell_ids = [int(x) for x in next(infile).split()]
-            next(infile)  # Skip the line: ' Volumes: \n'
-            # Volume in cm3 of each material cell inside the voxel
-            volumes = [float(x) for x in next(infile).split()]
+            _read_case(line, infile, number_decay_times, columns)
 
-            for _time_index in range(number_decay_times):
-                # 'Time  1.000E+05 S'
-                decay_time = float(next(infile).split()[1])
+            cases_read += 1
+            if cases_read == number_of_cases:
+                break
 
-                for cell_id, volume in zip(cell_ids, volumes):
-                    next(infile)  # Skip the line: 'Number of materials:         20'
-                    isotope_names = next(infile).split()
-                    isotope_activities = [float(x) for x in next(infile).split()]
+    columns.parse_pending_lines()
+    return columns
 
-                    for isotope, activity in zip(isotope_names, isotope_activities):
-                        data[KEY_TIME].append(decay_time)
-                        data[KEY_VOXEL].append(voxel_index)
-                        data[KEY_CELL].append(cell_id)
-                        data[KEY_ISOTOPE].append(isotope)
-                        data[KEY_ABSOLUTE_ACTIVITY].append(activity * volume)
 
-    return data
+def find_case_offsets(file_path) -> np.ndarray:
+    """
+    Scans the file in binary chunks and returns the byte offset of the start of every
+    " Case:" line.
+    """
+    offsets = array("q")
+    overlap = len(CASE_HEADER) - 1
+
+    with open(file_path, "rb") as infile:
+        tail = b""
+        tail_offset = 0
+        while chunk := infile.read(SCAN_CHUNK_SIZE):
+            # Keep the end of the previous chunk in case a header is split
+            data = tail + chunk
+            position = data.find(CASE_HEADER)
+            while position != -1:
+                # The offset points to the space after the line break
+                offsets.append(tail_offset + position + 1)
+                position = data.find(CASE_HEADER, position + 1)
+
+            tail = data[-overlap:]
+            tail_offset += len(data) - len(tail)
+
+    return np.frombuffer(offsets, dtype=np.int64)
+
+
+def _read_results_in_parallel(
+    file_path, workers: int, decay_times: Optional[List[float]] = None
+) -> _DgsColumns:
+    with open(file_path, "rb") as infile:
+        number_decay_times = _read_header(infile)
+
+    case_offsets = find_case_offsets(file_path)
+    starts, numbers_of_cases = _split_case_offsets(
+        case_offsets, workers * BYTE_RANGES_PER_WORKER
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(
+            executor.map(
+                _read_results_from_offset,
+                repeat(Path(file_path)),
+                starts,
+                numbers_of_cases,
+                repeat(number_decay_times),
+                repeat(decay_times),
+            )
+        )
+
+    return _DgsColumns.concatenate(parts)
+
+
+def _split_case_offsets(
+    case_offsets: np.ndarray, number_of_ranges: int
+) -> Tuple[List[int], List[int]]:
+    """
+    Splits the cases in contiguous ranges of similar size in bytes. Returns the offset
+    where each range starts and the number of cases it contains.
+    """
+    if len(case_offsets) == 0:
+        return [], []
+
+    targets = np.linspace(case_offsets[0], case_offsets[-1], number_of_ranges + 1)
+    first_cases = np.unique(np.searchsorted(case_offsets, targets[:-1]))
+    numbers_of_cases = np.diff(first_cases, append=len(case_offsets))
+
+    return case_offsets[first_cases].tolist(), numbers_of_cases.tolist()
+
+
+def _read_results_from_offset(
+    file_path: Path,
+    start: int,
+    number_of_cases: int,
+    number_decay_times: int,
+    decay_times: Optional[List[float]],
+) -> _DgsColumns:
+    with open(file_path, "r", encoding="utf-8") as infile:
+        # The offset is at the start of a line so it is a valid position to seek
+        infile.seek(start)
+        return _read_results(infile, number_decay_times, decay_times, number_of_cases)
+
+
+def _read_case(
+    case_line: str, infile: TextIO, number_decay_times: int, columns: _DgsColumns
+):
+    # e.g. ' Case:         5808  Nmat:            2'
+    voxel_index = int(CASE_NUMBER.search(case_line).group())
+    next(infile)  # Skip the line: ' Cells: \n'
+    cell_ids = [int(x) for x in next(infile).split()]
+    next(infile)  # Skip the line: ' Volumes: \n'
+    # Volume in cm3 of each material cell inside the voxel
+    volumes = [float(x) for x in next(infile).split()]
+
+    # Each decay time is a time line followed by 3 lines per cell: the number of
+    #  isotopes, the isotope names and their activities
+    lines_per_time = 1 + 3 * len(cell_ids)
+    lines = list(islice(infile, lines_per_time * number_decay_times))
+    if len(lines) < lines_per_time * number_decay_times:
+        raise ValueError(f"The results of the case {voxel_index} are incomplete")
+
+    time_codes = [
+        columns.get_time_code_from_line(line) for line in lines[::lines_per_time]
+    ]
+    if None in time_codes:
+        # Only the lines of the cells at the selected decay times are kept
+        cell_lines = [
+            line
+            for start, time_code in zip(
+                range(0, len(lines), lines_per_time), time_codes
+            )
+            if time_code is not None
+            for line in lines[start + 1 : start + lines_per_time]
+        ]
+        time_codes = [time_code for time_code in time_codes if time_code is not None]
+    else:
+        del lines[::lines_per_time]
+        cell_lines = lines
+
+    if time_codes:
+        columns.append_lines(voxel_index, time_codes, cell_ids, volumes, cell_lines)
 
 
 def fix_isotope_names(dataframe: pd.DataFrame):
@@ -81,13 +550,15 @@ def fix_isotope_names(dataframe: pd.DataFrame):
     isotope_index = dataframe.index.names.index(KEY_ISOTOPE)
     current_isotope_names = dataframe.index.levels[isotope_index].values
 
-    corrected_names = []
-    for name in current_isotope_names:
-        name = name.capitalize()
-        if name[-2:] == "m1":
-            name = name[:-1]
-        elif name[-2:] == "m2":
-            name = name[:-2] + "n"
-        corrected_names.append(name)
+    corrected_names = [fix_isotope_name(name) for name in current_isotope_names]
 
     dataframe.index = dataframe.index.set_levels(corrected_names, level=KEY_ISOTOPE)
+
+
+def fix_isotope_name(name: str) -> str:
+    name = name.capitalize()
+    if name[-2:] == "m1":
+        name = name[:-1]
+    elif name[-2:] == "m2":
+        name = name[:-2] + "n"
+    return name
@@ -1,5 +1,6 @@
+import io
 import re
-from typing import TextIO, List, Tuple
+from typing import TextIO, List
 
 import numpy as np
 import pandas as pd
@@ -14,11 +15,13 @@ from f4e_radwaste.constants import (
 from f4e_radwaste.data_formats.data_mass import DataMass
 from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
 
+MESH_START = "Mesh tally number:"
+
 
 def read_file(file_path) -> DataMeshInfo:
     with open(file_path, "r", encoding="utf-8") as infile:
         for line in infile:
-            if "Mesh tally number:" in line:
+            if MESH_START in line:
                 data_mesh_info = _read_individual_mesh(infile)
 
                 # Only the first DataMeshInfo is returned
@@ -94,51 +97,104 @@ def _read_vector(line: str) -> List[float]:
 
 
 def _read_voxels(data_mesh_info: DataMeshInfo, infile: TextIO) -> DataMass:
-    data = {
-        KEY_VOXEL: [],
-        KEY_CELL: [],
-        KEY_MATERIAL: [],
-        KEY_MASS_GRAMS: [],
-    }
-
+    """
+    Reads the voxel section as a block. Every voxel line ('id volume n_cells') is
+    followed by one line per cell inside ('cell density material proportion').
+    """
     number_of_voxels = (
         (len(data_mesh_info.vector_i) - 1)
         * (len(data_mesh_info.vector_j) - 1)
         * (len(data_mesh_info.vector_k) - 1)
     )
 
-    for _ in range(number_of_voxels):
-        voxel_id, volume, number_of_cells_inside = infile.readline().split()
-        voxel_id, number_of_cells_inside = int(voxel_id), int(number_of_cells_inside)
-        volume = float(volume)
+    # The section ends at the next mesh if the file has more than one, it is parsed
+    #  while it is read without holding its text in memory
+    columns = pd.read_csv(
+        _SectionReader(infile, end_marker=MESH_START),
+        sep=r"\s+",
+        header=None,
+        names=[0, 1, 2, 3],
+        float_precision="round_trip",
+    )
+    ids, values, numbers, volume_proportions = (
+        columns[column].to_numpy() for column in columns
+    )
 
-        for _ in range(number_of_cells_inside):
-            cell_id, material_id, cell_mass = _read_cell_part(volume, infile)
+    # Voxel lines have only 3 values
+    is_voxel_line = np.isnan(volume_proportions)
+    voxel_line_indexes = np.flatnonzero(is_voxel_line)[: number_of_voxels + 1]
+    if len(voxel_line_indexes) < number_of_voxels:
+        raise ValueError("The meshinfo file has less voxels than the mesh...")
+    if len(voxel_line_indexes) > number_of_voxels:
+        last_line = voxel_line_indexes[number_of_voxels]
+        ids, values, numbers = ids[:last_line], values[:last_line], numbers[:last_line]
+        volume_proportions = volume_proportions[:last_line]
+        is_voxel_line = is_voxel_line[:last_line]
+        voxel_line_indexes = voxel_line_indexes[:number_of_voxels]
+
+    # Assign to each cell line the values of the voxel line above it
+    voxel_position = np.cumsum(is_voxel_line) - 1
+    is_cell_line = ~is_voxel_line
+    cells_per_voxel = np.bincount(
+        voxel_position[is_cell_line], minlength=len(voxel_line_indexes)
+    )
+    if not np.array_equal(cells_per_voxel, numbers[voxel_line_indexes]):
+        raise ValueError("The number of cells of a voxel in the meshinfo is wrong...")
+    voxel_ids = ids[voxel_line_indexes][voxel_position[is_cell_line]]
+    voxel_volumes = values[voxel_line_indexes][voxel_position[is_cell_line]]
 
-            data[KEY_VOXEL].append(voxel_id)
-            data[KEY_CELL].append(cell_id)
-            data[KEY_MATERIAL].append(material_id)
-            data[KEY_MASS_GRAMS].append(cell_mass)
+    cell_volume_inside_voxel = voxel_volumes * volume_proportions[is_cell_line]
+    cell_masses = cell_volume_inside_voxel * values[is_cell_line]
 
     if data_mesh_info.coordinates == CoordinateType.CYLINDRICAL:
         # WARNING: we divide the volume by 2 pi due to a bug in the D1S
         # generation of the meshinfo file for cyl coordinates.
         # It provides a volume calculated as if the theta coordinate units
         # were revolutions, but it is actually in radians.
-        data[KEY_MASS_GRAMS] = np.array(data[KEY_MASS_GRAMS]) / (2 * np.pi)
-
-    # Convert the data dictionary to a DataFrame
-    mass_dataframe = pd.DataFrame(data).set_index([KEY_VOXEL, KEY_MATERIAL, KEY_CELL])
+        cell_masses = cell_masses / (2 * np.pi)
+
+    # Build the sorted index directly, it is faster than set_index and sort_index
+    cell_ids, material_ids = ids[is_cell_line], numbers[is_cell_line]
+    order = np.lexsort((cell_ids, material_ids, voxel_ids))
+    level_values = [voxel_ids[order], material_ids[order], cell_ids[order]]
+    factorized_levels = [pd.factorize(level, sort=True) for level in level_values]
+    mass_index = pd.MultiIndex(
+        levels=[level for _codes, level in factorized_levels],
+        codes=[codes for codes, _level in factorized_levels],
+        names=[KEY_VOXEL, KEY_MATERIAL, KEY_CELL],
+        verify_integrity=False,
+    )
+    mass_dataframe = pd.DataFrame({KEY_MASS_GRAMS: cell_masses[order]}, mass_index)
 
     return DataMass(mass_dataframe)
 
 
-def _read_cell_part(volume: float, infile: TextIO) -> Tuple[int, float, float]:
-    cell_id, density, material_id, volume_proportion = infile.readline().split()
-    cell_id, material_id = int(cell_id), int(material_id)
-    density, volume_proportion = float(density), float(volume_proportion)
+class _SectionReader(io.TextIOBase):
+    """Reads a text file until the end marker, which is not included."""
+
+    def __init__(self, infile: TextIO, end_marker: str):
+        super().__init__()
+        self._infile = infile
+        self._end_marker = end_marker
+        # End of the previous block that may be the start of the marker
+        self._pending = ""
+        self._is_finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while not self._is_finished:
+            new_text = self._infile.read(size)
+            block = self._pending + new_text
 
-    cell_volume_inside_voxel = volume * volume_proportion
-    cell_mass = cell_volume_inside_voxel * density
+            marker_start = block.find(self._end_marker)
+            if marker_start != -1 or not new_text:
+                self._is_finished = True
+                return block if marker_start == -1 else block[:marker_start]
 
-    return cell_id, material_id, cell_mass
+            kept_length = min(len(self._end_marker) - 1, len(block))
+            self._pending = block[len(block) - kept_length :]
+            if len(block) > kept_length:
+                return block[: len(block) - kept_length]
+        return ""
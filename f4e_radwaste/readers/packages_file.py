@@ -0,0 +1,69 @@
+"""
+Reader for the files with the packages to evaluate. A package is a box or an STL file.
+The JSON format is as follows, the rotation and the names are optional:
+[
+    {"name": "Box_1", "origin": [0, 0, 0], "size": [10, 10, 10], "rotation": [0, 0, 45]},
+    {"stl": "container.stl"}
+]
+The CSV format has the columns name, origin_x, origin_y, origin_z, size_x, size_y,
+size_z, rot_x, rot_y, rot_z and stl, the rows with an STL path only need the stl.
+The STL packages are named after their file, the paths are relative to the folder of
+the packages file.
+"""
+
+import json
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+from f4e_radwaste.post_processing.package_evaluation import Package, PackageBox
+
+ORIGIN_COLUMNS = ["origin_x", "origin_y", "origin_z"]
+SIZE_COLUMNS = ["size_x", "size_y", "size_z"]
+ROTATION_COLUMNS = ["rot_x", "rot_y", "rot_z"]
+
+
+def read_file(file_path: Path) -> List[Package]:
+    file_path = Path(file_path)
+    if file_path.suffix.lower() == ".json":
+        with open(file_path, "r", encoding="utf-8") as infile:
+            package_definitions = json.load(infile)
+    elif file_path.suffix.lower() == ".csv":
+        package_definitions = read_csv_definitions(file_path)
+    else:
+        raise ValueError(f"The packages file should be a JSON or CSV: {file_path}")
+
+    return [
+        create_package(definition, position, file_path.parent)
+        for position, definition in enumerate(package_definitions)
+    ]
+
+
+def read_csv_definitions(file_path: Path) -> List[dict]:
+    dataframe = pd.read_csv(file_path, skipinitialspace=True)
+
+    definitions = []
+    for _index, row in dataframe.iterrows():
+        row = row.dropna()
+        definition = {key: row[key] for key in ["name", "stl"] if key in row.index}
+        if "stl" not in definition:
+            definition["origin"] = row[ORIGIN_COLUMNS].tolist()
+            definition["size"] = row[SIZE_COLUMNS].tolist()
+            definition["rotation"] = row.reindex(
+                ROTATION_COLUMNS, fill_value=0
+            ).tolist()
+        definitions.append(definition)
+    return definitions
+
+
+def create_package(definition: dict, position: int, folder_path: Path) -> Package:
+    if "stl" in definition:
+        return folder_path / definition["stl"]
+
+    return PackageBox(
+        name=str(definition.get("name", f"Package_{position + 1}")),
+        origin=tuple(float(value) for value in definition["origin"]),
+        size=tuple(float(value) for value in definition["size"]),
+        rotation=tuple(float(value) for value in definition.get("rotation", (0, 0, 0))),
+    )
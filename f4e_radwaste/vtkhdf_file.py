@@ -0,0 +1,125 @@
+import warnings
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pyvista as pv
+import tables
+
+# Offsets of the geometry of each step, always 0 as all the steps share it
+GEOMETRY_OFFSET_NAMES = [
+    "PartOffsets",
+    "PointOffsets",
+    "CellOffsets",
+    "ConnectivityIdOffsets",
+]
+
+
+def append_step_to_vtkhdf_file(file_path: Path, grid: pv.DataSet, time: float):
+    """
+    Appends the cell data of the grid as a new step of a transient VTKHDF file. The
+    geometry is only written by the first step, all the steps must share it.
+    Float cell arrays missing in some of the steps are filled with NaN, a missing
+    integer array (e.g. the radwaste class, where 0 is a class) raises ValueError.
+    """
+    # The names of the arrays are not valid python identifiers
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", tables.NaturalNameWarning)
+
+        with tables.open_file(file_path, mode="a") as h5_file:
+            if "/VTKHDF" not in h5_file:
+                _write_geometry(h5_file, grid)
+
+            cell_data = {
+                to_hdf5_name(name): grid.cell_data[name]
+                for name in grid.cell_data.keys()
+            }
+            _append_step(h5_file, cell_data, time)
+
+
+def to_hdf5_name(array_name: str) -> str:
+    """HDF5 names cannot include '/', it is replaced by a division slash."""
+    return array_name.replace("/", "∕")
+
+
+def _write_geometry(h5_file: tables.File, grid: pv.DataSet):
+    geometry = grid.copy(deep=False)
+    geometry.clear_data()
+    geometry = geometry.cast_to_unstructured_grid()
+
+    root = h5_file.create_group("/", "VTKHDF")
+    root._v_attrs.Version = np.array([2, 0], dtype=np.int64)
+    root._v_attrs.Type = np.bytes_("UnstructuredGrid")
+
+    connectivity = geometry.cell_connectivity
+    h5_file.create_array(root, "NumberOfPoints", np.array([geometry.n_points]))
+    h5_file.create_array(root, "NumberOfCells", np.array([geometry.n_cells]))
+    h5_file.create_array(root, "NumberOfConnectivityIds", np.array([len(connectivity)]))
+    h5_file.create_array(root, "Points", np.asarray(geometry.points, dtype=float))
+    h5_file.create_array(root, "Types", geometry.celltypes.astype(np.uint8))
+    h5_file.create_array(root, "Connectivity", connectivity.astype(np.int64))
+    h5_file.create_array(root, "Offsets", geometry.offset.astype(np.int64))
+    h5_file.create_group(root, "CellData")
+
+    steps = h5_file.create_group(root, "Steps")
+    steps._v_attrs.NSteps = 0
+    h5_file.create_earray(steps, "Values", tables.Float64Atom(), (0,))
+    for name in GEOMETRY_OFFSET_NAMES + ["NumberOfParts"]:
+        h5_file.create_earray(steps, name, tables.Int64Atom(), (0,))
+    h5_file.create_group(steps, "CellDataOffsets")
+
+
+def _append_step(h5_file: tables.File, cell_data: Dict[str, np.ndarray], time: float):
+    root = h5_file.root.VTKHDF
+    steps = root.Steps
+    step = int(steps._v_attrs.NSteps)
+    n_cells = int(root.NumberOfCells[0])
+
+    # Check before writing anything so the file stays consistent
+    new_names = set(cell_data).difference(root.CellData._v_children)
+    missing_names = set(root.CellData._v_children).difference(cell_data)
+    if step > 0:
+        _check_arrays_can_be_missing(
+            {name: cell_data[name].dtype for name in new_names}
+        )
+    _check_arrays_can_be_missing(
+        {name: root.CellData[name].atom.dtype for name in missing_names}
+    )
+
+    # Arrays that first appear in this step are missing in the previous ones
+    for name, values in cell_data.items():
+        if name in new_names:
+            previous_values = np.full(step * n_cells, np.nan).astype(values.dtype)
+            h5_file.create_earray(root.CellData, name, obj=previous_values)
+            h5_file.create_earray(
+                steps.CellDataOffsets,
+                name,
+                obj=np.arange(step, dtype=np.int64) * n_cells,
+            )
+
+    for name, data_array in root.CellData._v_children.items():
+        values = cell_data.get(name)
+        if values is None:
+            values = np.full(n_cells, np.nan, dtype=data_array.atom.dtype)
+
+        h5_file.get_node(steps.CellDataOffsets, name).append([data_array.nrows])
+        data_array.append(np.asarray(values, dtype=data_array.atom.dtype))
+
+    steps.Values.append([time])
+    for name in GEOMETRY_OFFSET_NAMES:
+        h5_file.get_node(steps, name).append([0])
+    steps.NumberOfParts.append([1])
+    steps._v_attrs.NSteps = step + 1
+
+
+def _check_arrays_can_be_missing(dtypes_by_name: Dict[str, np.dtype]):
+    not_float_names = [
+        name
+        for name, dtype in dtypes_by_name.items()
+        if not np.issubdtype(dtype, np.floating)
+    ]
+    if not_float_names:
+        raise ValueError(
+            "The arrays of the step differ from the ones of the file, and these "
+            f"cannot be filled with NaN: {sorted(not_float_names)}"
+        )
@@ -25,6 +25,11 @@ setup(
         "tables >= 3.8.0",
         "periodictable",
     ],
+    entry_points={
+        "console_scripts": [
+            "f4e_radwaste_evaluate_packages = f4e_radwaste.evaluate_packages:main",
+        ],
+    },
     extras_require={
         "test": ["unittest"],
     },
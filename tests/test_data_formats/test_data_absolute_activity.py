@@ -1,4 +1,5 @@
 import os
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -12,7 +13,10 @@ from f4e_radwaste.constants import (
     KEY_CELL,
     KEY_ISOTOPE,
 )
-from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
+from f4e_radwaste.data_formats.data_absolute_activity import (
+    DataAbsoluteActivity,
+    LazyDataAbsoluteActivity,
+)
 
 
 class DataFrameValidatorTests(unittest.TestCase):
@@ -137,6 +141,28 @@ class DataFrameValidatorTests(unittest.TestCase):
         )
         self.assertTrue(filtered_df.equals(expected_df))
 
+    def test_get_filtered_dataframe_same_as_isin_mask(self):
+        dataframe = self.data_absolute_activity._dataframe
+        filters = {KEY_CELL: [2, 7], KEY_ISOTOPE: ["B", "A", "B"]}
+
+        mask = pd.Series(True, index=dataframe.index)
+        for key, filter_values in filters.items():
+            mask &= dataframe.index.get_level_values(key).isin(filter_values)
+
+        filtered_df = self.data_absolute_activity.get_filtered_dataframe(
+            cells=filters[KEY_CELL], isotopes=filters[KEY_ISOTOPE]
+        )
+        pd.testing.assert_frame_equal(dataframe.loc[mask], filtered_df)
+
+    def test_get_filtered_dataframe_after_changing_the_index(self):
+        self.data_absolute_activity.get_filtered_dataframe(decay_times=[1])
+        self.data_absolute_activity.decay_times = [10, 20]
+
+        filtered_df = self.data_absolute_activity.get_filtered_dataframe(
+            decay_times=[20]
+        )
+        self.assertListEqual([1.5, 2.0], filtered_df[KEY_ABSOLUTE_ACTIVITY].tolist())
+
     def test_save_and_load_dataframe_to_hdf5(self):
         # Save the dataframe
         folder_path = Path("")
@@ -157,3 +183,127 @@ class DataFrameValidatorTests(unittest.TestCase):
 
         # Clean the file
         os.remove(folder_path / "DataAbsoluteActivity.hdf5")
+
+
+class LazyDataAbsoluteActivityTests(unittest.TestCase):
+    def setUp(self):
+        data = {
+            KEY_TIME: [1.0, 1.0, 2.0, 2.0, 3.0],
+            KEY_VOXEL: [1, 2, 1, 2, 1],
+            KEY_CELL: [1, 1, 2, 2, 2],
+            KEY_ISOTOPE: ["A", "B", "A", "B", "C"],
+            KEY_ABSOLUTE_ACTIVITY: [0.5, 1.0, 1.5, 2.0, 2.5],
+        }
+        df = pd.DataFrame(data)
+        df.set_index([KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE], inplace=True)
+        self.data_absolute_activity = DataAbsoluteActivity(df)
+
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.folder_path = Path(self.test_dir.name)
+        self.data_absolute_activity.save_partitioned_to_hdf5(self.folder_path)
+        self.lazy_activity = DataAbsoluteActivity.load(self.folder_path)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_load_partitioned_file(self):
+        self.assertIsInstance(self.lazy_activity, LazyDataAbsoluteActivity)
+        np.testing.assert_array_equal([1.0, 2.0, 3.0], self.lazy_activity.decay_times)
+        self.assertEqual(5, self.lazy_activity.n_rows)
+
+    def test_decay_times_are_loaded_when_needed(self):
+        self.lazy_activity.max_loaded_times = 2
+
+        for decay_time in [1.0, 2.0, 1.0, 3.0]:
+            filtered_df = self.lazy_activity.get_filtered_dataframe(
+                decay_times=[decay_time]
+            )
+            expected_df = self.data_absolute_activity.get_filtered_dataframe(
+                decay_times=[decay_time]
+            )
+            pd.testing.assert_frame_equal(expected_df, filtered_df)
+
+        # The least recently used decay time is the first one dropped
+        self.assertListEqual([0, 2], list(self.lazy_activity._loaded_times))
+
+    def test_get_filtered_dataframe_of_several_decay_times(self):
+        filters = {"cells": [2], "isotopes": ["A", "C"]}
+
+        filtered_df = self.lazy_activity.get_filtered_dataframe(**filters)
+
+        expected_df = self.data_absolute_activity.get_filtered_dataframe(**filters)
+        self.assertListEqual(expected_df.index.tolist(), filtered_df.index.tolist())
+        self.assertListEqual(
+            expected_df[KEY_ABSOLUTE_ACTIVITY].tolist(),
+            filtered_df[KEY_ABSOLUTE_ACTIVITY].tolist(),
+        )
+
+    def test_get_filtered_dataframe_without_decay_times(self):
+        filtered_df = self.lazy_activity.get_filtered_dataframe(decay_times=[5.0])
+
+        expected_df = self.data_absolute_activity.get_filtered_dataframe(
+            decay_times=[5.0]
+        )
+        self.assertTrue(filtered_df.empty)
+        self.assertListEqual(expected_df.index.names, filtered_df.index.names)
+        self.assertListEqual(
+            [level.dtype for level in expected_df.index.levels],
+            [level.dtype for level in filtered_df.index.levels],
+        )
+        pd.testing.assert_series_equal(expected_df.dtypes, filtered_df.dtypes)
+
+    def test_file_without_decay_times(self):
+        empty_df = self.data_absolute_activity.get_filtered_dataframe(decay_times=[5.0])
+        DataAbsoluteActivity(empty_df).save_partitioned_to_hdf5(self.folder_path)
+        lazy_activity = DataAbsoluteActivity.load(self.folder_path)
+
+        filtered_df = lazy_activity.get_filtered_dataframe(decay_times=[1.0])
+
+        self.assertEqual(0, len(lazy_activity.decay_times))
+        self.assertTrue(filtered_df.empty)
+        self.assertListEqual(
+            [KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE], filtered_df.index.names
+        )
+
+    def test_file_with_wrong_format(self):
+        file_path = self.folder_path / "DataAbsoluteActivity.hdf5"
+        wrong_df = self.data_absolute_activity.get_filtered_dataframe()
+        wrong_df.index = wrong_df.index.rename(KEY_CELL.lower(), level=KEY_CELL)
+        with pd.HDFStore(file_path, mode="w") as store:
+            store.put("decay_times", pd.Series([1.0, 2.0, 3.0]))
+            store.put("by_time/time_0", wrong_df, format="table")
+
+        with self.assertRaises(ValueError):
+            DataAbsoluteActivity.load(self.folder_path)
+
+    def test_save_partitioned_to_the_source_file(self):
+        self.lazy_activity.decay_times = ["1s", "2s", "3s"]
+
+        self.lazy_activity.save_partitioned_to_hdf5(self.folder_path)
+
+        loaded_activity = DataAbsoluteActivity.load(self.folder_path)
+        self.assertListEqual(["1s", "2s", "3s"], list(loaded_activity.decay_times))
+        self.assertEqual(5, loaded_activity.n_rows)
+        pd.testing.assert_frame_equal(
+            self.lazy_activity.get_filtered_dataframe(),
+            loaded_activity.get_filtered_dataframe(),
+        )
+
+    def test_save_dataframe_to_hdf5(self):
+        self.lazy_activity.save_dataframe_to_hdf5(self.folder_path)
+
+        loaded_activity = DataAbsoluteActivity.load(self.folder_path)
+        self.assertNotIsInstance(loaded_activity, LazyDataAbsoluteActivity)
+        pd.testing.assert_frame_equal(
+            self.data_absolute_activity.get_filtered_dataframe(),
+            loaded_activity.get_filtered_dataframe(),
+        )
+
+    def test_get_filtered_dataframe_after_renaming_decay_times(self):
+        self.lazy_activity.get_filtered_dataframe(decay_times=[2.0])
+        self.lazy_activity.decay_times = ["1s", "2s", "3s"]
+
+        filtered_df = self.lazy_activity.get_filtered_dataframe(decay_times=["2s"])
+
+        self.assertListEqual([1.5, 2.0], filtered_df[KEY_ABSOLUTE_ACTIVITY].tolist())
+        self.assertListEqual(["2s"], filtered_df.index.unique(level=KEY_TIME).tolist())
@@ -84,6 +84,23 @@ class DataMassTests(unittest.TestCase):
     def test_materials(self):
         np.testing.assert_array_equal(self.data_mass.materials, np.array([10, 20, 40]))
 
+    def test_get_materials_of_cells(self):
+        data = {
+            KEY_VOXEL: [1, 2, 2],
+            KEY_MATERIAL: [10, 20, 30],
+            KEY_CELL: [11, 11, 12],
+            KEY_MASS_GRAMS: [1.0, 1.0, 1.0],
+        }
+        df = pd.DataFrame(data)
+        df.set_index([KEY_VOXEL, KEY_MATERIAL, KEY_CELL], inplace=True)
+
+        positions, materials = DataMass(df).get_materials_of_cells(
+            np.array([12, 99, 11])
+        )
+
+        np.testing.assert_array_equal(np.array([0, 2, 2]), positions)
+        np.testing.assert_array_equal(np.array([30, 10, 20]), materials)
+
     def test_calculate_material_id_proportions(self):
         result = self.data_mass.calculate_material_id_proportions(
             cell_ids=[[11, 12], [14]]
@@ -1,7 +1,9 @@
 import os
+import tempfile
 import unittest
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import KEY_VOXEL, KEY_MASS_GRAMS
@@ -77,15 +79,91 @@ class DataMeshActivityTests(unittest.TestCase):
         column_2 = pd.Series(["str", "str", "str", "str"])
         column_1.index = [1, 2, 3, 4]
         column_2.index = [1, 2, 3, 4]
-        result_dataframe = self.data_mesh_activity.get_dataframe_with_added_columns(
+        result_dataframe = self.data_mesh_activity.with_added_columns(
             {
                 "Nb94": column_1,
                 "Other name": column_2,
             }
-        )
+        ).get_filtered_dataframe()
 
         pd.testing.assert_frame_equal(result_dataframe, expected_df)
 
+    def test_with_added_columns_shares_the_activity(self):
+        first_result = self.data_mesh_activity.with_added_columns(
+            {"IRAS": pd.Series([1.0, 2.0, 3.0, 4.0], index=[1, 2, 3, 4])}
+        )
+        second_result = first_result.with_added_columns(
+            {"CDR": pd.Series([5.0, 6.0, 7.0, 8.0], index=[1, 2, 3, 4])}
+        )
+
+        self.assertIs(self.data_mesh_activity._dataframe, second_result._dataframe)
+        self.assertListEqual(
+            ["CDR", "IRAS", KEY_MASS_GRAMS, "H3", "Fe55"],
+            second_result.columns.tolist(),
+        )
+        self.assertListEqual(
+            [KEY_MASS_GRAMS, "H3", "Fe55"], self.data_mesh_activity.columns.tolist()
+        )
+
+    def test_get_filtered_dataframe_with_added_columns(self):
+        result = self.data_mesh_activity.with_added_columns(
+            {"IRAS": pd.Series([1.0, 2.0, 3.0, 4.0], index=[1, 2, 3, 4])}
+        )
+
+        filtered_df = result.get_filtered_dataframe(
+            voxels=[2, 4], columns=["Fe55", "IRAS"]
+        )
+
+        expected_df = pd.DataFrame(
+            {KEY_VOXEL: [2, 4], "IRAS": [2.0, 4.0], "Fe55": [0.555, 0.444]}
+        )
+        expected_df.set_index([KEY_VOXEL], inplace=True)
+        pd.testing.assert_frame_equal(expected_df, filtered_df)
+
+        # The returned dataframe is a copy
+        filtered_df = result.get_filtered_dataframe()
+        filtered_df.loc[1, "H3"] = 0.0
+        self.assertEqual(0.1235, result.get_filtered_dataframe().loc[1, "H3"])
+
+    def test_get_unjoined_dataframes(self):
+        result = self.data_mesh_activity.with_added_columns(
+            {"IRAS": pd.Series([1.0, 2.0, 3.0, 4.0], index=[1, 2, 3, 4])}
+        )
+
+        result_columns, activity = result.get_unjoined_dataframes()
+
+        pd.testing.assert_frame_equal(
+            result.get_filtered_dataframe(),
+            pd.concat([result_columns, activity], axis=1),
+        )
+        # The activity is not copied
+        stored_activity = self.data_mesh_activity._dataframe
+        for column_name in stored_activity.columns:
+            self.assertTrue(
+                np.shares_memory(
+                    stored_activity[column_name].to_numpy(),
+                    activity[column_name].to_numpy(),
+                )
+            )
+
+    def test_to_csv_with_added_columns(self):
+        result = self.data_mesh_activity.with_added_columns(
+            {"IRAS": pd.Series([1.0, 2.0, 3.0, 4.0], index=[1, 2, 3, 4])}
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            result.to_csv(Path(folder), "test")
+            read_df = pd.read_csv(Path(folder) / "test.csv", index_col=KEY_VOXEL)
+
+        pd.testing.assert_frame_equal(result.get_filtered_dataframe(), read_df)
+
+    def test_nbytes(self):
+        result = self.data_mesh_activity.with_added_columns(
+            {"IRAS": pd.Series([1.0, 2.0, 3.0, 4.0], index=[1, 2, 3, 4])}
+        )
+
+        # The activity table is shared, only the added column is new
+        self.assertEqual(self.data_mesh_activity.nbytes + 4 * 8, result.nbytes)
+
     def test_to_csv(self):
         self.data_mesh_activity.to_csv(Path(""), "test")
         os.remove("test.csv")
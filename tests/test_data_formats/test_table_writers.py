@@ -0,0 +1,127 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import KEY_VOXEL, KEY_MASS_GRAMS, TableFormat
+from f4e_radwaste.data_formats import table_writers
+from f4e_radwaste.data_formats.table_writers import (
+    write_table,
+    is_table_format_available,
+)
+
+
+class TableWritersTests(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.folder_path = Path(self.test_dir.name)
+
+        data = {
+            KEY_VOXEL: [1, 2, 3],
+            "Radwaste class": [0, 2, 1],
+            KEY_MASS_GRAMS: [5.0, 5.0, 2.0],
+            "Total Activity [Bq/g]": [0.1235, 0.51255, 1.32e3],
+        }
+        self.dataframe = pd.DataFrame(data).set_index(KEY_VOXEL)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_write_table_csv(self):
+        write_table(self.dataframe, self.folder_path, "test", TableFormat.CSV)
+
+        read_df = pd.read_csv(self.folder_path / "test.csv", index_col=KEY_VOXEL)
+        pd.testing.assert_frame_equal(self.dataframe, read_df)
+
+    def test_write_table_hdf5(self):
+        write_table(self.dataframe, self.folder_path, "test", TableFormat.HDF5)
+
+        read_df = pd.read_hdf(self.folder_path / "test.hdf5", key="dataframe")
+        pd.testing.assert_frame_equal(self.dataframe, read_df)
+
+    def test_write_table_npz(self):
+        self.dataframe.index = pd.Index(["Comp A", "Comp B", "Comp C"], name=KEY_VOXEL)
+
+        write_table(self.dataframe, self.folder_path, "test", TableFormat.NPZ)
+
+        with np.load(self.folder_path / "test.npz") as npz_file:
+            self.assertListEqual(
+                [KEY_VOXEL] + self.dataframe.columns.tolist(), npz_file.files
+            )
+            read_df = pd.DataFrame(dict(npz_file)).set_index(KEY_VOXEL)
+        pd.testing.assert_frame_equal(self.dataframe, read_df, check_index_type=False)
+
+    def test_write_table_npz_without_compression(self):
+        write_table(self.dataframe, self.folder_path, "test", TableFormat.NPZ)
+
+        # Stored arrays can be memory-mapped from their offset in the file
+        with zipfile.ZipFile(self.folder_path / "test.npz") as npz_file:
+            compressions = {member.compress_type for member in npz_file.infolist()}
+        self.assertSetEqual({zipfile.ZIP_STORED}, compressions)
+
+    @unittest.skipUnless(
+        is_table_format_available(TableFormat.PARQUET), "pyarrow is not installed"
+    )
+    def test_write_table_parquet(self):
+        write_table(self.dataframe, self.folder_path, "test", TableFormat.PARQUET)
+
+        read_df = pd.read_parquet(self.folder_path / "test.parquet")
+        pd.testing.assert_frame_equal(self.dataframe, read_df.set_index(KEY_VOXEL))
+
+    @unittest.skipUnless(
+        is_table_format_available(TableFormat.FEATHER), "pyarrow is not installed"
+    )
+    def test_write_table_feather(self):
+        write_table(self.dataframe, self.folder_path, "test", TableFormat.FEATHER)
+
+        read_df = pd.read_feather(self.folder_path / "test.feather")
+        pd.testing.assert_frame_equal(self.dataframe, read_df.set_index(KEY_VOXEL))
+
+    def test_write_table_by_chunks_without_joining(self):
+        # Some text columns are longer in the last chunks
+        result_columns = pd.DataFrame(
+            {"Radwaste class": ["LLW", "ILW", "Not classified"]},
+            index=self.dataframe.index,
+        )
+        activity = self.dataframe.drop(columns="Radwaste class")
+        expected_df = pd.concat([result_columns, activity], axis=1)
+
+        with patch.object(table_writers, "BYTES_PER_CHUNK", 8):
+            for table_format in (TableFormat.CSV, TableFormat.HDF5, TableFormat.NPZ):
+                write_table(
+                    [result_columns, activity], self.folder_path, "test", table_format
+                )
+
+            with patch.object(table_writers.np, "savez") as savez:
+                write_table(
+                    [result_columns, activity],
+                    self.folder_path,
+                    "test",
+                    TableFormat.NPZ,
+                )
+
+        read_df = pd.read_csv(self.folder_path / "test.csv", index_col=KEY_VOXEL)
+        pd.testing.assert_frame_equal(expected_df, read_df)
+
+        read_df = pd.read_hdf(self.folder_path / "test.hdf5", key="dataframe")
+        pd.testing.assert_frame_equal(expected_df, read_df)
+
+        with np.load(self.folder_path / "test.npz") as npz_file:
+            read_df = pd.DataFrame(dict(npz_file)).set_index(KEY_VOXEL)
+        pd.testing.assert_frame_equal(expected_df, read_df, check_dtype=False)
+
+        # The activity columns are written from the arrays of the dataframe
+        written_arrays = savez.call_args.kwargs
+        for column_name, column in activity.items():
+            self.assertTrue(
+                np.shares_memory(column.to_numpy(), written_arrays[column_name])
+            )
+
+    def test_is_table_format_available(self):
+        self.assertTrue(is_table_format_available(TableFormat.CSV))
+        self.assertTrue(is_table_format_available(TableFormat.HDF5))
+        self.assertTrue(is_table_format_available(TableFormat.NPZ))
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from f4e_radwaste.gui.grid_cache import GridCache
+
+
+def create_arrays(n_bytes: int):
+    return {"Activity": np.zeros(n_bytes // 8)}
+
+
+class GridCacheTests(unittest.TestCase):
+    def test_get_missing_grid(self):
+        cache = GridCache()
+
+        self.assertIsNone(cache.get("1 day", None))
+
+    def test_key_does_not_depend_on_material_order(self):
+        cache = GridCache()
+        arrays = create_arrays(80)
+
+        cache.put("1 day", [3, 1], arrays)
+
+        self.assertIs(arrays, cache.get("1 day", [1, 3]))
+        self.assertIsNone(cache.get("1 day", None))
+        self.assertIsNone(cache.get("2 days", [1, 3]))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = GridCache(max_bytes=200)
+        cache.put("1 day", None, create_arrays(80))
+        cache.put("2 days", None, create_arrays(80))
+
+        # Using the first grid makes the second one the oldest
+        cache.get("1 day", None)
+        cache.put("3 days", None, create_arrays(80))
+
+        self.assertIsNotNone(cache.get("1 day", None))
+        self.assertIsNone(cache.get("2 days", None))
+        self.assertIsNotNone(cache.get("3 days", None))
+        self.assertEqual(160, cache.nbytes)
+
+    def test_put_existing_key_replaces_it(self):
+        cache = GridCache(max_bytes=200)
+        cache.put("1 day", [1], create_arrays(80))
+        cache.put("1 day", [1], create_arrays(160))
+
+        self.assertEqual(1, len(cache))
+        self.assertEqual(160, cache.nbytes)
+
+    def test_grid_larger_than_budget_is_not_stored(self):
+        cache = GridCache(max_bytes=100)
+        cache.put("1 day", None, create_arrays(80))
+
+        cache.put("2 days", None, create_arrays(160))
+
+        self.assertIsNone(cache.get("2 days", None))
+        self.assertIsNotNone(cache.get("1 day", None))
+
+    def test_clear(self):
+        cache = GridCache()
+        cache.put("1 day", None, create_arrays(80))
+
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.nbytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import MagicMock
+
+from f4e_radwaste.gui.job_generations import JobGenerations
+
+
+class JobGenerationsTests(unittest.TestCase):
+    def test_new_job_cancels_the_previous_one_of_its_kind(self):
+        generations = JobGenerations()
+        first_callback, second_callback = MagicMock(), MagicMock()
+
+        first = generations.start("update grid", first_callback)
+        second = generations.start("update grid", second_callback)
+
+        self.assertFalse(generations.is_last("update grid", first))
+        self.assertTrue(generations.is_last("update grid", second))
+        self.assertIsNone(generations.pop_callback("update grid", first))
+        self.assertIs(second_callback, generations.pop_callback("update grid", second))
+
+    def test_kinds_are_independent(self):
+        generations = JobGenerations()
+
+        grid = generations.start("update grid", MagicMock())
+        generations.start("load data tables", MagicMock())
+
+        self.assertTrue(generations.is_last("update grid", grid))
+
+    def test_callback_is_returned_once(self):
+        generations = JobGenerations()
+        generation = generations.start("update grid", MagicMock())
+
+        self.assertIsNotNone(generations.pop_callback("update grid", generation))
+        self.assertIsNone(generations.pop_callback("update grid", generation))
+
+    def test_cancel(self):
+        generations = JobGenerations()
+        generation = generations.start("update grid", MagicMock())
+
+        generations.cancel("update grid")
+
+        self.assertFalse(generations.is_last("update grid", generation))
+        self.assertIsNone(generations.pop_callback("update grid", generation))
+
+        # A job started after the cancellation is called back
+        callback = MagicMock()
+        new_generation = generations.start("update grid", callback)
+        self.assertIs(callback, generations.pop_callback("update grid", new_generation))
+
+    def test_cancel_without_jobs(self):
+        generations = JobGenerations()
+
+        generations.cancel("update grid")
+
+        self.assertEqual(1, generations.get("update grid"))
+        self.assertEqual(2, generations.start("update grid", MagicMock()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 
 import numpy as np
 import pandas as pd
+import pyvista as pv
 
 from f4e_radwaste.constants import (
     KEY_VOXEL,
@@ -18,7 +19,10 @@ from f4e_radwaste.meshgrids import (
     create_cylindrical_grid_z_axis,
     create_cylindrical_grid,
     create_grid,
+    create_sparse_grid,
     correct_theta_vector,
+    get_cell_centers,
+    get_voxel_ids_of_grid_cells,
     extend_theta_intervals,
 )
 
@@ -206,3 +210,75 @@ class MeshgridsTests(unittest.TestCase):
         #  I am really using a THETA-Z-R in the R2S voxels
         cell_index = grid.find_closest_cell([0, 1.5, 5.5])
         self.assertAlmostEqual(80, grid[KEY_MASS_GRAMS][cell_index])
+
+    def test_create_grid_reuses_the_geometry(self):
+        first_grid = create_grid(self.data_mesh_info_cart, self.data_mesh_activity)
+        # Another DataMeshInfo of the same mesh
+        data_mesh_info = DataMeshInfo(
+            coordinates=CoordinateType.CARTESIAN,
+            vector_i=np.array([0, 1, 2]),
+            vector_j=np.array([10, 20, 30]),
+            vector_k=np.array([5, 6, 7]),
+        )
+        second_grid = create_grid(data_mesh_info)
+
+        self.assertTrue(np.shares_memory(first_grid.points, second_grid.points))
+        self.assertIn(KEY_MASS_GRAMS, first_grid.array_names)
+        self.assertListEqual([], second_grid.array_names)
+
+    def test_create_grid_of_other_mesh(self):
+        cartesian_grid = create_grid(self.data_mesh_info_cart)
+        cylindrical_grid = create_grid(self.data_mesh_info_cyl)
+
+        self.assertFalse(
+            np.shares_memory(cartesian_grid.points, cylindrical_grid.points)
+        )
+        self.assertEqual(8, cartesian_grid.n_cells)
+        self.assertEqual(80, cylindrical_grid.n_cells)
+
+    def test_get_cell_centers(self):
+        for data_mesh_info in [self.data_mesh_info_cart, self.data_mesh_info_cyl]:
+            grid = create_grid(data_mesh_info)
+
+            centers = get_cell_centers(data_mesh_info)
+
+            np.testing.assert_allclose(grid.cell_centers().points, centers)
+            self.assertIs(centers, get_cell_centers(data_mesh_info))
+
+    def test_get_voxel_ids_of_grid_cells(self):
+        grid = create_grid(self.data_mesh_info_cart, self.data_mesh_activity)
+
+        voxel_ids = get_voxel_ids_of_grid_cells(self.data_mesh_info_cart)
+
+        # The grid cells of the voxels without data are 0
+        masses = self.data_mesh_activity.get_filtered_dataframe()[KEY_MASS_GRAMS]
+        expected = masses.reindex(voxel_ids, fill_value=0).to_numpy()
+        np.testing.assert_array_equal(expected, grid[KEY_MASS_GRAMS])
+
+    def test_create_sparse_grid(self):
+        data_mesh_activity = DataMeshActivity(
+            self.data_mesh_activity.get_filtered_dataframe().loc[[2, 4]]
+        )
+        full_grid = create_grid(self.data_mesh_info_cart, data_mesh_activity)
+
+        grid = create_sparse_grid(self.data_mesh_info_cart, data_mesh_activity)
+
+        self.assertIsInstance(grid, pv.UnstructuredGrid)
+        self.assertEqual(2, grid.n_cells)
+        self.assertListEqual([KEY_MASS_GRAMS, "H3", "Fe55"], grid.array_names)
+        self.assertListEqual([120, 140], grid["H3"].tolist())
+        cells = np.flatnonzero(full_grid["H3"])
+        np.testing.assert_array_equal(
+            full_grid.cell_centers().points[cells], grid.cell_centers().points
+        )
+
+    def test_create_sparse_grid_for_cylindrical_extended_thetas(self):
+        data_mesh_activity = DataMeshActivity(
+            self.data_mesh_activity.get_filtered_dataframe().loc[[1]]
+        )
+
+        grid = create_sparse_grid(self.data_mesh_info_cyl, data_mesh_activity)
+
+        # The voxel is split in the cells of the extended thetas
+        self.assertEqual(10, grid.n_cells)
+        self.assertSetEqual({110}, set(grid["H3"].tolist()))
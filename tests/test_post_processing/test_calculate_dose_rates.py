@@ -1,5 +1,6 @@
 import unittest
 
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import KEY_VOXEL, KEY_MASS_GRAMS, KEY_DOSE_1_METER, KEY_CDR
@@ -64,7 +65,7 @@ class CalculateDoseRatesTests(unittest.TestCase):
         result_data_mesh_activity = self.dose_calculator.calculate_doses(
             self.data_mesh_activity, cdr_factors_list
         )
-        result_df = result_data_mesh_activity._dataframe
+        result_df = result_data_mesh_activity.get_filtered_dataframe()
 
         # Dose at 1 meter
         expected_comp_1 = 5 * 1.59e-08 + 3 * 5.55e-08
@@ -94,11 +95,67 @@ class CalculateDoseRatesTests(unittest.TestCase):
 
         self.assertAlmostEqual(cdr_fe55_second_row, cdr_factors_list[1]["Fe55"])
 
-    def test_calculate_element_mixes(self):
-        material_id_proportions = [pd.Series({12: 1.0}), pd.Series({12: 0.4, 99: 0.6})]
-        element_mixes = self.dose_calculator._calculate_element_mixes(
+    def test_calculate_element_mix_matrix(self):
+        material_id_proportions = pd.DataFrame(
+            [pd.Series({12: 1.0}), pd.Series({12: 0.4, 99: 0.6, 7: 1.0})]
+        )
+        element_mixes = self.dose_calculator.calculate_element_mix_matrix(
             material_id_proportions
         )
 
-        self.assertAlmostEqual(0.4, element_mixes[0]["H"])
-        self.assertAlmostEqual(0.4 * 0.4, element_mixes[1]["H"])
+        self.assertAlmostEqual(0.4, element_mixes.loc[0, "H"])
+        self.assertAlmostEqual(0.4 * 0.4, element_mixes.loc[1, "H"])
+        self.assertAlmostEqual(0.0, element_mixes.loc[0, "Be"])
+        self.assertAlmostEqual(0.6 * 0.5, element_mixes.loc[1, "Be"])
+
+    def test_calculate_cdr_factors_matrix(self):
+        material_id_proportions = pd.DataFrame(
+            {12: [1.0, 0.4, np.nan], 99: [0.0, 0.6, np.nan]}
+        )
+        cdr_factors = self.dose_calculator.calculate_cdr_factors_matrix(
+            material_id_proportions
+        )
+
+        cdr_list = self.dose_calculator.calculate_cdr_factors_list(
+            [pd.Series({12: 1.0}), pd.Series({12: 0.4, 99: 0.6}), pd.Series()]
+        )
+        for row_factors, expected_factors in zip(cdr_factors.to_numpy(), cdr_list):
+            np.testing.assert_allclose(expected_factors.values, row_factors)
+        self.assertAlmostEqual(
+            0.4 * 0.4 * 4.80e-09 + 0.4 * 0.6 * 9.53e-09, cdr_factors.loc[1, "Fe55"]
+        )
+        self.assertListEqual([0.0] * 6, cdr_factors.loc[2].tolist())
+
+    def test_calculate_doses_with_shared_cdr_factors(self):
+        cdr_factors = pd.Series({"Be11": 2.0, "B14": 3.0, "Fe55": 4.0})
+
+        shared_result = self.dose_calculator.calculate_doses(
+            self.data_mesh_activity, cdr_factors
+        )
+        by_row_result = self.dose_calculator.calculate_doses(
+            self.data_mesh_activity, [cdr_factors] * 4
+        )
+
+        expected_cdr = [5 * 2.0 + 3 * 3.0, 5 * 2.0 + 3 * 3.0, 8e12 * 2.0 + 9.0]
+        self.assertListEqual(
+            expected_cdr, shared_result.get_filtered_dataframe()[KEY_CDR].tolist()[:3]
+        )
+        pd.testing.assert_frame_equal(
+            shared_result.get_filtered_dataframe(),
+            by_row_result.get_filtered_dataframe(),
+        )
+
+    def test_calculate_cdr_values_with_different_isotopes(self):
+        activity_df = self.data_mesh_activity.get_filtered_dataframe()
+        cdr_factor_columns = [
+            pd.Series({"Be11": 1.0}),
+            pd.Series({"B14": 2.0, "Xe135": 5.0}),
+            pd.Series({"Be11": np.nan, "B14": 1.0}),
+            pd.Series(dtype=float),
+        ]
+
+        result = self.dose_calculator._calculate_cdr_values(
+            activity_df, cdr_factor_columns
+        )
+
+        self.assertListEqual([5.0, 6.0, 3.0, 0.0], result.tolist())
@@ -1,9 +1,14 @@
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 
-from f4e_radwaste.post_processing.classify_waste import classify_waste
+from f4e_radwaste.post_processing import classify_waste as classify_waste_module
+from f4e_radwaste.post_processing.classify_waste import (
+    classify_waste,
+    WasteClassifier,
+)
 from f4e_radwaste.constants import (
     KEY_ISOTOPE,
     KEY_HALF_LIFE,
@@ -81,3 +86,57 @@ class ClassifyWasteTests(unittest.TestCase):
         voxel_4_data = data_mesh_activity.get_filtered_dataframe(voxels=[4])
         radwaste_class_voxel_4 = voxel_4_data[KEY_RADWASTE_CLASS].values[0]
         self.assertEqual(radwaste_class_voxel_4, TYPE_B_INT)
+
+    def test_waste_classifier_with_other_column_order(self):
+        classifier = WasteClassifier(self.data_isotope_criteria)
+        dataframe = self.data_mesh_activity.get_filtered_dataframe()
+        reordered_activity = DataMeshActivity(dataframe[dataframe.columns[::-1]])
+
+        result = classifier.classify(self.data_mesh_activity).get_filtered_dataframe()
+        reordered_result = classifier.classify(
+            reordered_activity
+        ).get_filtered_dataframe()
+
+        pd.testing.assert_frame_equal(
+            result, reordered_result[result.columns], check_exact=True
+        )
+        self.assertEqual(2, len(classifier._layouts))
+
+    def test_waste_classifier_reuses_the_layout(self):
+        classifier = WasteClassifier(self.data_isotope_criteria)
+
+        first_result = classifier.classify(
+            self.data_mesh_activity
+        ).get_filtered_dataframe()
+        second_result = classifier.classify(
+            self.data_mesh_activity
+        ).get_filtered_dataframe()
+
+        pd.testing.assert_frame_equal(first_result, second_result)
+        self.assertEqual(1, len(classifier._layouts))
+
+    def test_waste_classifier_drops_the_least_recently_used_layout(self):
+        classifier = WasteClassifier(self.data_isotope_criteria)
+        dataframe = self.data_mesh_activity.get_filtered_dataframe()
+
+        with patch.object(classify_waste_module, "MAX_CACHED_LAYOUTS", 2):
+            for columns in [["H3"], ["Be10"], ["H3"], ["K42"]]:
+                classifier.classify(
+                    DataMeshActivity(dataframe[[KEY_MASS_GRAMS] + columns])
+                )
+
+        self.assertListEqual(
+            [(KEY_MASS_GRAMS, "H3"), (KEY_MASS_GRAMS, "K42")], list(classifier._layouts)
+        )
+
+    def test_classify_waste_with_nan_activity(self):
+        dataframe = self.data_mesh_activity.get_filtered_dataframe()
+        dataframe.loc[1, "Be10"] = np.nan
+
+        result = classify_waste(
+            DataMeshActivity(dataframe), self.data_isotope_criteria
+        ).get_filtered_dataframe()
+
+        self.assertEqual(4 / 1000, result.loc[1, KEY_IRAS])
+        self.assertEqual(4 + 6, result.loc[1, KEY_TOTAL_SPECIFIC_ACTIVITY])
+        self.assertEqual(4, result.loc[1, KEY_RELEVANT_SPECIFIC_ACTIVITY])
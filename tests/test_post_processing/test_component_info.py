@@ -1,5 +1,6 @@
 import unittest
 
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import KEY_VOXEL, KEY_MATERIAL, KEY_CELL, KEY_MASS_GRAMS
@@ -93,3 +94,19 @@ class ComponentsInfoTests(unittest.TestCase):
         )
 
         self.assertListEqual([1, 2, 3, 4, 33, 44], components_info.get_all_cell_ids())
+
+    def test_get_components_of_cells(self):
+        component_ids = [("Component 1", [1, 2]), ("Component 2", [2, 3, 3])]
+        components_info = ComponentsInfo(
+            component_ids=component_ids,
+            data_mass=self.data_mass,
+            dose_calculator=self.dose_calculator,
+        )
+
+        positions, components = components_info.get_components_of_cells(
+            np.array([3, 99, 2, 1])
+        )
+
+        # Cell 2 is in both components and cell 99 in none
+        np.testing.assert_array_equal([0, 2, 2, 3], positions)
+        np.testing.assert_array_equal([1, 0, 1, 0], components)
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from f4e_radwaste.post_processing import input_cache
+from f4e_radwaste.post_processing.input_cache import (
+    read_with_cache,
+    get_cache_entry_name,
+    FILENAME_FINGERPRINT,
+)
+
+
+def save_text(data: str, folder_path: Path):
+    with open(folder_path / "data.txt", "w") as infile:
+        infile.write(data)
+
+
+def load_text(folder_path: Path) -> str:
+    with open(folder_path / "data.txt", "r") as infile:
+        return infile.read()
+
+
+class InputCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.cache_dir = self.test_dir / "input_cache"
+        self.source_path = self.test_dir / "source.dat"
+        with open(self.source_path, "w") as infile:
+            infile.write("original content")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read_with_mock_reader(self, parsed_data: str):
+        read_source = MagicMock(return_value=parsed_data)
+        result = read_with_cache(
+            source_path=self.source_path,
+            cache_folder_path=self.cache_dir,
+            read_source=read_source,
+            save=save_text,
+            load=load_text,
+        )
+        return result, read_source
+
+    def test_first_read_stores_the_data(self):
+        result, read_source = self.read_with_mock_reader("parsed")
+
+        self.assertEqual("parsed", result)
+        read_source.assert_called_once()
+        entry_path = self.cache_dir / get_cache_entry_name(self.source_path)
+        self.assertTrue((entry_path / FILENAME_FINGERPRINT).is_file())
+
+    def test_second_read_loads_from_cache(self):
+        self.read_with_mock_reader("parsed")
+        result, read_source = self.read_with_mock_reader("parsed again")
+
+        self.assertEqual("parsed", result)
+        read_source.assert_not_called()
+
+    def test_modified_source_is_read_again(self):
+        self.read_with_mock_reader("parsed")
+        with open(self.source_path, "w") as infile:
+            infile.write("modified content!")
+
+        result, read_source = self.read_with_mock_reader("parsed again")
+
+        self.assertEqual("parsed again", result)
+        read_source.assert_called_once()
+
+    def test_touched_source_with_same_content_loads_from_cache(self):
+        self.read_with_mock_reader("parsed")
+        stat = self.source_path.stat()
+        os.utime(self.source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result, read_source = self.read_with_mock_reader("parsed again")
+
+        self.assertEqual("parsed", result)
+        read_source.assert_not_called()
+
+    def test_different_options_use_different_entries(self):
+        self.assertNotEqual(
+            get_cache_entry_name(self.source_path),
+            get_cache_entry_name(self.source_path, options_key="decay_times=1.000e+05"),
+        )
+
+    def test_new_format_version_reads_the_source_again(self):
+        self.read_with_mock_reader("parsed")
+
+        new_version = input_cache.CACHE_FORMAT_VERSION + 1
+        with patch.object(input_cache, "CACHE_FORMAT_VERSION", new_version):
+            result, read_source = self.read_with_mock_reader("parsed again")
+
+        self.assertEqual("parsed again", result)
+        read_source.assert_called_once()
@@ -222,6 +222,33 @@ class InputDataTests(unittest.TestCase):
             data_mesh_activity._dataframe, expected_mesh_activity._dataframe
         )
 
+    def test_iterate_mesh_activities_by_material(self):
+        for decay_time in [1, 2]:
+            result = dict(
+                self.input_data.iterate_mesh_activities_by_material(decay_time)
+            )
+
+            for material in [10, 20, 30]:
+                try:
+                    expected = self.input_data.get_mesh_activity_by_time_and_materials(
+                        decay_time, [material]
+                    )
+                except ValueError:
+                    self.assertNotIn(material, result)
+                    continue
+
+                pd.testing.assert_frame_equal(
+                    expected._dataframe, result[material]._dataframe
+                )
+
+    def test_iterate_mesh_outputs_by_material(self):
+        outputs = list(self.input_data.iterate_mesh_outputs_by_material(2))
+
+        self.assertListEqual(
+            ["Time 2.00s with materials [10]", "Time 2.00s with materials [20]"],
+            [output.name for output in outputs],
+        )
+
     def test_get_component_output_by_time_and_ids(self):
         component_output = self.input_data.get_component_output_by_time_and_ids(
             decay_time=1,
@@ -249,12 +276,10 @@ class InputDataTests(unittest.TestCase):
         df.set_index([KEY_VOXEL], inplace=True)
 
         pd.testing.assert_frame_equal(
-            df, component_output.data_mesh_activity._dataframe
+            df, component_output.data_mesh_activity.get_filtered_dataframe()
         )
         self.assertEqual("1.00s_by_component", component_output.name)
-        self.assertIn(
-            KEY_RADWASTE_CLASS, component_output.data_mesh_activity._dataframe.columns
-        )
+        self.assertIn(KEY_RADWASTE_CLASS, component_output.data_mesh_activity.columns)
 
     def test_get_component_mesh_activity_by_time_and_ids(self):
         comp_mesh_act = self.input_data.get_component_mesh_activity_by_time_and_ids(
@@ -275,19 +300,48 @@ class InputDataTests(unittest.TestCase):
 
         pd.testing.assert_frame_equal(df, comp_mesh_act._dataframe)
 
+    def test_get_component_mesh_activity_with_shared_cells(self):
+        # Components can repeat names and cells, the columns are ordered by first
+        # appearance with the mass after the isotopes of the first component
+        component_ids = [
+            ["Component", [3]],
+            ["Component", [1, 3]],
+            ["Empty component", [99999]],
+        ]
+        components_info = ComponentsInfo(
+            component_ids=component_ids,
+            data_mass=self.input_data.data_mesh_info.data_mass,
+            dose_calculator=self.dose_calculator,
+        )
+
+        comp_mesh_act = self.input_data.get_component_mesh_activity_by_time_and_ids(
+            decay_time=1, components_info=components_info
+        )
+
+        data = {
+            KEY_VOXEL: ["Component", "Component", "Empty component"],
+            "H3": [2 / 10, 2.5 / 12, 0.0],
+            KEY_MASS_GRAMS: [10.0, 12.0, 0.0],
+            "Fe55": [0.0, 1 / 12, 0.0],
+        }
+        df = pd.DataFrame(data)
+        df.set_index([KEY_VOXEL], inplace=True)
+
+        pd.testing.assert_frame_equal(df, comp_mesh_act._dataframe)
+
     def test_get_mesh_output_by_time_and_materials(self):
         result = self.input_data.get_mesh_output_by_time_and_materials(1, [10])
 
         self.assertIsInstance(result, MeshOutput)
-        self.assertIn(KEY_RADWASTE_CLASS, result.data_mesh_activity._dataframe.columns)
+        self.assertIn(KEY_RADWASTE_CLASS, result.data_mesh_activity.columns)
 
     def test_try_get_mesh_output_by_time_and_materials_no_exception(self):
         result_try = self.input_data.try_get_mesh_output_by_time_and_materials(1, [10])
         direct_result = self.input_data.get_mesh_output_by_time_and_materials(1, [10])
 
         pd.testing.assert_frame_equal(
-            result_try.data_mesh_activity._dataframe,
-            direct_result.data_mesh_activity._dataframe,
+            result_try.data_mesh_activity.get_filtered_dataframe(),
+            direct_result.data_mesh_activity.get_filtered_dataframe(),
         )
 
     def test_try_get_mesh_output_by_time_and_materials_with_exception(self):
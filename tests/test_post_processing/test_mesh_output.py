@@ -1,3 +1,4 @@
+import os
 import shutil
 import tempfile
 import unittest
@@ -5,6 +6,7 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import tables
 
 from f4e_radwaste.constants import (
     CoordinateType,
@@ -12,12 +14,14 @@ from f4e_radwaste.constants import (
     KEY_MATERIAL,
     KEY_CELL,
     KEY_MASS_GRAMS,
+    VtkFormat,
 )
 from f4e_radwaste.data_formats.data_mass import DataMass
 from f4e_radwaste.data_formats.data_mesh_activity import DataMeshActivity
 from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
 from f4e_radwaste.post_processing.folder_paths import FolderPaths
 from f4e_radwaste.post_processing.mesh_ouput import MeshOutput
+from f4e_radwaste.post_processing.output_options import OutputOptions
 
 
 class MeshOutputTests(unittest.TestCase):
@@ -85,3 +89,31 @@ class MeshOutputTests(unittest.TestCase):
             f"{self.mesh_output.data_mesh_activity.__class__.__name__}.vts"
         )
         self.assertTrue(self.folder_paths.vtk_results / mesh_activity_vtk)
+
+    def test_save_as_unstructured_grid(self):
+        output_options = OutputOptions(vtk_format=VtkFormat.UNSTRUCTURED)
+
+        self.mesh_output.save(self.folder_paths, output_options)
+
+        self.assertListEqual(["name.vtu"], os.listdir(self.folder_paths.vtk_results))
+
+    def test_save_as_time_series(self):
+        output_options = OutputOptions(vtk_format=VtkFormat.TIME_SERIES)
+        self.mesh_output.decay_time = 10.0
+        self.mesh_output.materials = [10]
+
+        self.mesh_output.save(self.folder_paths, output_options)
+        self.mesh_output.decay_time = 20.0
+        self.mesh_output.save(self.folder_paths, output_options)
+
+        file_name = "Time series with materials [10].vtkhdf"
+        self.assertListEqual([file_name], os.listdir(self.folder_paths.vtk_results))
+        with tables.open_file(self.folder_paths.vtk_results / file_name) as h5_file:
+            steps = h5_file.root.VTKHDF.Steps
+            self.assertListEqual([10.0, 20.0], steps.Values.read().tolist())
+
+    def test_save_as_time_series_without_decay_time(self):
+        output_options = OutputOptions(vtk_format=VtkFormat.TIME_SERIES)
+
+        with self.assertRaises(ValueError):
+            self.mesh_output.save(self.folder_paths, output_options)
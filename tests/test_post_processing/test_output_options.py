@@ -0,0 +1,17 @@
+import unittest
+
+from f4e_radwaste.constants import TableFormat
+from f4e_radwaste.data_formats.table_writers import is_table_format_available
+from f4e_radwaste.post_processing.output_options import OutputOptions
+
+
+class OutputOptionsTests(unittest.TestCase):
+    def test_default_table_formats(self):
+        self.assertTupleEqual((TableFormat.CSV,), OutputOptions().table_formats)
+
+    @unittest.skipIf(
+        is_table_format_available(TableFormat.PARQUET), "pyarrow is installed"
+    )
+    def test_unavailable_table_format(self):
+        with self.assertRaises(ImportError):
+            OutputOptions(table_formats=(TableFormat.CSV, TableFormat.PARQUET))
@@ -0,0 +1,78 @@
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from f4e_radwaste.post_processing.folder_paths import FolderPaths
+from f4e_radwaste.post_processing.output_writer import OutputWriter
+
+
+class OutputWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.folder_paths = FolderPaths(
+            input_files=Path(""),
+            data_tables=Path(""),
+            csv_results=Path(""),
+            vtk_results=Path(""),
+        )
+        self.saved_names = []
+        self.save_threads = set()
+
+    def create_output(self, name: str, n_bytes: int = 10, save=None):
+        def record_save(folder_paths, output_options):
+            self.save_threads.add(threading.get_ident())
+            self.saved_names.append(name)
+
+        return SimpleNamespace(
+            name=name,
+            data_mesh_activity=SimpleNamespace(nbytes=n_bytes),
+            save=record_save if save is None else save,
+        )
+
+    def test_outputs_saved_in_order_in_background(self):
+        with OutputWriter(self.folder_paths) as writer:
+            for name in ["a", "b", "c"]:
+                # noinspection PyTypeChecker
+                writer.submit(self.create_output(name))
+
+        self.assertListEqual(["a", "b", "c"], self.saved_names)
+        self.assertNotIn(threading.get_ident(), self.save_threads)
+
+    def test_bytes_in_flight_are_limited(self):
+        writer = OutputWriter(self.folder_paths, max_bytes_in_flight=25)
+        release_saves = threading.Event()
+
+        def blocked_save(folder_paths, output_options):
+            release_saves.wait()
+
+        with writer:
+            # noinspection PyTypeChecker
+            writer.submit(self.create_output("a", save=blocked_save))
+            # noinspection PyTypeChecker
+            writer.submit(self.create_output("b", save=blocked_save))
+            self.assertEqual(20, writer._bytes_in_flight)
+
+            release_saves.set()
+            # noinspection PyTypeChecker
+            writer.submit(self.create_output("c"))
+            # The first output had to be saved before submitting the third one
+            self.assertEqual(20, writer._bytes_in_flight)
+
+        self.assertEqual(0, writer._bytes_in_flight)
+        self.assertListEqual(["c"], self.saved_names)
+
+    def test_output_larger_than_limit(self):
+        with OutputWriter(self.folder_paths, max_bytes_in_flight=5) as writer:
+            # noinspection PyTypeChecker
+            writer.submit(self.create_output("a", n_bytes=10))
+
+        self.assertListEqual(["a"], self.saved_names)
+
+    def test_error_of_save_is_raised(self):
+        def failed_save(folder_paths, output_options):
+            raise OSError("Disk full")
+
+        with self.assertRaises(OSError):
+            with OutputWriter(self.folder_paths) as writer:
+                # noinspection PyTypeChecker
+                writer.submit(self.create_output("a", save=failed_save))
@@ -0,0 +1,225 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyvista as pv
+
+from f4e_radwaste.constants import (
+    KEY_TIME,
+    KEY_VOXEL,
+    KEY_CELL,
+    KEY_ISOTOPE,
+    KEY_ABSOLUTE_ACTIVITY,
+    KEY_MASS_GRAMS,
+    KEY_MATERIAL,
+    KEY_RADWASTE_CLASS,
+    KEY_IRAS,
+    KEY_RELEVANT_SPECIFIC_ACTIVITY,
+    KEY_TOTAL_SPECIFIC_ACTIVITY,
+    KEY_DOSE_1_METER,
+    KEY_CDR,
+    CoordinateType,
+)
+from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
+from f4e_radwaste.data_formats.data_mass import DataMass
+from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
+from f4e_radwaste.meshgrids import create_grid, get_voxel_ids_of_grid_cells
+from f4e_radwaste.post_processing.calculate_dose_rates import DoseCalculator
+from f4e_radwaste.post_processing.classify_waste import classify_waste
+from f4e_radwaste.post_processing.collapsed_data import CollapsedData
+from f4e_radwaste.post_processing.input_data import InputData
+from f4e_radwaste.post_processing.package_evaluation import (
+    KEY_PACKAGE,
+    KEY_ISOTOPES_EXCEEDING_LMA,
+    PackageBox,
+    evaluate_packages_of_input_data,
+    match_decay_times,
+)
+from f4e_radwaste.readers import isotope_criteria_file
+from f4e_radwaste.readers.dose_matrix_file import (
+    read_dose_1_m_factors,
+    read_contact_dose_rate_factors,
+)
+
+N_VOXELS = 3 * 4 * 5
+
+
+class PackageBoxTests(unittest.TestCase):
+    def test_mask_points_inside_matches_vtk(self):
+        points = np.random.default_rng(0).uniform(-5, 15, (5000, 3))
+        box = PackageBox(
+            "Box", origin=(1, 2, 3), size=(6, 4, 5), rotation=(20, -35, 60)
+        )
+
+        mask = box.get_mask_points_inside(points)
+
+        expected = pv.PolyData(points).select_enclosed_points(box.create_mesh())
+        np.testing.assert_array_equal(expected["SelectedPoints"].astype(bool), mask)
+        self.assertGreater(mask.sum(), 0)
+
+
+class EvaluatePackagesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        voxels = np.arange(1, N_VOXELS + 1)
+
+        data = {
+            KEY_VOXEL: np.repeat(voxels, 2),
+            KEY_MATERIAL: np.tile([10, 20], N_VOXELS),
+            KEY_CELL: np.tile([1, 2], N_VOXELS),
+            KEY_MASS_GRAMS: rng.uniform(1, 10, 2 * N_VOXELS),
+        }
+        df = pd.DataFrame(data).set_index([KEY_VOXEL, KEY_MATERIAL, KEY_CELL])
+        data_mesh_info = DataMeshInfo(
+            coordinates=CoordinateType.CARTESIAN,
+            data_mass=DataMass(df),
+            vector_i=np.arange(4.0),
+            vector_j=np.arange(5.0),
+            vector_k=np.arange(6.0),
+        )
+
+        index = pd.MultiIndex.from_product(
+            [[1.0, 2.0], voxels, [1, 2], ["H3", "Co60"]],
+            names=[KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE],
+        )
+        activity = pd.DataFrame(
+            {KEY_ABSOLUTE_ACTIVITY: 10 ** rng.uniform(0, 6, len(index))}, index=index
+        )
+
+        self.input_data = InputData(
+            data_absolute_activity=DataAbsoluteActivity(activity),
+            data_mesh_info=data_mesh_info,
+            isotope_criteria=isotope_criteria_file.read_file(),
+        )
+        self.dose_calculator = DoseCalculator(
+            dose_1_m_factors=read_dose_1_m_factors(),
+            cdr_factors=read_contact_dose_rate_factors(),
+            element_mix_by_material_id={},
+        )
+
+    def evaluate_like_the_gui(self, box_mesh, decay_time, materials) -> CollapsedData:
+        grid = create_grid(self.input_data.data_mesh_info)
+        mask = grid.cell_centers().select_enclosed_points(box_mesh)["SelectedPoints"]
+        voxel_ids = get_voxel_ids_of_grid_cells(self.input_data.data_mesh_info)
+
+        package_activity = self.input_data.get_collapsed_activity(
+            decay_time=decay_time,
+            materials=materials,
+            voxels=voxel_ids[mask.astype(bool)],
+        )
+        package_activity = classify_waste(
+            package_activity, self.input_data.isotope_criteria
+        )
+        package_activity = self.dose_calculator.calculate_doses_in_concrete(
+            package_activity
+        )
+        return CollapsedData(package_activity)
+
+    def test_results_match_the_gui(self):
+        packages = [
+            PackageBox("Box", origin=(0.2, 0.7, 1.1), size=(2, 3, 2)),
+            PackageBox(
+                "Rotated", origin=(1, 0, 1), size=(2, 2, 3), rotation=(0, 0, 30)
+            ),
+        ]
+        with tempfile.TemporaryDirectory() as folder:
+            stl_path = Path(folder) / "Surface.stl"
+            packages[1].create_mesh().triangulate().save(stl_path)
+            packages.append(stl_path)
+
+            results = evaluate_packages_of_input_data(
+                self.input_data,
+                self.dose_calculator,
+                packages,
+                decay_times=[1.0, 2.0],
+                materials=[20],
+                workers=2,
+            )
+
+        self.assertEqual(6, len(results))
+        self.assertEqual(["Box", "Rotated", "Surface"] * 2, list(results[KEY_PACKAGE]))
+        self.assertEqual([1.0] * 3 + [2.0] * 3, list(results[KEY_TIME]))
+
+        for row, package in zip([0, 1, 3, 4], [packages[0], packages[1]] * 2):
+            decay_time = results[KEY_TIME][row]
+            expected = self.evaluate_like_the_gui(
+                package.create_mesh(), decay_time, [20]
+            )
+            self.assertEqual(
+                expected.get_radwaste_class_str(), results[KEY_RADWASTE_CLASS][row]
+            )
+            self.assertAlmostEqual(expected.get_mass(), results[KEY_MASS_GRAMS][row])
+            for key, value in [
+                (KEY_IRAS, expected.get_iras()),
+                (KEY_RELEVANT_SPECIFIC_ACTIVITY, expected.get_relevant_activity()),
+                (KEY_TOTAL_SPECIFIC_ACTIVITY, expected.get_total_activity()),
+                (KEY_DOSE_1_METER, expected.get_dose_1_m()),
+                (KEY_CDR, expected.get_contact_dose_rate()),
+            ]:
+                self.assertAlmostEqual(1.0, results[key][row] / value)
+            lma_isotopes = expected.get_isotopes_exceeding_lma(
+                self.input_data.isotope_criteria
+            )
+            self.assertEqual(
+                ", ".join(lma_isotopes), results[KEY_ISOTOPES_EXCEEDING_LMA][row]
+            )
+
+        # The STL of the rotated box selects the same voxels
+        pd.testing.assert_series_equal(
+            results.iloc[1].drop(KEY_PACKAGE),
+            results.iloc[2].drop(KEY_PACKAGE),
+            check_names=False,
+        )
+
+    def test_decay_times_within_the_tolerance(self):
+        box = PackageBox("Box", origin=(0.2, 0.7, 1.1), size=(2, 3, 2))
+
+        results = evaluate_packages_of_input_data(
+            self.input_data, self.dose_calculator, [box], decay_times=[1.0005, 2.0]
+        )
+
+        self.assertEqual([1.0, 2.0], list(results[KEY_TIME]))
+        self.assertEqual([2.0, 1.0], match_decay_times([1.9999, 1.0001], [1.0, 2.0]))
+        with self.assertRaises(ValueError):
+            match_decay_times([1.01], [1.0, 2.0])
+
+    def test_packages_without_mass_or_activity(self):
+        # At 3s only the material 10 has activity
+        activity = self.input_data.data_absolute_activity.get_filtered_dataframe()
+        cell_1_activity = activity.query(f"{KEY_CELL} == 1 and {KEY_TIME} == 1.0")
+        cell_1_activity = cell_1_activity.rename(index={1.0: 3.0}, level=KEY_TIME)
+        self.input_data.data_absolute_activity = DataAbsoluteActivity(
+            pd.concat([activity, cell_1_activity])
+        )
+        packages = [
+            PackageBox("Inside", origin=(0.2, 0.7, 1.1), size=(2, 3, 2)),
+            PackageBox("Outside", origin=(10, 10, 10), size=(1, 1, 1)),
+        ]
+
+        results = evaluate_packages_of_input_data(
+            self.input_data,
+            self.dose_calculator,
+            packages,
+            decay_times=[1.0, 3.0],
+            materials=[20],
+        )
+
+        self.assertEqual(4, len(results))
+        self.assertGreater(results[KEY_MASS_GRAMS][0], 0)
+        self.assertNotEqual("", results[KEY_RADWASTE_CLASS][0])
+        for row in [1, 2, 3]:
+            self.assertEqual("", results[KEY_RADWASTE_CLASS][row])
+            self.assertTrue(np.isnan(results[KEY_MASS_GRAMS][row]))
+            self.assertTrue(np.isnan(results[KEY_IRAS][row]))
+
+    def test_no_packages(self):
+        with self.assertRaises(ValueError):
+            evaluate_packages_of_input_data(
+                self.input_data, self.dose_calculator, [], decay_times=[1.0]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
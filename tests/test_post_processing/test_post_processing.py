@@ -7,6 +7,7 @@ from types import SimpleNamespace
 
 import numpy as np
 import pandas as pd
+import tables
 
 from f4e_radwaste.constants import (
     KEY_TIME,
@@ -23,6 +24,8 @@ from f4e_radwaste.constants import (
     KEY_CSA_DECLARATION,
     KEY_HALF_LIFE,
     CoordinateType,
+    VtkFormat,
+    TableFormat,
 )
 from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
 from f4e_radwaste.data_formats.data_isotope_criteria import DataIsotopeCriteria
@@ -33,15 +36,60 @@ from f4e_radwaste.post_processing.components_info import ComponentsInfo
 from f4e_radwaste.post_processing.folder_paths import FolderPaths
 from f4e_radwaste.post_processing.input_data import (
     InputData,
+    create_name_by_time_and_materials,
 )
+from f4e_radwaste.post_processing.output_options import OutputOptions
 from f4e_radwaste.post_processing.post_processing import (
     create_folder_paths,
     load_input_data_from_folder,
     StandardProcessor,
     ByComponentProcessor,
     FilteredProcessor,
+    StreamingProcessor,
 )
 
+EXAMPLE_DGS_FILE_OF_TEST_MESHINFO = """ Photon Isotope
+Number of decay times:         2
+ Case:         1  Nmat:            2
+ Cells:
+ 309485 309104
+ Volumes:
+ 0.1 0.2
+Time  1.000E+05 S
+Number of materials:         2
+H3     Co60
+2.2648085E+07 7.2338034E+06
+Number of materials:         1
+Co60
+6.8497718E+02
+Time  2.300E+05 S
+Number of materials:         2
+H3     Co60
+2.2648085E+06 7.2338034E+05
+Number of materials:         1
+Co60
+6.8497718E+01
+ Case:         6  Nmat:            2
+ Cells:
+ 309485 405729
+ Volumes:
+ 0.3 0.4
+Time  1.000E+05 S
+Number of materials:         1
+Co60
+1.5000000E+03
+Number of materials:         2
+H3     Fe55
+2.2648085E+02 7.2338034E+02
+Time  2.300E+05 S
+Number of materials:         1
+Co60
+1.4000000E+03
+Number of materials:         2
+H3     Fe55
+2.2648085E+01 7.2338034E+01
+"""
+
 
 class PostProcessingTests(unittest.TestCase):
     def setUp(self):
@@ -151,12 +199,34 @@ class PostProcessingTests(unittest.TestCase):
         self.input_folder_path = Path(__file__).parents[1] / "data/test_folder_cart"
 
     def test_standard_processor_init(self):
-        processor = StandardProcessor(self.input_folder_path)
+        processor = StandardProcessor(self.input_folder_path, use_cache=False)
 
         self.assertIsInstance(processor, StandardProcessor)
 
+    def test_standard_processor_init_with_cache(self):
+        with tempfile.TemporaryDirectory() as cache_folder:
+            cache_folder_path = Path(cache_folder)
+            processor = StandardProcessor(
+                self.input_folder_path, cache_folder_path=cache_folder_path
+            )
+            # One entry for the DGS file and another one for the meshinfo
+            self.assertEqual(2, len(os.listdir(cache_folder_path)))
+
+            cached_processor = StandardProcessor(
+                self.input_folder_path, cache_folder_path=cache_folder_path
+            )
+
+        pd.testing.assert_frame_equal(
+            processor.input_data.data_absolute_activity.get_filtered_dataframe(),
+            cached_processor.input_data.data_absolute_activity.get_filtered_dataframe(),
+        )
+        pd.testing.assert_frame_equal(
+            processor.input_data.data_mesh_info.data_mass.get_filtered_dataframe(),
+            cached_processor.input_data.data_mesh_info.data_mass.get_filtered_dataframe(),
+        )
+
     def test_standard_processor_process(self):
-        processor = StandardProcessor(self.input_folder_path)
+        processor = StandardProcessor(self.input_folder_path, use_cache=False)
         processor.input_data = self.input_data
         processor.folder_paths = self.folder_paths
 
@@ -168,7 +238,7 @@ class PostProcessingTests(unittest.TestCase):
         self.assertTrue("DataMeshInfo.json" in data_tables)
 
     def test_filtered_processor_init(self):
-        processor = FilteredProcessor(self.input_folder_path)
+        processor = FilteredProcessor(self.input_folder_path, use_cache=False)
         self.assertIsInstance(processor, FilteredProcessor)
 
         data_mass = processor.input_data.data_mesh_info.data_mass
@@ -182,12 +252,12 @@ class PostProcessingTests(unittest.TestCase):
         self.assertListEqual([1], list(activity_cells))
 
     def test_by_component_processor_init(self):
-        processor = ByComponentProcessor(self.input_folder_path)
+        processor = ByComponentProcessor(self.input_folder_path, use_cache=False)
 
         self.assertIsInstance(processor, ByComponentProcessor)
 
     def test_by_component_processor_process(self):
-        processor = ByComponentProcessor(self.input_folder_path)
+        processor = ByComponentProcessor(self.input_folder_path, use_cache=False)
         processor.input_data = self.input_data
         processor.folder_paths = self.folder_paths
 
@@ -197,10 +267,68 @@ class PostProcessingTests(unittest.TestCase):
         self.assertTrue("1.00s_by_component.csv" in csv_tables)
         self.assertTrue("2.00s_by_component.csv" in csv_tables)
 
+    def test_streaming_processor_process(self):
+        # DGS file with the cells of the meshinfo of the test folder
+        shutil.copy(self.input_folder_path / "meshinfo", self.dir_inputs)
+        with open(Path(self.dir_inputs) / "DGSdata.dat", "w") as infile:
+            infile.write(EXAMPLE_DGS_FILE_OF_TEST_MESHINFO)
+
+        processor = StandardProcessor(Path(self.dir_inputs), use_cache=False)
+        processor.folder_paths = self.folder_paths
+        processor.process_input_data_by_material()
+        expected_csv_tables = {
+            file_name: pd.read_csv(self.folder_paths.csv_results / file_name)
+            for file_name in os.listdir(self.folder_paths.csv_results)
+        }
+        shutil.rmtree(self.dir_csv)
+        os.mkdir(self.dir_csv)
+
+        processor = StreamingProcessor(Path(self.dir_inputs), use_cache=False)
+        processor.folder_paths = self.folder_paths
+        processor.process()
+
+        csv_tables = os.listdir(self.folder_paths.csv_results)
+        self.assertEqual(6, len(csv_tables))
+        self.assertSetEqual(set(expected_csv_tables), set(csv_tables))
+        for file_name, expected_table in expected_csv_tables.items():
+            table = pd.read_csv(self.folder_paths.csv_results / file_name)
+            pd.testing.assert_frame_equal(expected_table, table)
+        self.assertIn("DataMeshInfo.json", os.listdir(self.folder_paths.data_tables))
+
+    def test_streaming_processor_process_without_activity(self):
+        # Third decay time without activity in any cell
+        time_without_activity = (
+            "Time  5.000E+05 S\n" + "Number of materials:         0\n\n\n" * 2
+        )
+        first_case, second_case = EXAMPLE_DGS_FILE_OF_TEST_MESHINFO.split(
+            " Case:         6"
+        )
+        dgs_text = (
+            first_case.replace("decay times:         2", "decay times:         3")
+            + time_without_activity
+            + " Case:         6"
+            + second_case
+            + time_without_activity
+        )
+        shutil.copy(self.input_folder_path / "meshinfo", self.dir_inputs)
+        with open(Path(self.dir_inputs) / "DGSdata.dat", "w") as infile:
+            infile.write(dgs_text)
+
+        processor = StreamingProcessor(Path(self.dir_inputs), use_cache=False)
+        processor.folder_paths = self.folder_paths
+        processor.process()
+
+        csv_tables = os.listdir(self.folder_paths.csv_results)
+        self.assertEqual(6, len(csv_tables))
+        name = create_name_by_time_and_materials(5e5)
+        self.assertNotIn(f"{name}.csv", csv_tables)
+
     def test_process_input_data_by_material(self):
         mock_standard_processor = SimpleNamespace()
         mock_standard_processor.input_data = self.input_data
         mock_standard_processor.folder_paths = self.folder_paths
+        mock_standard_processor.workers = 1
+        mock_standard_processor.output_options = OutputOptions()
 
         # noinspection PyTypeChecker
         StandardProcessor.process_input_data_by_material(mock_standard_processor)
@@ -211,6 +339,136 @@ class PostProcessingTests(unittest.TestCase):
         vtk_files = os.listdir(self.folder_paths.vtk_results)
         self.assertTrue("Time 1.00s with materials [30].vts" in vtk_files)
 
+    def test_process_input_data_by_material_as_unstructured_grids(self):
+        processor = StandardProcessor(
+            self.input_folder_path,
+            use_cache=False,
+            output_options=OutputOptions(vtk_format=VtkFormat.UNSTRUCTURED),
+        )
+        processor.input_data = self.input_data
+        processor.folder_paths = self.folder_paths
+
+        processor.process_input_data_by_material()
+
+        vtk_files = os.listdir(self.folder_paths.vtk_results)
+        self.assertIn("Time 1.00s with materials [30].vtu", vtk_files)
+        self.assertFalse(any(file.endswith(".vts") for file in vtk_files))
+
+    def test_process_input_data_by_material_in_several_table_formats(self):
+        processor = StandardProcessor(
+            self.input_folder_path,
+            use_cache=False,
+            output_options=OutputOptions(
+                table_formats=(TableFormat.CSV, TableFormat.HDF5, TableFormat.NPZ)
+            ),
+        )
+        processor.input_data = self.input_data
+        processor.folder_paths = self.folder_paths
+
+        processor.process_input_data_by_material()
+
+        table_files = os.listdir(self.folder_paths.csv_results)
+        name = "Time 1.00s with materials [30]"
+        self.assertIn(f"{name}.csv", table_files)
+        self.assertIn(f"{name}.hdf5", table_files)
+        self.assertIn(f"{name}.npz", table_files)
+        pd.testing.assert_frame_equal(
+            pd.read_csv(self.folder_paths.csv_results / f"{name}.csv", index_col=0),
+            pd.read_hdf(self.folder_paths.csv_results / f"{name}.hdf5"),
+        )
+
+    def test_process_input_data_by_material_as_time_series_in_parallel(self):
+        processor = StandardProcessor(
+            self.input_folder_path,
+            use_cache=False,
+            workers=2,
+            output_options=OutputOptions(vtk_format=VtkFormat.TIME_SERIES),
+        )
+        processor.input_data = self.input_data
+        processor.folder_paths = self.folder_paths
+
+        processor.process_input_data_by_material()
+
+        vtk_files = os.listdir(self.folder_paths.vtk_results)
+        self.assertIn("Time series with materials [30].vtkhdf", vtk_files)
+        self.assertIn("Time series with materials all_materials.vtkhdf", vtk_files)
+        self.assertTrue(all(file.endswith(".vtkhdf") for file in vtk_files))
+        file_path = (
+            self.folder_paths.vtk_results
+            / "Time series with materials all_materials.vtkhdf"
+        )
+        with tables.open_file(file_path) as h5_file:
+            steps = h5_file.root.VTKHDF.Steps
+            self.assertListEqual([1.0, 2.0], steps.Values.read().tolist())
+
+    def test_process_input_data_by_material_in_parallel(self):
+        processor = StandardProcessor(
+            self.input_folder_path, workers=1, use_cache=False
+        )
+        processor.input_data = self.input_data
+        processor.folder_paths = self.folder_paths
+        processor.process_input_data_by_material()
+        expected_csv_tables = {
+            file_name: pd.read_csv(self.folder_paths.csv_results / file_name)
+            for file_name in os.listdir(self.folder_paths.csv_results)
+        }
+        shutil.rmtree(self.dir_csv)
+        os.mkdir(self.dir_csv)
+
+        processor.workers = 2
+        processor.process_input_data_by_material()
+
+        csv_tables = os.listdir(self.folder_paths.csv_results)
+        self.assertSetEqual(set(expected_csv_tables), set(csv_tables))
+        for file_name, expected_table in expected_csv_tables.items():
+            table = pd.read_csv(self.folder_paths.csv_results / file_name)
+            pd.testing.assert_frame_equal(expected_table, table)
+        self.assertIn("Time 1.00s with materials [30].vts", os.listdir(self.dir_vtk))
+
+    def add_decay_time_without_activity(self):
+        # The material 30 has no activity at 2s and no material has it at 3s
+        dataframe = self.input_data.data_absolute_activity.get_filtered_dataframe()
+        no_activity_row = pd.DataFrame(
+            {KEY_ABSOLUTE_ACTIVITY: [1.0]},
+            index=pd.MultiIndex.from_tuples(
+                [(3, 1, 99, "H3")], names=dataframe.index.names
+            ),
+        )
+        self.input_data.data_absolute_activity = DataAbsoluteActivity(
+            pd.concat([dataframe, no_activity_row])
+        )
+
+    def assert_decay_times_without_activity_are_skipped(self):
+        csv_tables = os.listdir(self.folder_paths.csv_results)
+        self.assertIn("Time 2.00s with materials [10].csv", csv_tables)
+        self.assertIn("Time 2.00s with materials all_materials.csv", csv_tables)
+        self.assertNotIn("Time 2.00s with materials [30].csv", csv_tables)
+        self.assertFalse(any(table.startswith("Time 3.00s") for table in csv_tables))
+
+    def test_process_input_data_by_material_without_activity(self):
+        self.add_decay_time_without_activity()
+        processor = StandardProcessor(
+            self.input_folder_path, workers=1, use_cache=False
+        )
+        processor.input_data = self.input_data
+        processor.folder_paths = self.folder_paths
+
+        processor.process_input_data_by_material()
+
+        self.assert_decay_times_without_activity_are_skipped()
+
+    def test_process_input_data_by_material_in_parallel_without_activity(self):
+        self.add_decay_time_without_activity()
+        processor = StandardProcessor(
+            self.input_folder_path, workers=2, use_cache=False
+        )
+        processor.input_data = self.input_data
+        processor.folder_paths = self.folder_paths
+
+        processor.process_input_data_by_material()
+
+        self.assert_decay_times_without_activity_are_skipped()
+
     def test_process_input_data_by_components(self):
         component_ids = [
             ["Component_1", [1, 2]],
@@ -227,6 +485,7 @@ class PostProcessingTests(unittest.TestCase):
         mock_by_component_processor.folder_paths = self.folder_paths
         mock_by_component_processor.components_info = components_info
         mock_by_component_processor.dose_calculator = self.dose_calculator
+        mock_by_component_processor.output_options = OutputOptions()
 
         # noinspection PyTypeChecker
         ByComponentProcessor.process_input_data_by_components(
@@ -255,7 +514,9 @@ class PostProcessingTests(unittest.TestCase):
         self.assertEqual(0, len(os.listdir(folder_paths.data_tables)))
 
     def test_load_input_data_from_folder(self):
-        input_data = load_input_data_from_folder(self.input_folder_path)
+        input_data = load_input_data_from_folder(
+            self.input_folder_path, use_cache=False
+        )
 
         self.assertIsInstance(input_data.data_absolute_activity, DataAbsoluteActivity)
         self.assertIsInstance(input_data.data_mesh_info, DataMeshInfo)
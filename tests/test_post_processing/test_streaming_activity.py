@@ -0,0 +1,113 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import (
+    KEY_TIME,
+    KEY_VOXEL,
+    KEY_CELL,
+    KEY_ISOTOPE,
+    KEY_ABSOLUTE_ACTIVITY,
+    KEY_MASS_GRAMS,
+    KEY_MATERIAL,
+)
+from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
+from f4e_radwaste.data_formats.data_mass import DataMass
+from f4e_radwaste.post_processing.input_data import InputData
+from f4e_radwaste.post_processing.streaming_activity import (
+    StreamingMeshActivity,
+    _sum_by_group,
+)
+from f4e_radwaste.readers.dgs_file import DgsChunk
+
+
+class StreamingMeshActivityTests(unittest.TestCase):
+    def setUp(self):
+        # Rows of the DGS file, the cells of each voxel are not sorted
+        self.rows = {
+            KEY_TIME: [1.0, 1.0, 1.0, 1.0, 1.0, 2.0, 2.0],
+            KEY_VOXEL: [1, 1, 1, 1, 2, 1, 1],
+            KEY_CELL: [2, 2, 1, 1, 3, 1, 4],
+            KEY_ISOTOPE: ["H3", "Fe55", "H3", "Fe55", "H3", "H3", "H3"],
+            KEY_ABSOLUTE_ACTIVITY: [1.5, 0.7, 0.5, 1.0, 2.0, 0.1, 9.0],
+        }
+
+        # Cell 3 has two materials and cell 4 is not in DataMass
+        data = {
+            KEY_VOXEL: [1, 1, 2, 2],
+            KEY_MATERIAL: [10, 20, 30, 20],
+            KEY_CELL: [1, 2, 3, 3],
+            KEY_MASS_GRAMS: [2, 3, 10, 5],
+        }
+        df = pd.DataFrame(data)
+        df.set_index([KEY_VOXEL, KEY_MATERIAL, KEY_CELL], inplace=True)
+        self.data_mass = DataMass(df)
+
+        self.streaming_activity = StreamingMeshActivity(self.data_mass)
+        self.streaming_activity.add_chunk(self.create_chunk(slice(0, 5)))
+        self.streaming_activity.add_chunk(self.create_chunk(slice(5, 7)))
+
+    def create_chunk(self, rows: slice) -> DgsChunk:
+        isotope_names = ["H3", "Fe55"]
+        return DgsChunk(
+            decay_times=[1.0, 2.0],
+            isotope_names=isotope_names,
+            time_codes=np.array(self.rows[KEY_TIME][rows], dtype=np.int32) - 1,
+            voxels=np.array(self.rows[KEY_VOXEL][rows], dtype=np.int32),
+            cells=np.array(self.rows[KEY_CELL][rows], dtype=np.int32),
+            isotope_codes=np.array(
+                [isotope_names.index(name) for name in self.rows[KEY_ISOTOPE][rows]],
+                dtype=np.int32,
+            ),
+            activities=np.array(self.rows[KEY_ABSOLUTE_ACTIVITY][rows]),
+        )
+
+    def test_decay_times(self):
+        self.assertListEqual([1.0, 2.0], self.streaming_activity.decay_times.tolist())
+
+    def test_get_mesh_activity_matches_input_data(self):
+        df = pd.DataFrame(self.rows)
+        df.set_index([KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE], inplace=True)
+        # noinspection PyTypeChecker
+        input_data = InputData(
+            data_absolute_activity=DataAbsoluteActivity(df),
+            data_mesh_info=SimpleNamespace(data_mass=self.data_mass),
+            isotope_criteria=None,
+        )
+
+        selections = [
+            (1.0, None),
+            (1.0, 10),
+            (1.0, 20),
+            (1.0, 30),
+            (2.0, None),
+            (2.0, 10),
+        ]
+        for decay_time, material in selections:
+            materials = None if material is None else [material]
+            expected = input_data.get_mesh_activity_by_time_and_materials(
+                decay_time, materials
+            )
+            result = self.streaming_activity.get_mesh_activity_by_time_and_material(
+                decay_time, material
+            )
+            pd.testing.assert_frame_equal(
+                expected._dataframe, result._dataframe, check_exact=True
+            )
+
+    def test_get_mesh_activity_without_activity(self):
+        with self.assertRaises(ValueError):
+            self.streaming_activity.get_mesh_activity_by_time_and_material(2.0, 30)
+
+    def test_sum_by_group(self):
+        group_starts = np.array([0, 3])
+        values = np.array([1e16, 1.0, 1.0, 2.0])
+
+        sums = _sum_by_group(group_starts, values)
+
+        # The compensated sum keeps the small values like pandas does
+        expected = pd.Series(values).groupby([0, 0, 0, 1]).sum().values
+        np.testing.assert_array_equal(expected, sums)
+        self.assertEqual(1e16 + 2.0, sums[0])
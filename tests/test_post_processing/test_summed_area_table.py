@@ -0,0 +1,218 @@
+import math
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from f4e_radwaste.constants import (
+    KEY_TIME,
+    KEY_VOXEL,
+    KEY_CELL,
+    KEY_ISOTOPE,
+    KEY_ABSOLUTE_ACTIVITY,
+    KEY_MASS_GRAMS,
+    KEY_MATERIAL,
+    CoordinateType,
+)
+from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
+from f4e_radwaste.data_formats.data_mass import DataMass
+from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
+from f4e_radwaste.post_processing.input_data import InputData
+from f4e_radwaste.post_processing.summed_area_table import SummedAreaTable
+
+# Mesh of 2 x 3 x 4 voxels
+VECTOR_I = np.array([0.0, 1.0, 2.0])
+VECTOR_J = np.array([0.0, 1.0, 2.0, 3.0])
+VECTOR_K = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+N_VOXELS = 24
+
+
+class SummedAreaTableTests(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        voxels = np.arange(1, N_VOXELS + 1)
+
+        # Two cells by voxel, each one of a different material
+        data = {
+            KEY_VOXEL: np.repeat(voxels, 2),
+            KEY_MATERIAL: np.tile([10, 20], N_VOXELS),
+            KEY_CELL: np.tile([1, 2], N_VOXELS),
+            KEY_MASS_GRAMS: rng.uniform(1, 10, 2 * N_VOXELS),
+        }
+        df = pd.DataFrame(data).set_index([KEY_VOXEL, KEY_MATERIAL, KEY_CELL])
+        data_mesh_info = DataMeshInfo(
+            coordinates=CoordinateType.CARTESIAN,
+            data_mass=DataMass(df),
+            vector_i=VECTOR_I,
+            vector_j=VECTOR_J,
+            vector_k=VECTOR_K,
+        )
+
+        # H3 in all the cells, Co60 only in some voxels of the cell 2
+        index = pd.MultiIndex.from_product(
+            [[1.0, 2.0], voxels, [1, 2], ["H3"]],
+            names=[KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE],
+        )
+        activity = pd.Series(rng.uniform(0, 100, len(index)), index=index)
+        co_index = pd.MultiIndex.from_product(
+            [[1.0], voxels[::5], [2], ["Co60"]], names=index.names
+        )
+        co_activity = pd.Series(rng.uniform(0, 100, len(co_index)), index=co_index)
+        df = pd.concat([activity, co_activity]).to_frame(KEY_ABSOLUTE_ACTIVITY)
+
+        self.input_data = InputData(
+            data_absolute_activity=DataAbsoluteActivity(df.sort_index()),
+            data_mesh_info=data_mesh_info,
+            isotope_criteria=None,
+        )
+
+    @staticmethod
+    def get_voxels_in_range(lower, upper):
+        ids = np.arange(1, N_VOXELS + 1).reshape((2, 3, 4))
+        return list(
+            ids[lower[0] : upper[0], lower[1] : upper[1], lower[2] : upper[2]].ravel()
+        )
+
+    def test_box_sums_match_the_sum_of_the_voxels(self):
+        table = self.input_data.get_summed_area_table(decay_time=1.0)
+        lower = np.array([[0, 0, 0], [1, 1, 1], [0, 2, 3], [1, 0, 2]])
+        upper = np.array([[2, 3, 4], [2, 3, 3], [2, 3, 4], [1, 3, 4]])
+
+        box_sums = table.calculate_box_sums(lower, upper)
+
+        data_mass = self.input_data.data_mesh_info.data_mass.get_filtered_dataframe()
+        activity = self.input_data.data_absolute_activity.get_filtered_dataframe(
+            decay_times=[1.0]
+        )
+        for row, (box_lower, box_upper) in enumerate(zip(lower, upper)):
+            voxels = self.get_voxels_in_range(box_lower, box_upper)
+            expected_mass = data_mass.loc[voxels, KEY_MASS_GRAMS].sum()
+            self.assertAlmostEqual(expected_mass, box_sums[KEY_MASS_GRAMS][row])
+            for isotope in ["H3", "Co60"]:
+                expected = activity.query(
+                    f"{KEY_VOXEL} in @voxels and {KEY_ISOTOPE} == @isotope"
+                )[KEY_ABSOLUTE_ACTIVITY].sum()
+                self.assertAlmostEqual(expected, box_sums[isotope][row])
+
+    def test_collapsed_activity_matches_input_data(self):
+        lower, upper = np.array([0, 1, 0]), np.array([2, 3, 3])
+        voxels = self.get_voxels_in_range(lower, upper)
+
+        for materials in [None, [20]]:
+            table = self.input_data.get_summed_area_table(1.0, materials)
+
+            result = table.get_collapsed_activity(lower, upper)
+
+            expected = self.input_data.get_collapsed_activity(1.0, materials, voxels)
+            pd.testing.assert_frame_equal(
+                expected.get_filtered_dataframe(),
+                result.get_filtered_dataframe(),
+                check_names=False,
+            )
+
+    def test_wide_dynamic_range_matches_direct_summation(self):
+        shape = (20, 20, 20)
+        rng = np.random.default_rng(1)
+        activities = rng.uniform(1e13, 1e14, shape)
+        activities[3, 4, 5] = 5.0
+        activities[10, 10, 10] = 1e-3
+        activities[15, 2:5, 7] = [0.0, 2.5e-2, 7.0]
+        voxel_values = pd.DataFrame(
+            {
+                KEY_MASS_GRAMS: rng.uniform(1, 10, shape).ravel(),
+                "Co60": activities.ravel(),
+            },
+            index=np.arange(1, activities.size + 1),
+        )
+        vector = np.arange(21.0)
+        data_mesh_info = DataMeshInfo(
+            coordinates=CoordinateType.CARTESIAN,
+            vector_i=vector,
+            vector_j=vector,
+            vector_k=vector,
+        )
+        table = SummedAreaTable(data_mesh_info, voxel_values)
+
+        # Single voxels with low activity, a row of them and random boxes
+        lower = [[3, 4, 5], [10, 10, 10], [15, 2, 7], [15, 2, 7]]
+        upper = [[4, 5, 6], [11, 11, 11], [16, 3, 8], [16, 5, 8]]
+        for _ in range(50):
+            corners = np.sort(rng.integers(0, 21, (2, 3)), axis=0)
+            lower.append(corners[0])
+            upper.append(corners[1])
+
+        box_sums = table.calculate_box_sums(np.array(lower), np.array(upper))
+
+        expected = [
+            math.fsum(activities[tuple(map(slice, start, stop))].ravel())
+            for start, stop in zip(lower, upper)
+        ]
+        np.testing.assert_allclose(box_sums["Co60"], expected, rtol=1e-12, atol=0)
+        self.assertEqual([5.0, 1e-3, 0.0, 7.025], list(box_sums["Co60"][:4]))
+
+    def test_localised_isotope_is_not_summed_directly(self):
+        shape = (20, 20, 20)
+        rng = np.random.default_rng(2)
+        activities = np.zeros(shape)
+        activities[15, 15, 15] = 1e14
+        voxel_values = pd.DataFrame(
+            {
+                KEY_MASS_GRAMS: rng.uniform(1, 10, shape).ravel(),
+                "Co60": activities.ravel(),
+            },
+            index=np.arange(1, activities.size + 1),
+        )
+        vector = np.arange(21.0)
+        data_mesh_info = DataMeshInfo(
+            coordinates=CoordinateType.CARTESIAN,
+            vector_i=vector,
+            vector_j=vector,
+            vector_k=vector,
+        )
+        table = SummedAreaTable(data_mesh_info, voxel_values)
+
+        # Boxes without the active voxel, next to it, and around it
+        lower = np.array([[0, 0, 0], [16, 16, 16], [0, 0, 0], [15, 15, 15]])
+        upper = np.array([[15, 20, 20], [20, 20, 20], [20, 20, 20], [16, 16, 16]])
+        with patch.object(table, "_sum_voxels", wraps=table._sum_voxels) as sum_voxels:
+            box_sums = table.calculate_box_sums(lower, upper)
+
+        sum_voxels.assert_not_called()
+        self.assertEqual([0.0, 0.0, 1e14, 1e14], list(box_sums["Co60"]))
+
+    def test_get_voxel_ranges_in_box(self):
+        table = self.input_data.get_summed_area_table(decay_time=2.0)
+
+        lower, upper = table.get_voxel_ranges_in_box(
+            np.array([[0.4, 0.6, -1.0], [0.6, 0.6, 0.6]]),
+            np.array([[1.6, 3.0, 2.4], [0.9, 0.9, 0.9]]),
+        )
+
+        np.testing.assert_array_equal([[0, 1, 0], [1, 1, 1]], lower)
+        # The second box has no voxel centers inside
+        np.testing.assert_array_equal([[2, 3, 2], [1, 1, 1]], upper)
+
+    def test_ranges_outside_the_mesh(self):
+        table = self.input_data.get_summed_area_table(decay_time=1.0)
+
+        with self.assertRaises(ValueError):
+            table.calculate_box_sums(np.array([0, 0, 0]), np.array([3, 1, 1]))
+
+    def test_cylindrical_mesh_is_not_valid(self):
+        data_mesh_info = DataMeshInfo(
+            coordinates=CoordinateType.CYLINDRICAL,
+            vector_i=VECTOR_I,
+            vector_j=VECTOR_J,
+            vector_k=VECTOR_K,
+            origin=np.zeros(3),
+            axis=np.array([0, 0, 1]),
+            vec=np.array([1, 0, 0]),
+        )
+
+        with self.assertRaises(ValueError):
+            SummedAreaTable(data_mesh_info, pd.DataFrame())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
 import unittest
 
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
 from f4e_radwaste.constants import (
@@ -10,7 +15,13 @@ from f4e_radwaste.constants import (
     KEY_ABSOLUTE_ACTIVITY,
 )
 from f4e_radwaste.data_formats.data_absolute_activity import DataAbsoluteActivity
-from f4e_radwaste.readers.dgs_file import read_file, fix_isotope_names
+from f4e_radwaste.readers.dgs_file import (
+    read_file,
+    fix_isotope_names,
+    find_case_offsets,
+    read_file_in_chunks,
+    _GrowableArray,
+)
 
 from io import StringIO
 from unittest.mock import patch
@@ -38,6 +49,28 @@ Nb91M1     Hf178M2     Co60
 2.2648085E+02 7.2338034E+02 6.8497718E+02
 """
 
+EXAMPLE_DGS_FILE_TWO_CASES = """ Photon Isotope
+Number of decay times:         1
+ Case:         12  Nmat:            1
+ Cells:
+ 7
+ Volumes:
+ 2.0
+Time  1.000E+05 S
+Number of materials:         2
+Co60     H3
+1.0E+01 3.0E+00
+ Case:         3  Nmat:            1
+ Cells:
+ 5
+ Volumes:
+ 0.5
+Time  1.000E+05 S
+Number of materials:         2
+Fe55     Co60
+4.0E+00 8.0E+00
+"""
+
 
 class DgsFileTests(unittest.TestCase):
     def setUp(self):
@@ -181,3 +214,124 @@ class DgsFileTests(unittest.TestCase):
         pd.testing.assert_frame_equal(
             self.data_absolute_activity._dataframe, result._dataframe
         )
+
+    def test_read_file_several_cases(self):
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_DGS_FILE_TWO_CASES)):
+            result = read_file("test.dat")
+
+        data = {
+            KEY_TIME: [100000.0, 100000.0, 100000.0, 100000.0],
+            KEY_VOXEL: [3, 3, 12, 12],
+            KEY_CELL: [5, 5, 7, 7],
+            KEY_ISOTOPE: ["Co60", "Fe55", "Co60", "H3"],
+            KEY_ABSOLUTE_ACTIVITY: [4.0, 2.0, 20.0, 6.0],
+        }
+        expected_df = pd.DataFrame(data)
+        expected_df.set_index(
+            [KEY_TIME, KEY_VOXEL, KEY_CELL, KEY_ISOTOPE], inplace=True
+        )
+
+        pd.testing.assert_frame_equal(expected_df, result._dataframe)
+
+    def test_read_file_parsing_the_lines_of_each_cell_apart(self):
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_DGS_FILE)):
+            expected_df = read_file("test.dat")._dataframe
+
+        # The pending lines are parsed as soon as there is one
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_DGS_FILE)):
+            with patch("f4e_radwaste.readers.dgs_file.PENDING_LINES_TO_PARSE", 1):
+                result = read_file("test.dat")
+
+        pd.testing.assert_frame_equal(expected_df, result._dataframe)
+
+    def test_read_file_with_incomplete_case(self):
+        incomplete_file = EXAMPLE_DGS_FILE_TWO_CASES.rsplit("\n", 3)[0]
+        with patch("builtins.open", return_value=StringIO(incomplete_file)):
+            with self.assertRaises(ValueError):
+                read_file("test.dat")
+
+    def test_growable_array(self):
+        growable_array = _GrowableArray(np.int32, capacity=2)
+        growable_array.extend(np.array([1, 2, 3]))
+        growable_array.extend_repeated(7, 4)
+
+        self.assertEqual(7, len(growable_array))
+        np.testing.assert_array_equal(
+            np.array([1, 2, 3, 7, 7, 7, 7]), growable_array.to_array()
+        )
+
+    def test_find_case_offsets(self):
+        test_dir = tempfile.mkdtemp()
+        file_path = Path(test_dir) / "DGSdata.dat"
+        with open(file_path, "w") as infile:
+            infile.write(EXAMPLE_DGS_FILE_TWO_CASES)
+
+        case_offsets = find_case_offsets(file_path)
+
+        expected_offsets = [
+            EXAMPLE_DGS_FILE_TWO_CASES.index(" Case:         12"),
+            EXAMPLE_DGS_FILE_TWO_CASES.index(" Case:         3"),
+        ]
+        self.assertListEqual(expected_offsets, case_offsets.tolist())
+        shutil.rmtree(test_dir)
+
+    def test_find_case_offsets_with_headers_split_between_chunks(self):
+        test_dir = tempfile.mkdtemp()
+        file_path = Path(test_dir) / "DGSdata.dat"
+        with open(file_path, "w") as infile:
+            infile.write(EXAMPLE_DGS_FILE_TWO_CASES)
+        expected_offsets = [
+            EXAMPLE_DGS_FILE_TWO_CASES.index(" Case:         12"),
+            EXAMPLE_DGS_FILE_TWO_CASES.index(" Case:         3"),
+        ]
+
+        # The first chunk ends at every byte of the line break and header of the
+        #  second case
+        line_break = expected_offsets[1] - 1
+        for chunk_size in range(line_break + 1, expected_offsets[1] + len(" Case:")):
+            with patch("f4e_radwaste.readers.dgs_file.SCAN_CHUNK_SIZE", chunk_size):
+                case_offsets = find_case_offsets(file_path)
+
+            self.assertListEqual(expected_offsets, case_offsets.tolist())
+        shutil.rmtree(test_dir)
+
+    def test_read_file_in_parallel(self):
+        test_dir = tempfile.mkdtemp()
+        file_path = Path(test_dir) / "DGSdata.dat"
+        with open(file_path, "w") as infile:
+            infile.write(EXAMPLE_DGS_FILE_TWO_CASES)
+
+        result_serial = read_file(file_path)
+        result_parallel = read_file(file_path, workers=2)
+
+        pd.testing.assert_frame_equal(
+            result_serial._dataframe, result_parallel._dataframe
+        )
+        shutil.rmtree(test_dir)
+
+    def test_read_file_selected_decay_times(self):
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_DGS_FILE)):
+            result = read_file("test.dat", decay_times=[2.3e5])
+
+        self.assertListEqual([230000.0], list(result.decay_times))
+        expected_values = self.data_absolute_activity._dataframe.loc[230000.0].values
+        np.testing.assert_array_equal(expected_values, result._dataframe.values)
+
+    def test_read_file_no_selected_decay_times(self):
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_DGS_FILE)):
+            result = read_file("test.dat", decay_times=[1.0])
+
+        self.assertEqual(0, len(result._dataframe))
+
+    def test_read_file_in_chunks(self):
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_DGS_FILE_TWO_CASES)):
+            chunks = list(read_file_in_chunks("test.dat", cases_per_chunk=1))
+
+        self.assertEqual(2, len(chunks))
+        self.assertListEqual([12, 12], chunks[0].voxels.tolist())
+        self.assertListEqual([3, 3], chunks[1].voxels.tolist())
+        self.assertListEqual(
+            ["Fe55", "Co60"],
+            [chunks[1].isotope_names[code] for code in chunks[1].isotope_codes],
+        )
+        self.assertListEqual([2.0, 4.0], chunks[1].activities.tolist())
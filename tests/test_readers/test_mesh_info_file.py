@@ -12,7 +12,7 @@ from f4e_radwaste.constants import (
     KEY_MASS_GRAMS,
 )
 from f4e_radwaste.data_formats.data_mesh_info import DataMeshInfo
-from f4e_radwaste.readers.mesh_info_file import read_file
+from f4e_radwaste.readers.mesh_info_file import read_file, _SectionReader
 
 EXAMPLE_MESHINFO_CART = """d1sune version 3.1.4 ld=05152019  probid =  08/19/22 20:11:57 
  C                                                                               
@@ -124,6 +124,42 @@ class MeshInfoFileTests(unittest.TestCase):
         expected_mass_last_value = 3.38693e03 * 0.20000 * 1.3966 / (2 * np.pi)
         self.assertAlmostEqual(result_mass_last_value, expected_mass_last_value)
 
+    def test_read_file_only_first_mesh(self):
+        second_mesh = EXAMPLE_MESHINFO_CART[
+            EXAMPLE_MESHINFO_CART.index(" Mesh tally") :
+        ]
+        second_mesh = second_mesh.replace(
+            "      1   3.38693E+03", "      1   1.00000E+00"
+        )
+        meshinfo = EXAMPLE_MESHINFO_CART.rstrip() + "\n" + second_mesh
+        with patch("builtins.open", return_value=StringIO(meshinfo)):
+            result = read_file("test.dat")
+
+        with patch("builtins.open", return_value=StringIO(EXAMPLE_MESHINFO_CART)):
+            expected = read_file("test.dat")
+
+        pd.testing.assert_frame_equal(
+            expected.data_mass._dataframe, result.data_mass._dataframe
+        )
+
+    def test_section_reader_stops_at_the_marker(self):
+        text = "1 2 3\n4 5 6\n Mesh tally number: 2\n7 8 9\n"
+        # The blocks split the marker
+        for size in [1, 4, 7, 16, -1]:
+            section_reader = _SectionReader(StringIO(text), "Mesh tally number:")
+
+            blocks = iter(lambda: section_reader.read(size), "")
+
+            self.assertEqual("1 2 3\n4 5 6\n ", "".join(blocks))
+
+    def test_read_file_wrong_number_of_cells(self):
+        meshinfo = EXAMPLE_MESHINFO_CART.replace(
+            "      8   2.38693E+03    2", "      8   2.38693E+03    3"
+        )
+        with self.assertRaises(ValueError):
+            with patch("builtins.open", return_value=StringIO(meshinfo)):
+                read_file("test.dat")
+
     def test_read_file_no_mesh_found(self):
         with self.assertRaises(ValueError):
             with patch("builtins.open", return_value=StringIO("")):
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from f4e_radwaste.post_processing.package_evaluation import PackageBox
+from f4e_radwaste.readers import packages_file
+
+EXAMPLE_JSON_FILE = """[
+    {"name": "Box_1", "origin": [0, 1, 2], "size": [10, 10, 10], "rotation": [0, 0, 45]},
+    {"origin": [5, 5, 5], "size": [1, 2, 3]},
+    {"stl": "container.stl"}
+]
+"""
+
+EXAMPLE_CSV_FILE = """name, origin_x, origin_y, origin_z, size_x, size_y, size_z, rot_x, rot_y, rot_z, stl
+Box_1, 0, 1, 2, 10, 10, 10, 0, 0, 45,
+Box_2, 5, 5, 5, 1, 2, 3, , , ,
+, , , , , , , , , , container.stl
+"""
+
+
+class PackagesFileTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.folder_path = Path(self.folder.name)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def read_example(self, file_name: str, content: str):
+        file_path = self.folder_path / file_name
+        file_path.write_text(content)
+        return packages_file.read_file(file_path)
+
+    def test_read_json_file(self):
+        result = self.read_example("packages.json", EXAMPLE_JSON_FILE)
+
+        expected = [
+            PackageBox("Box_1", (0.0, 1.0, 2.0), (10.0, 10.0, 10.0), (0.0, 0.0, 45.0)),
+            PackageBox("Package_2", (5.0, 5.0, 5.0), (1.0, 2.0, 3.0)),
+            self.folder_path / "container.stl",
+        ]
+        self.assertListEqual(expected, result)
+
+    def test_read_csv_file(self):
+        result = self.read_example("packages.csv", EXAMPLE_CSV_FILE)
+
+        expected = [
+            PackageBox("Box_1", (0.0, 1.0, 2.0), (10.0, 10.0, 10.0), (0.0, 0.0, 45.0)),
+            PackageBox("Box_2", (5.0, 5.0, 5.0), (1.0, 2.0, 3.0)),
+            self.folder_path / "container.stl",
+        ]
+        self.assertListEqual(expected, result)
+
+    def test_wrong_extension(self):
+        with self.assertRaises(ValueError):
+            self.read_example("packages.txt", EXAMPLE_JSON_FILE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pyvista as pv
+from vtkmodules.vtkIOHDF import vtkHDFReader
+
+from f4e_radwaste.vtkhdf_file import append_step_to_vtkhdf_file, to_hdf5_name
+
+
+class VtkHdfFileTests(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.file_path = Path(self.test_dir) / "series.vtkhdf"
+
+        x, y, z = np.meshgrid([0.0, 1, 2], [0.0, 1, 2], [0.0, 1], indexing="ij")
+        self.grid = pv.StructuredGrid(x, y, z)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read_step(self, step: int) -> pv.UnstructuredGrid:
+        reader = vtkHDFReader()
+        reader.SetFileName(str(self.file_path))
+        reader.UpdateInformation()
+        self.assertEqual(2, reader.GetNumberOfSteps())
+        reader.SetStep(step)
+        reader.Update()
+        return pv.wrap(reader.GetOutput())
+
+    def test_append_step_to_vtkhdf_file(self):
+        first_grid = self.grid.copy()
+        first_grid["H3"] = [1.0, 2.0, 3.0, 4.0]
+        first_grid["Fe55"] = [1.0, 1.0, 1.0, 1.0]
+        first_grid["Radwaste class"] = [0, 1, 2, 1]
+        append_step_to_vtkhdf_file(self.file_path, first_grid, 10.0)
+        second_grid = self.grid.copy()
+        second_grid["H3"] = [5.0, 6.0, 7.0, 8.0]
+        second_grid["Co60"] = [9.0, 9.0, 9.0, 9.0]
+        second_grid["Radwaste class"] = [1, 1, 1, 0]
+        append_step_to_vtkhdf_file(self.file_path, second_grid, 20.0)
+
+        first_step = self.read_step(0)
+        second_step = self.read_step(1)
+
+        np.testing.assert_array_equal(
+            self.grid.cell_centers().points, first_step.cell_centers().points
+        )
+        self.assertListEqual([10.0], first_step["Time"].tolist())
+        self.assertListEqual([1.0, 2.0, 3.0, 4.0], first_step["H3"].tolist())
+        self.assertListEqual([0, 1, 2, 1], first_step["Radwaste class"].tolist())
+        # Arrays missing in a step are NaN, not a valid value
+        self.assertTrue(np.isnan(first_step["Co60"]).all())
+        self.assertListEqual([20.0], second_step["Time"].tolist())
+        self.assertListEqual([5.0, 6.0, 7.0, 8.0], second_step["H3"].tolist())
+        self.assertListEqual([1, 1, 1, 0], second_step["Radwaste class"].tolist())
+        self.assertListEqual([9.0, 9.0, 9.0, 9.0], second_step["Co60"].tolist())
+        self.assertTrue(np.isnan(second_step["Fe55"]).all())
+
+    def test_missing_integer_array_is_not_valid(self):
+        first_grid = self.grid.copy()
+        first_grid["Radwaste class"] = [0, 1, 2, 1]
+        append_step_to_vtkhdf_file(self.file_path, first_grid, 10.0)
+        second_grid = self.grid.copy()
+        second_grid["H3"] = [5.0, 6.0, 7.0, 8.0]
+
+        with self.assertRaises(ValueError):
+            append_step_to_vtkhdf_file(self.file_path, second_grid, 20.0)
+
+        # The file keeps the first step only
+        reader = vtkHDFReader()
+        reader.SetFileName(str(self.file_path))
+        reader.UpdateInformation()
+        self.assertEqual(1, reader.GetNumberOfSteps())
+
+    def test_to_hdf5_name(self):
+        self.assertEqual("Activity [Bq∕g]", to_hdf5_name("Activity [Bq/g]"))
+        self.assertEqual("H3", to_hdf5_name("H3"))